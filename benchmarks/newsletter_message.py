@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""
+Measures the CPU time needed to build and serialize one newsletter email
+with a personalized unsubscribe URL
+
+Run from the root of the repository:
+
+    python benchmarks/newsletter_message.py
+"""
+import os
+import sys
+import time
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'test_project.settings')
+django.setup()
+
+from django.core.mail import EmailMessage  # noqa: E402
+
+from newsfeed.utils.newsletter_message import (  # noqa: E402
+    UNSUBSCRIBE_URL_PLACEHOLDER,
+    NewsletterEmailMessage,
+    NewsletterMessageTemplate,
+)
+
+
+SUBJECT = 'Issue #1'
+FROM_EMAIL = 'newsletter@example.com'
+# ~150 KB html body
+HTML = (
+    '<li><h5><a href="https://example.com/">Post title</a></h5>'
+    '<p>Short description of the post with non ascii text: café</p></li>\n'
+) * 1200 + f'<a href="{UNSUBSCRIBE_URL_PLACEHOLDER}">Unsubscribe</a>\n'
+MESSAGES = 1000
+
+
+def get_unsubscribe_url(to_email):
+    return f'/newsfeed/unsubscribe/{to_email}:signature/'
+
+
+def build_email_message(to_email):
+    html = HTML.replace(
+        UNSUBSCRIBE_URL_PLACEHOLDER, get_unsubscribe_url(to_email)
+    )
+    message = EmailMessage(SUBJECT, html, FROM_EMAIL, [to_email])
+    message.content_subtype = 'html'
+    return message
+
+
+def build_newsletter_email_message(template, to_email):
+    return NewsletterEmailMessage(
+        template, to_email, unsubscribe_url=get_unsubscribe_url(to_email)
+    )
+
+
+def measure(build_message):
+    start = time.process_time()
+
+    for i in range(MESSAGES):
+        message = build_message(f'subscriber{i}@example.com')
+        # This is what the SMTP backend does for each message
+        message.message().as_bytes(linesep='\r\n')
+
+    return (time.process_time() - start) / MESSAGES * 1000000
+
+
+def main():
+    template = NewsletterMessageTemplate(SUBJECT, HTML, FROM_EMAIL)
+
+    before = measure(build_email_message)
+    after = measure(
+        lambda to_email: build_newsletter_email_message(template, to_email)
+    )
+
+    print(f'Body size: {len(HTML.encode()) / 1024:.0f} KB')
+    print(f'EmailMessage:           {before:8.1f} us/message')
+    print(f'NewsletterEmailMessage: {after:8.1f} us/message')
+    print(f'Speedup:                {before / after:8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""
+Measures the number of verification emails that are rendered per second
+with the templates rendered for each email and with the cached templates
+
+Run from the root of the repository:
+
+    python benchmarks/verification_email.py
+"""
+import os
+import sys
+import time
+import uuid
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'test_project.settings')
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.mail import EmailMultiAlternatives  # noqa: E402
+
+from newsfeed.app_settings import NEWSFEED_SITE_BASE_URL  # noqa: E402
+from newsfeed.utils.send_verification import (  # noqa: E402
+    get_subscription_verification_email,
+    render_verification_email,
+)
+
+
+MESSAGES = 2000
+
+
+def get_verification_url():
+    return f'/newsfeed/subscribe/confirm/{uuid.uuid4()}/'
+
+
+def build_rendered_email(verification_url, to_email):
+    subject, text_body, html_body = render_verification_email(
+        NEWSFEED_SITE_BASE_URL, verification_url
+    )
+    message = EmailMultiAlternatives(
+        subject, text_body, settings.EMAIL_HOST_USER, [to_email]
+    )
+    message.attach_alternative(html_body, 'text/html')
+    return message
+
+
+def measure(build_message):
+    start = time.process_time()
+
+    for i in range(MESSAGES):
+        build_message(get_verification_url(), f'subscriber{i}@example.com')
+
+    return MESSAGES / (time.process_time() - start)
+
+
+def main():
+    # Warm up the template loaders
+    build_rendered_email(get_verification_url(), 'warmup@example.com')
+
+    before = measure(build_rendered_email)
+    after = measure(get_subscription_verification_email)
+
+    print(f'Rendered templates: {before:10.0f} emails/s')
+    print(f'Cached templates:   {after:10.0f} emails/s')
+    print(f'Speedup:            {after / before:10.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,32 @@
 from django.contrib import admin, messages
+from django.db.models import Count, Q
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 
-from .models import Issue, Newsletter, Post, PostCategory, Subscriber
-from newsfeed.utils.send_newsletters import send_email_newsletter
+from .constants import DELIVERY_FAILED, DELIVERY_SENT
+from .models import (
+    Issue,
+    Newsletter,
+    NewsletterDelivery,
+    NewsletterJob,
+    Post,
+    PostCategory,
+    Subscriber,
+)
+from newsfeed.utils.newsletter_jobs import enqueue_newsletters
+from newsfeed.utils.page_cache import invalidate_page_cache
+from newsfeed.utils.subscriber_export import (
+    SUBSCRIBER_EXPORT_CONTENT_TYPES,
+    stream_subscribers,
+)
+
+
+def format_delivery_progress(newsletter):
+    progress = newsletter.get_delivery_progress()
+    return (
+        f'{progress["sent"]} sent, {progress["failed"]} failed, '
+        f'{progress["abandoned"]} abandoned, {progress["remaining"]} remaining'
+    )
 
 
 class PostInline(admin.TabularInline):
@@ -28,7 +53,11 @@ class IssueAdmin(admin.ModelAdmin):
     actions = ('publish_issues', 'make_draft',)
 
     def publish_issues(self, request, queryset):
-        updated = queryset.update(is_draft=False)
+        # update() does not set ``auto_now`` fields, ``updated_at`` is
+        # changed so that the cached content of the issues is refreshed,
+        # update() does not send signals so the page cache is cleared here
+        updated = queryset.update(is_draft=False, updated_at=timezone.now())
+        invalidate_page_cache()
         messages.add_message(
             request,
             messages.SUCCESS,
@@ -38,7 +67,8 @@ class IssueAdmin(admin.ModelAdmin):
     publish_issues.short_description = 'Publish issues now'
 
     def make_draft(self, request, queryset):
-        updated = queryset.update(is_draft=True)
+        updated = queryset.update(is_draft=True, updated_at=timezone.now())
+        invalidate_page_cache()
         messages.add_message(
             request,
             messages.SUCCESS,
@@ -52,31 +82,98 @@ class NewsletterAdmin(admin.ModelAdmin):
     list_select_related = ('issue',)
     date_hierarchy = 'schedule'
     list_display = (
-        'subject', 'issue', 'is_sent', 'schedule',
+        'subject', 'issue', 'is_sent', 'is_sending', 'schedule',
     )
     list_filter = ('is_sent',)
     search_fields = (
         'subject', 'issue__short_description',
         'issue__title',
     )
-    readonly_fields = ('created_at', 'updated_at',)
+    readonly_fields = (
+        'delivery_progress', 'lease_owner', 'lease_expires_at',
+        'created_at', 'updated_at',
+    )
     sortable_by = ('schedule',)
     autocomplete_fields = ('issue',)
 
     actions = ('send_newsletters',)
 
+    def is_sending(self, obj):
+        return obj.is_sending
+
+    is_sending.boolean = True
+
+    def delivery_progress(self, obj):
+        if not obj.pk:
+            return '-'
+
+        return format_delivery_progress(obj)
+
     def send_newsletters(self, request, queryset):
-        # This should always be overridden to use a task
-        send_email_newsletter(newsletters=queryset, respect_schedule=False)
+        # Newsletters are sent by the ``newsfeed_worker`` command
+        jobs = enqueue_newsletters(queryset, respect_schedule=False)
         messages.add_message(
             request,
             messages.SUCCESS,
-            'Sending selected newsletters(s) to the subscribers',
+            f'Queued {len(jobs)} newsletter(s) to be sent to the subscribers',
         )
 
     send_newsletters.short_description = 'Send newsletters'
 
 
+class NewsletterDeliveryAdmin(admin.ModelAdmin):
+    list_select_related = ('newsletter', 'subscriber',)
+    list_display = (
+        'subscriber', 'newsletter',
+        'status', 'attempts', 'next_attempt_at', 'updated_at',
+    )
+    list_filter = ('status', 'newsletter',)
+    search_fields = ('subscriber__email_address',)
+    readonly_fields = ('updated_at',)
+    raw_id_fields = ('newsletter', 'subscriber',)
+
+
+class NewsletterJobAdmin(admin.ModelAdmin):
+    list_select_related = ('newsletter',)
+    list_display = (
+        'newsletter', 'status', 'sent', 'failed',
+        'created_at', 'started_at', 'finished_at',
+    )
+    list_filter = ('status',)
+    search_fields = ('newsletter__subject',)
+    readonly_fields = (
+        'newsletter', 'respect_schedule', 'status',
+        'worker', 'lease_expires_at', 'sent_emails', 'delivery_progress',
+        'error', 'created_at', 'started_at', 'finished_at',
+    )
+
+    def get_queryset(self, request):
+        # Progress is counted from the delivery log,
+        # which is updated after every batch
+        return super().get_queryset(request).annotate(
+            sent=Count(
+                'newsletter__deliveries',
+                filter=Q(newsletter__deliveries__status=DELIVERY_SENT)
+            ),
+            failed=Count(
+                'newsletter__deliveries',
+                filter=Q(newsletter__deliveries__status=DELIVERY_FAILED)
+            ),
+        )
+
+    def has_add_permission(self, request):
+        return False
+
+    def sent(self, obj):
+        return obj.sent
+
+    def failed(self, obj):
+        return obj.failed
+
+    def delivery_progress(self, obj):
+        return format_delivery_progress(obj.newsletter)
+
+
 class PostAdmin(admin.ModelAdmin):
     list_select_related = ('issue', 'category',)
     list_display = (
@@ -95,7 +192,10 @@ class PostAdmin(admin.ModelAdmin):
     actions = ('hide_post', 'make_post_visible',)
 
     def hide_post(self, request, queryset):
-        updated = queryset.update(is_visible=False)
+        # update() does not set ``auto_now`` fields, ``updated_at`` is
+        # changed so that the cached content of the issues is refreshed
+        updated = queryset.update(is_visible=False, updated_at=timezone.now())
+        invalidate_page_cache()
         messages.add_message(
             request,
             messages.SUCCESS,
@@ -105,7 +205,8 @@ class PostAdmin(admin.ModelAdmin):
     hide_post.short_description = 'Hide posts from issue'
 
     def make_post_visible(self, request, queryset):
-        updated = queryset.update(is_visible=True)
+        updated = queryset.update(is_visible=True, updated_at=timezone.now())
+        invalidate_page_cache()
         messages.add_message(
             request,
             messages.SUCCESS,
@@ -121,6 +222,7 @@ class PostCategoryAdmin(admin.ModelAdmin):
 
 
 class SubscriberAdmin(admin.ModelAdmin):
+    date_hierarchy = 'created_at'
     list_display = (
         'email_address', 'subscribed',
         'verified', 'token_expired',
@@ -128,15 +230,42 @@ class SubscriberAdmin(admin.ModelAdmin):
     )
     list_filter = (
         'subscribed', 'verified',
-        'verification_sent_date',
+        'created_at', 'verification_sent_date',
     )
     search_fields = ('email_address',)
     readonly_fields = ('created_at',)
     exclude = ('token',)
 
+    actions = ('export_subscribers_csv', 'export_subscribers_jsonl',)
+
+    @staticmethod
+    def export_subscribers(queryset, file_format):
+        response = StreamingHttpResponse(
+            stream_subscribers(queryset, file_format),
+            content_type=SUBSCRIBER_EXPORT_CONTENT_TYPES[file_format],
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="subscribers.{file_format}"'
+        )
+        return response
+
+    def export_subscribers_csv(self, request, queryset):
+        return self.export_subscribers(queryset, 'csv')
+
+    export_subscribers_csv.short_description = 'Export subscribers as CSV'
+
+    def export_subscribers_jsonl(self, request, queryset):
+        return self.export_subscribers(queryset, 'jsonl')
+
+    export_subscribers_jsonl.short_description = (
+        'Export subscribers as JSON Lines'
+    )
+
 
 admin.site.register(Issue, IssueAdmin)
 admin.site.register(Newsletter, NewsletterAdmin)
+admin.site.register(NewsletterDelivery, NewsletterDeliveryAdmin)
+admin.site.register(NewsletterJob, NewsletterJobAdmin)
 admin.site.register(Post, PostAdmin)
 admin.site.register(PostCategory, PostCategoryAdmin)
 admin.site.register(Subscriber, SubscriberAdmin)
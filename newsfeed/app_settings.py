@@ -8,6 +8,59 @@ NEWSFEED_EMAIL_BATCH_WAIT = getattr(
 NEWSFEED_EMAIL_BATCH_SIZE = getattr(
     settings, 'NEWSFEED_EMAIL_BATCH_SIZE', 0
 )
+NEWSFEED_EMAIL_CONNECTIONS = getattr(
+    settings, 'NEWSFEED_EMAIL_CONNECTIONS', 1
+)
+NEWSFEED_EMAIL_SENDER_CLASS = getattr(
+    settings, 'NEWSFEED_EMAIL_SENDER_CLASS',
+    'newsfeed.utils.send_newsletters.NewsletterEmailSender'
+)
+NEWSFEED_EMAIL_PROCESSES = getattr(
+    settings, 'NEWSFEED_EMAIL_PROCESSES', 1
+)
+NEWSFEED_EMAIL_RATE_LIMIT = getattr(
+    settings, 'NEWSFEED_EMAIL_RATE_LIMIT', 0
+)
+NEWSFEED_EMAIL_RATE_LIMIT_BURST = getattr(
+    settings, 'NEWSFEED_EMAIL_RATE_LIMIT_BURST', 0
+)
+NEWSFEED_EMAIL_RATE_LIMITER = getattr(
+    settings, 'NEWSFEED_EMAIL_RATE_LIMITER',
+    'newsfeed.utils.rate_limit.TokenBucketRateLimiter'
+)
+NEWSFEED_EMAIL_LEASE_SECONDS = getattr(
+    settings, 'NEWSFEED_EMAIL_LEASE_SECONDS', 300
+)
+NEWSFEED_EMAIL_MAX_ATTEMPTS = getattr(
+    settings, 'NEWSFEED_EMAIL_MAX_ATTEMPTS', 3
+)
+NEWSFEED_EMAIL_RETRY_BACKOFF = getattr(
+    settings, 'NEWSFEED_EMAIL_RETRY_BACKOFF', 10
+)
+NEWSFEED_EMAIL_RETRY_BACKOFF_MAX = getattr(
+    settings, 'NEWSFEED_EMAIL_RETRY_BACKOFF_MAX', 300
+)
+NEWSFEED_CACHE_ALIAS = getattr(
+    settings, 'NEWSFEED_CACHE_ALIAS', 'default'
+)
+NEWSFEED_NEWSLETTER_CACHE_TIMEOUT = getattr(
+    settings, 'NEWSFEED_NEWSLETTER_CACHE_TIMEOUT', 60 * 60 * 24
+)
+NEWSFEED_FEED_CACHE_TIMEOUT = getattr(
+    settings, 'NEWSFEED_FEED_CACHE_TIMEOUT', 86400
+)
+NEWSFEED_PAGE_CACHE_TIMEOUT = getattr(
+    settings, 'NEWSFEED_PAGE_CACHE_TIMEOUT', 0
+)
+NEWSFEED_CACHE_CONTROL = getattr(
+    settings, 'NEWSFEED_CACHE_CONTROL', {}
+)
+NEWSFEED_ISSUE_LIST_PAGINATION = getattr(
+    settings, 'NEWSFEED_ISSUE_LIST_PAGINATION', 'page'
+)
+NEWSFEED_VERIFICATION_EMAIL_OUTBOX = getattr(
+    settings, 'NEWSFEED_VERIFICATION_EMAIL_OUTBOX', False
+)
 NEWSFEED_EMAIL_CONFIRMATION_EXPIRE_DAYS = getattr(
     settings, 'NEWSFEED_EMAIL_CONFIRMATION_EXPIRE_DAYS', 3
 )
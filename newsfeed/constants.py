@@ -8,3 +8,31 @@ ISSUE_TYPE_CHOICES = (
     (WEEKLY_ISSUE, 'Weekly Issue'),
     (MONTHLY_ISSUE, 'Monthly Issue'),
 )
+
+
+DELIVERY_SENT = 1
+DELIVERY_FAILED = 2
+DELIVERY_ABANDONED = 3
+
+
+DELIVERY_STATUS_CHOICES = (
+    (DELIVERY_SENT, 'Sent'),
+    (DELIVERY_FAILED, 'Failed'),
+    (DELIVERY_ABANDONED, 'Abandoned'),
+)
+
+
+JOB_QUEUED = 1
+JOB_RUNNING = 2
+JOB_COMPLETED = 3
+JOB_FAILED = 4
+JOB_SKIPPED = 5
+
+
+JOB_STATUS_CHOICES = (
+    (JOB_QUEUED, 'Queued'),
+    (JOB_RUNNING, 'Running'),
+    (JOB_COMPLETED, 'Completed'),
+    (JOB_FAILED, 'Failed'),
+    (JOB_SKIPPED, 'Skipped'),
+)
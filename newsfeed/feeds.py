@@ -0,0 +1,97 @@
+from django.contrib.syndication.views import Feed
+from django.db.models import Prefetch
+from django.template.loader import render_to_string
+from django.urls import reverse_lazy
+from django.utils.feedgenerator import Atom1Feed
+from django.views.decorators.http import condition
+
+from .models import Issue, Post
+from .querysets import get_content_version, group_posts_by_category
+from .utils.render_cache import get_rendered_feed_items
+
+
+class LatestIssuesFeed(Feed):
+    """RSS feed of the latest released issues with their posts"""
+    title = 'Latest Issues'
+    link = reverse_lazy('newsfeed:issue_list')
+    description = 'The latest released issues of the newsletter'
+    item_template = 'newsfeed/feed_issue_description.html'
+    item_count = 20
+
+    def __call__(self, request, *args, **kwargs):
+        etag, last_modified = Issue.objects.released().get_validators()
+
+        def get_feed_response(request, *args, **kwargs):
+            response = super(LatestIssuesFeed, self).__call__(
+                request, *args, **kwargs
+            )
+            # ``Last-Modified`` of the feed only includes the issues
+            # in the feed, it is replaced with the one of the validators
+            del response['Last-Modified']
+            return response
+
+        return condition(
+            etag_func=lambda request, *args, **kwargs: etag,
+            last_modified_func=lambda request, *args, **kwargs: last_modified,
+        )(get_feed_response)(request, *args, **kwargs)
+
+    @staticmethod
+    def get_item_version(issue):
+        """
+        Returns the content version of an issue from the prefetched posts
+        """
+        posts = issue.posts.all()
+        posts_updated_at = max(
+            (post.updated_at for post in posts), default=None
+        )
+
+        return get_content_version(
+            issue.updated_at, posts_updated_at, len(posts)
+        )
+
+    def render_item(self, issue):
+        posts = issue.posts.all()
+        return render_to_string(
+            self.item_template,
+            {
+                'issue': issue,
+                'posts': posts,
+                'category_list': group_posts_by_category(posts),
+            },
+        )
+
+    def items(self):
+        prefetch_posts = Post.objects.visible().ordered_by_category()
+        issues = list(
+            Issue.objects.released().prefetch_related(
+                Prefetch('posts', queryset=prefetch_posts)
+            )[:self.item_count]
+        )
+        rendered_items = get_rendered_feed_items(
+            issues, self.get_item_version, self.render_item
+        )
+
+        # the feed instance is shared by the requests,
+        # the rendered items are stored on the issues
+        for issue in issues:
+            issue.rendered_feed_item = rendered_items[issue.id]
+
+        return issues
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.rendered_feed_item
+
+    def item_pubdate(self, item):
+        return item.publish_date
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+
+class LatestIssuesAtomFeed(LatestIssuesFeed):
+    """Atom feed of the latest released issues with their posts"""
+    feed_type = Atom1Feed
+    subtitle = LatestIssuesFeed.description
@@ -1,5 +1,10 @@
 from django import forms
 
+from .utils.email_address import normalize_email_address
+
 
 class SubscriberEmailForm(forms.Form):
     email_address = forms.EmailField()
+
+    def clean_email_address(self):
+        return normalize_email_address(self.cleaned_data['email_address'])
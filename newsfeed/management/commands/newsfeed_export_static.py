@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from newsfeed.utils.static_export import StaticSiteExporter
+
+
+class Command(BaseCommand):
+    help = 'Exports the issue pages to static html files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'output_dir',
+            help='Directory of the static site',
+        )
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=1,
+            help='Number of worker processes that render the issue pages',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Render all the pages even if their content did not change',
+        )
+
+    def handle(self, *args, **options):
+        manifest = StaticSiteExporter(
+            options['output_dir'],
+            processes=options['processes'],
+            force=options['force'],
+        ).export()
+        self.stdout.write(
+            f'Rendered {manifest["rendered_issues"]} issue page(s), '
+            f'{len(manifest["changed"])} file(s) changed, '
+            f'{len(manifest["removed"])} file(s) removed'
+        )
@@ -0,0 +1,117 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from newsfeed.utils.subscriber_export import (
+    SUBSCRIBER_EXPORT_CONTENT_TYPES,
+    filter_subscribers,
+    stream_subscribers,
+)
+
+
+def boolean(value):
+    if value.lower() in ('true', 'yes', '1'):
+        return True
+    if value.lower() in ('false', 'no', '0'):
+        return False
+
+    raise ValueError(value)
+
+
+def date_or_datetime(value):
+    date_time = parse_datetime(value)
+
+    if date_time is None:
+        date = parse_date(value)
+
+        if date is None:
+            raise ValueError(value)
+
+        date_time = timezone.datetime(date.year, date.month, date.day)
+
+    if timezone.is_naive(date_time):
+        date_time = timezone.make_aware(date_time)
+
+    return date_time
+
+
+class Command(BaseCommand):
+    help = 'Exports the subscribers to a CSV or JSON Lines file'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='File to write the export to, "-" writes to stdout',
+        )
+        parser.add_argument(
+            '--format',
+            choices=sorted(SUBSCRIBER_EXPORT_CONTENT_TYPES),
+            default='csv',
+            help='Format of the export',
+        )
+        parser.add_argument(
+            '--subscribed',
+            type=boolean,
+            help='Only export subscribers with this subscribed status',
+        )
+        parser.add_argument(
+            '--verified',
+            type=boolean,
+            help='Only export subscribers with this verified status',
+        )
+        parser.add_argument(
+            '--created-after',
+            type=date_or_datetime,
+            help='Only export subscribers created on or after this date',
+        )
+        parser.add_argument(
+            '--created-before',
+            type=date_or_datetime,
+            help='Only export subscribers created before this date',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Number of rows fetched from the database at a time',
+        )
+
+    def write_export(self, write, queryset, options):
+        count = 0
+
+        for line in stream_subscribers(
+            queryset, options['format'], options['chunk_size']
+        ):
+            write(line)
+            count += 1
+
+        return count
+
+    def handle(self, *args, **options):
+        queryset = filter_subscribers(
+            subscribed=options['subscribed'],
+            verified=options['verified'],
+            created_after=options['created_after'],
+            created_before=options['created_before'],
+        )
+
+        if options['path'] == '-':
+            self.write_export(
+                lambda line: self.stdout.write(line, ending=''),
+                queryset, options
+            )
+            return
+
+        try:
+            with open(
+                options['path'], 'w', newline='', encoding='utf-8'
+            ) as f:
+                count = self.write_export(f.write, queryset, options)
+        except OSError as e:
+            raise CommandError(e)
+
+        if options['format'] == 'csv':
+            # the header row
+            count -= 1
+
+        self.stdout.write(f'Exported {count} subscriber(s)')
@@ -0,0 +1,85 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from newsfeed.utils.subscriber_import import (
+    SubscriberImporter,
+    read_csv_email_addresses,
+    read_jsonl_email_addresses,
+)
+
+
+READERS = {
+    'csv': read_csv_email_addresses,
+    'jsonl': read_jsonl_email_addresses,
+}
+
+
+class Command(BaseCommand):
+    help = 'Imports subscribers from a CSV or JSON Lines file'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='CSV file with a header row or JSON Lines file',
+        )
+        parser.add_argument(
+            '--format',
+            choices=sorted(READERS),
+            help='Format of the file, defaults to the file extension',
+        )
+        parser.add_argument(
+            '--column',
+            default='email_address',
+            help='Name of the email address column or key',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Number of email addresses imported with each query',
+        )
+        parser.add_argument(
+            '--verified',
+            action='store_true',
+            help='Import the subscribers as verified and subscribed',
+        )
+
+    def write_progress(self, stats):
+        self.stdout.write(
+            f'Processed {stats["processed"]} email address(es) '
+            f'({self.importer.rate:.0f}/s)'
+        )
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or os.path.splitext(
+            options['path']
+        )[1].lstrip('.').lower()
+
+        if file_format not in READERS:
+            raise CommandError(
+                f'Unknown file format "{file_format}", use --format'
+            )
+
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be a positive number')
+
+        self.importer = SubscriberImporter(
+            chunk_size=options['chunk_size'],
+            verified=options['verified'],
+            progress=self.write_progress,
+        )
+
+        try:
+            with open(options['path'], newline='', encoding='utf-8') as f:
+                stats = self.importer.import_subscribers(
+                    READERS[file_format](f, column=options['column'])
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(e)
+
+        self.stdout.write(
+            f'Created {stats["created"]} subscriber(s), '
+            f'{stats["existing"]} existing, {stats["duplicate"]} duplicate, '
+            f'{stats["invalid"]} invalid ({self.importer.rate:.0f}/s)'
+        )
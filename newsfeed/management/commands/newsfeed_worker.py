@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from newsfeed.utils.newsletter_jobs import process_newsletter_jobs
+
+
+class Command(BaseCommand):
+    help = 'Sends the newsletters queued from the admin panel'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Stop when there are no queued newsletters left',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=5,
+            help='Seconds to wait before checking an empty queue again',
+        )
+
+    def handle(self, *args, **options):
+        processed = process_newsletter_jobs(
+            once=options['once'], sleep=options['sleep']
+        )
+        self.stdout.write(f'Processed {processed} newsletter job(s)')
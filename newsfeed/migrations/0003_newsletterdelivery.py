@@ -0,0 +1,29 @@
+# Generated by Django 4.0.10 on 2026-10-18 20:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsfeed', '0002_alter_issue_issue_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NewsletterDelivery',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'Sent'), (2, 'Failed')])),
+                ('attempts', models.PositiveSmallIntegerField(default=1)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('newsletter', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='newsfeed.newsletter')),
+                ('subscriber', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='newsfeed.subscriber')),
+            ],
+            options={
+                'verbose_name_plural': 'Newsletter deliveries',
+                'unique_together': {('newsletter', 'subscriber')},
+            },
+        ),
+    ]
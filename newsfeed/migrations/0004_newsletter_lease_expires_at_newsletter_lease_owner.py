@@ -0,0 +1,23 @@
+# Generated by Django 4.0.10 on 2026-10-18 20:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsfeed', '0003_newsletterdelivery'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsletter',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='newsletter',
+            name='lease_owner',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.0.10 on 2026-10-18 20:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsfeed', '0004_newsletter_lease_expires_at_newsletter_lease_owner'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NewsletterJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('respect_schedule', models.BooleanField(default=False)),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'Queued'), (2, 'Running'), (3, 'Completed'), (4, 'Failed')], default=1)),
+                ('worker', models.CharField(blank=True, default='', max_length=255)),
+                ('sent_emails', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('newsletter', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='newsfeed.newsletter')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
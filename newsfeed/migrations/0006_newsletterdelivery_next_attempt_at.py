@@ -0,0 +1,23 @@
+# Generated by Django 4.0.10 on 2026-10-18 20:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsfeed', '0005_newsletterjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsletterdelivery',
+            name='next_attempt_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='newsletterdelivery',
+            name='status',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'Sent'), (2, 'Failed'), (3, 'Abandoned')]),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.0.10 on 2026-10-18 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsfeed', '0006_newsletterdelivery_next_attempt_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(condition=models.Q(('is_draft', False)), fields=['-issue_number', '-publish_date'], name='newsfeed_issue_released_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_visible', True)), fields=['issue', 'order'], name='newsfeed_post_visible_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscriber',
+            index=models.Index(condition=models.Q(('subscribed', True), ('verified', True)), fields=['id'], name='newsfeed_subscribed_idx'),
+        ),
+    ]
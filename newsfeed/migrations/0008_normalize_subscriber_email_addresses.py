@@ -0,0 +1,41 @@
+from django.db import migrations
+
+from newsfeed.utils.email_address import normalize_email_address
+
+
+def normalize_email_addresses(apps, schema_editor):
+    Subscriber = apps.get_model('newsfeed', 'Subscriber')
+    # only the email addresses with an uppercase letter after the "@"
+    subscribers = list(
+        Subscriber.objects.filter(
+            email_address__regex=r'@.*[A-Z]'
+        ).values_list('id', 'email_address')
+    )
+
+    for subscriber_id, email_address in subscribers:
+        normalized = normalize_email_address(email_address)
+
+        if normalized == email_address:
+            continue
+
+        subscriber = Subscriber.objects.filter(id=subscriber_id)
+        existing = Subscriber.objects.filter(email_address=normalized)
+
+        if not existing.exists():
+            subscriber.update(email_address=normalized)
+        elif existing.filter(subscribed=True).exists():
+            # the duplicate would receive every newsletter twice
+            subscriber.update(subscribed=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsfeed', '0007_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            normalize_email_addresses, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.0.10 on 2026-10-18 21:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsfeed', '0008_normalize_subscriber_email_addresses'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsletterjob',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='newsletterjob',
+            name='status',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'Queued'), (2, 'Running'), (3, 'Completed'), (4, 'Failed'), (5, 'Skipped')], default=1),
+        ),
+    ]
@@ -1,14 +1,39 @@
+import functools
 import uuid
 
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.urls import reverse
 from django.utils import timezone
 
 from . import signals
-from .app_settings import NEWSFEED_EMAIL_CONFIRMATION_EXPIRE_DAYS
-from .constants import ISSUE_TYPE_CHOICES, WEEKLY_ISSUE
-from .querysets import IssueQuerySet, SubscriberQuerySet, PostQuerySet
+from .app_settings import (
+    NEWSFEED_EMAIL_CONFIRMATION_EXPIRE_DAYS,
+    NEWSFEED_VERIFICATION_EMAIL_OUTBOX,
+)
+from .constants import (
+    DELIVERY_ABANDONED,
+    DELIVERY_FAILED,
+    DELIVERY_SENT,
+    DELIVERY_STATUS_CHOICES,
+    ISSUE_TYPE_CHOICES,
+    JOB_QUEUED,
+    JOB_STATUS_CHOICES,
+    WEEKLY_ISSUE,
+)
+from .querysets import (
+    IssueQuerySet,
+    NewsletterDeliveryQuerySet,
+    NewsletterJobQuerySet,
+    NewsletterQuerySet,
+    PostCategoryQuerySet,
+    PostQuerySet,
+    SubscriberQuerySet,
+    get_content_version,
+)
+from .utils.email_address import normalize_email_address
 from .utils.send_verification import send_subscription_verification_email
+from .utils.verification_outbox import verification_outbox
+from .utils.unsubscribe import get_unsubscribe_url
 
 
 class Issue(models.Model):
@@ -31,6 +56,15 @@ class Issue(models.Model):
 
     class Meta:
         ordering = ['-issue_number', '-publish_date']
+        indexes = [
+            # released issues are filtered with ``publish_date``
+            # and ordered by ``-issue_number``
+            models.Index(
+                fields=['-issue_number', '-publish_date'],
+                condition=models.Q(is_draft=False),
+                name='newsfeed_issue_released_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -45,11 +79,26 @@ class Issue(models.Model):
             kwargs={'issue_number': self.issue_number}
         )
 
+    def get_content_version(self):
+        """
+        Returns a version of the content of the issue which changes
+        when the issue or any of its posts is added, changed or removed
+        """
+        posts = self.posts.aggregate(
+            updated_at=models.Max('updated_at'), count=models.Count('id')
+        )
+
+        return get_content_version(
+            self.updated_at, posts['updated_at'], posts['count']
+        )
+
 
 class PostCategory(models.Model):
     name = models.CharField(max_length=255)
     order = models.PositiveIntegerField(default=0)
 
+    objects = PostCategoryQuerySet.as_manager()
+
     class Meta:
         verbose_name_plural = 'Post categories'
         ordering = ['order']
@@ -86,6 +135,14 @@ class Post(models.Model):
 
     class Meta:
         ordering = ['order', '-created_at']
+        indexes = [
+            # issues display their visible posts
+            models.Index(
+                fields=['issue', 'order'],
+                condition=models.Q(is_visible=True),
+                name='newsfeed_post_visible_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -101,13 +158,47 @@ class Newsletter(models.Model):
     schedule = models.DateTimeField(blank=True, null=True)
     is_sent = models.BooleanField(default=False)
     sent_at = models.DateTimeField(blank=True, null=True)
+    # Process that is sending the newsletter and until when
+    lease_owner = models.CharField(max_length=255, blank=True, default='')
+    lease_expires_at = models.DateTimeField(blank=True, null=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = NewsletterQuerySet.as_manager()
+
     def __str__(self):
         return self.subject
 
+    @property
+    def is_sending(self):
+        return bool(
+            self.lease_expires_at and self.lease_expires_at > timezone.now()
+        )
+
+    def get_delivery_progress(self):
+        """
+        Returns the number of sent, failed (waiting to be retried),
+        abandoned and remaining emails
+        """
+        progress = self.deliveries.aggregate(
+            sent=models.Count('id', filter=models.Q(status=DELIVERY_SENT)),
+            failed=models.Count('id', filter=models.Q(status=DELIVERY_FAILED)),
+            abandoned=models.Count(
+                'id', filter=models.Q(status=DELIVERY_ABANDONED)
+            ),
+        )
+        progress['remaining'] = Subscriber.objects.subscribed(
+        ).without_deliveries(
+            self.deliveries.exclude(status=DELIVERY_FAILED)
+        ).count()
+
+        return progress
+
+
+# Number of tokens that are tried before the error is raised
+RESET_TOKEN_ATTEMPTS = 10
+
 
 class Subscriber(models.Model):
     email_address = models.EmailField(unique=True)
@@ -120,9 +211,22 @@ class Subscriber(models.Model):
 
     objects = SubscriberQuerySet.as_manager()
 
+    class Meta:
+        indexes = [
+            # newsletters are sent to the subscribed subscribers in ID order
+            models.Index(
+                fields=['id'],
+                condition=models.Q(verified=True, subscribed=True),
+                name='newsfeed_subscribed_idx',
+            ),
+        ]
+
     def __str__(self):
         return self.email_address
 
+    def clean(self):
+        self.email_address = normalize_email_address(self.email_address)
+
     def token_expired(self):
         if not self.verification_sent_date:
             return True
@@ -134,14 +238,42 @@ class Subscriber(models.Model):
         )
         return expiration_date <= timezone.now()
 
-    def reset_token(self):
-        unique_token = str(uuid.uuid4())
+    def reset_token(self, condition=None, **fields):
+        """
+        Saves a new unique token and the given fields with one ``UPDATE``,
+        a new token is generated if the unique constraint fails.
+        Returns ``False`` if the subscriber does not match the condition
+
+        :param condition: Q object that the subscriber must match
+        :param fields: other fields to update with the token
+        """
+        queryset = self.__class__.objects.filter(pk=self.pk)
+
+        if condition is not None:
+            queryset = queryset.filter(condition)
 
-        while self.__class__.objects.filter(token=unique_token).exists():
+        for attempt in range(RESET_TOKEN_ATTEMPTS):
             unique_token = str(uuid.uuid4())
 
-        self.token = unique_token
-        self.save()
+            try:
+                # savepoint so that the transaction can continue on error
+                with transaction.atomic():
+                    updated = queryset.update(token=unique_token, **fields)
+            except IntegrityError:
+                # the token is used by another subscriber
+                if attempt == RESET_TOKEN_ATTEMPTS - 1:
+                    raise
+                continue
+
+            if not updated:
+                return False
+
+            self.token = unique_token
+
+            for field, value in fields.items():
+                setattr(self, field, value)
+
+            return True
 
     def subscribe(self):
         if not self.token_expired():
@@ -175,15 +307,39 @@ class Subscriber(models.Model):
         if sent_date and sent_date >= minutes_before:
             return
 
-        if not created:
-            self.reset_token()
+        now = timezone.now()
+        # the condition is checked again in the database so that
+        # concurrent requests only send one email
+        not_sent_recently = ~models.Q(
+            verification_sent_date__gte=minutes_before
+        )
 
-        self.verification_sent_date = timezone.now()
-        self.save()
+        if created:
+            updated = self.__class__.objects.filter(
+                not_sent_recently, pk=self.pk
+            ).update(verification_sent_date=now)
+            self.verification_sent_date = now
+        else:
+            updated = self.reset_token(
+                condition=not_sent_recently, verification_sent_date=now
+            )
+
+        if not updated:
+            return
+
+        if NEWSFEED_VERIFICATION_EMAIL_OUTBOX:
+            # the token is only sent if the transaction is committed
+            transaction.on_commit(
+                functools.partial(
+                    verification_outbox.put,
+                    self.get_verification_url(), self.email_address
+                )
+            )
+        else:
+            send_subscription_verification_email(
+                self.get_verification_url(), self.email_address
+            )
 
-        send_subscription_verification_email(
-            self.get_verification_url(), self.email_address
-        )
         signals.email_verification_sent.send(
             sender=self.__class__, instance=self
         )
@@ -193,3 +349,67 @@ class Subscriber(models.Model):
             'newsfeed:newsletter_subscription_confirm',
             kwargs={'token': self.token}
         )
+
+    def get_unsubscribe_url(self):
+        return get_unsubscribe_url(self.token)
+
+
+class NewsletterDelivery(models.Model):
+    newsletter = models.ForeignKey(
+        Newsletter,
+        on_delete=models.CASCADE,
+        related_name='deliveries'
+    )
+    subscriber = models.ForeignKey(
+        Subscriber,
+        on_delete=models.CASCADE,
+        related_name='deliveries'
+    )
+    status = models.PositiveSmallIntegerField(
+        choices=DELIVERY_STATUS_CHOICES
+    )
+    attempts = models.PositiveSmallIntegerField(default=1)
+    # failed deliveries are retried after this time
+    next_attempt_at = models.DateTimeField(blank=True, null=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = NewsletterDeliveryQuerySet.as_manager()
+
+    class Meta:
+        verbose_name_plural = 'Newsletter deliveries'
+        unique_together = ('newsletter', 'subscriber')
+
+    def __str__(self):
+        return f'{self.newsletter} - {self.subscriber}'
+
+
+class NewsletterJob(models.Model):
+    newsletter = models.ForeignKey(
+        Newsletter,
+        on_delete=models.CASCADE,
+        related_name='jobs'
+    )
+    respect_schedule = models.BooleanField(default=False)
+    status = models.PositiveSmallIntegerField(
+        choices=JOB_STATUS_CHOICES,
+        default=JOB_QUEUED
+    )
+    worker = models.CharField(max_length=255, blank=True, default='')
+    # renewed by the worker while the job is running
+    lease_expires_at = models.DateTimeField(blank=True, null=True)
+    sent_emails = models.PositiveIntegerField(default=0)
+    # error of a failed job or the reason a job was skipped
+    error = models.TextField(blank=True, default='')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    objects = NewsletterJobQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f'{self.newsletter} ({self.get_status_display()})'
@@ -1,6 +1,37 @@
-from django.db import models
+import hashlib
+import itertools
+import json
+
+import django
+from django.apps import apps
+from django.db import models, transaction
 from django.utils import timezone
 
+from .constants import (
+    DELIVERY_ABANDONED,
+    DELIVERY_FAILED,
+    DELIVERY_SENT,
+    JOB_QUEUED,
+    JOB_RUNNING,
+)
+
+
+def get_content_version(updated_at, posts_updated_at, post_count):
+    """
+    Returns a version of the content of an issue
+
+    :param updated_at: last update of the issue
+    :param posts_updated_at: last update of the posts of the issue
+    :param post_count: number of posts of the issue
+    """
+    version = (
+        f'{updated_at.isoformat()}:'
+        f'{posts_updated_at and posts_updated_at.isoformat()}:'
+        f'{post_count}'
+    )
+
+    return hashlib.md5(version.encode()).hexdigest()
+
 
 class IssueQuerySet(models.QuerySet):
 
@@ -12,6 +43,79 @@ class IssueQuerySet(models.QuerySet):
             publish_date__lte=timezone.now()
         )
 
+    def get_content_versions(self):
+        """
+        Returns a dict of the content version of each issue
+        by issue number which is read with one query
+        """
+        issues = self.order_by().values_list('issue_number', 'updated_at')
+        issues = issues.annotate(
+            posts_updated_at=models.Max('posts__updated_at'),
+            post_count=models.Count('posts'),
+        )
+
+        return {
+            issue_number: get_content_version(
+                updated_at, posts_updated_at, post_count
+            )
+            for issue_number, updated_at, posts_updated_at, post_count
+            in issues
+        }
+
+    def get_validators(self):
+        """
+        Returns an ``(etag, last_modified)`` tuple for the issues
+        and their posts which is read with one aggregate query,
+        returns ``(None, None)`` if there are no issues
+
+        The post categories are shown with the posts, so the version
+        of the categories is also included in the ETag.
+        """
+        values = self.aggregate(
+            updated_at=models.Max('updated_at'),
+            publish_date=models.Max('publish_date'),
+            posts_updated_at=models.Max('posts__updated_at'),
+            issue_count=models.Count('id', distinct=True),
+            post_count=models.Count('posts'),
+        )
+
+        if values['updated_at'] is None:
+            return None, None
+
+        last_modified = max(
+            value for value in (
+                values['updated_at'],
+                values['publish_date'],
+                values['posts_updated_at'],
+            ) if value is not None
+        )
+        categories_version = apps.get_model(
+            'newsfeed', 'PostCategory'
+        ).objects.get_version()
+        version = (
+            f'{last_modified.isoformat()}:'
+            f'{values["issue_count"]}:{values["post_count"]}:'
+            f'{categories_version}'
+        )
+
+        return hashlib.md5(version.encode()).hexdigest(), last_modified
+
+
+class PostCategoryQuerySet(models.QuerySet):
+
+    use_for_related_fields = True
+
+    def get_version(self):
+        """
+        Returns a version of the categories, the categories do not have
+        an update time so the version is a hash of their fields
+        """
+        categories = list(
+            self.order_by('id').values_list('id', 'name', 'order')
+        )
+
+        return hashlib.md5(json.dumps(categories).encode()).hexdigest()
+
 
 class SubscriberQuerySet(models.QuerySet):
 
@@ -20,6 +124,47 @@ class SubscriberQuerySet(models.QuerySet):
     def subscribed(self):
         return self.filter(verified=True, subscribed=True)
 
+    def without_deliveries(self, deliveries):
+        """
+        Excludes the subscribers who have a delivery in ``deliveries``
+
+        This is a correlated ``NOT EXISTS`` that uses the
+        ``(newsletter, subscriber)`` unique index for each subscriber
+        instead of a ``NOT IN`` subquery over all the deliveries.
+
+        :param deliveries: NewsletterDelivery queryset of a newsletter
+        """
+        has_delivery = models.Exists(
+            deliveries.filter(subscriber_id=models.OuterRef('pk'))
+        )
+
+        if django.VERSION < (3, 0):
+            # Django 2.2 can only filter on annotated expressions
+            return self.annotate(
+                has_delivery=has_delivery
+            ).filter(has_delivery=False)
+
+        return self.filter(~has_delivery)
+
+
+def group_posts_by_category(posts):
+    """
+    Groups posts ordered with ``PostQuerySet.ordered_by_category()``
+    and returns a list of ``(category, posts)`` tuples,
+    it is used in the templates in place of ``{% regroup %}``
+
+    :param posts: iterable of Post instances
+    """
+    category_list = []
+
+    for _, group in itertools.groupby(
+        posts, key=lambda post: post.category_id
+    ):
+        group = list(group)
+        category_list.append((group[0].category, group))
+
+    return category_list
+
 
 class PostQuerySet(models.QuerySet):
 
@@ -27,3 +172,211 @@ class PostQuerySet(models.QuerySet):
 
     def visible(self):
         return self.filter(is_visible=True)
+
+    def ordered_by_category(self):
+        """
+        Orders the posts by their category and the order of the posts
+        in the category, posts without a category are the last
+        """
+        return self.select_related('category').order_by(
+            models.F('category__order').asc(nulls_last=True),
+            'category_id',
+            'order',
+            '-created_at',
+        )
+
+
+class NewsletterQuerySet(models.QuerySet):
+
+    use_for_related_fields = True
+
+    def unleased(self):
+        return self.exclude(lease_expires_at__gt=timezone.now())
+
+    def claim(self, owner, lease_seconds):
+        """
+        Claims the first newsletter that is not leased by another process
+        and returns it, returns ``None`` if there is nothing to claim
+
+        Locked rows are skipped so that multiple processes can claim
+        newsletters at the same time, the lease is only taken if it is
+        still free when it is updated.
+
+        :param owner: unique name of the process that claims the newsletter
+        :param lease_seconds: number of seconds until the lease expires
+        """
+        while True:
+            with transaction.atomic():
+                newsletter = self.model.objects.filter(
+                    id__in=self.unleased().values('id')
+                ).select_for_update(skip_locked=True).order_by('id').first()
+
+                if newsletter is None:
+                    return None
+
+                claimed = self.model.objects.filter(
+                    id=newsletter.id
+                ).unleased().update(
+                    lease_owner=owner,
+                    lease_expires_at=timezone.now() + timezone.timedelta(
+                        seconds=lease_seconds
+                    )
+                )
+
+            if claimed:
+                return self.get(id=newsletter.id)
+
+    def renew_lease(self, owner, lease_seconds):
+        """
+        Extends the lease of the newsletters owned by ``owner``,
+        returns ``False`` if the lease was lost
+
+        :param owner: unique name of the process that owns the lease
+        :param lease_seconds: number of seconds until the lease expires
+        """
+        return self.filter(lease_owner=owner).update(
+            lease_expires_at=timezone.now() + timezone.timedelta(
+                seconds=lease_seconds
+            )
+        ) > 0
+
+    def release_lease(self, owner, **fields):
+        """
+        Releases the lease of the newsletters owned by ``owner``
+
+        :param owner: unique name of the process that owns the lease
+        :param fields: other fields to update with the release
+        """
+        return self.filter(lease_owner=owner).update(
+            lease_owner='', lease_expires_at=None, **fields
+        )
+
+
+class NewsletterDeliveryQuerySet(models.QuerySet):
+
+    use_for_related_fields = True
+
+    def sent(self):
+        return self.filter(status=DELIVERY_SENT)
+
+    def failed(self):
+        return self.filter(status=DELIVERY_FAILED)
+
+    def abandoned(self):
+        return self.filter(status=DELIVERY_ABANDONED)
+
+    def due(self):
+        return self.exclude(next_attempt_at__gt=timezone.now())
+
+    def retry_later(self, delay):
+        """
+        Schedules the next attempt of the deliveries
+
+        :param delay: number of seconds until the next attempt
+        """
+        return self.update(
+            next_attempt_at=timezone.now() + timezone.timedelta(seconds=delay)
+        )
+
+    def abandon(self):
+        """Stops retrying the deliveries"""
+        return self.update(status=DELIVERY_ABANDONED, next_attempt_at=None)
+
+    def record(self, newsletter, subscriber_ids, status):
+        """
+        Records the delivery status of a newsletter for a batch of subscribers
+
+        :param newsletter: Newsletter instance that was sent
+        :param subscriber_ids: list of subscriber IDs of the batch
+        :param status: delivery status of the batch
+        """
+        existing_ids = set(
+            self.filter(
+                newsletter=newsletter, subscriber_id__in=subscriber_ids
+            ).values_list('subscriber_id', flat=True)
+        )
+
+        if existing_ids:
+            self.filter(
+                newsletter=newsletter, subscriber_id__in=existing_ids
+            ).update(
+                status=status,
+                attempts=models.F('attempts') + 1,
+                next_attempt_at=None,
+                updated_at=timezone.now()
+            )
+
+        self.bulk_create(
+            [
+                self.model(
+                    newsletter=newsletter,
+                    subscriber_id=subscriber_id,
+                    status=status
+                )
+                for subscriber_id in subscriber_ids
+                if subscriber_id not in existing_ids
+            ],
+            ignore_conflicts=True
+        )
+
+
+class NewsletterJobQuerySet(models.QuerySet):
+
+    use_for_related_fields = True
+
+    def queued(self):
+        return self.filter(status=JOB_QUEUED)
+
+    def claimable(self):
+        """
+        Returns the queued jobs and the running jobs whose lease expired
+        because their worker stopped (e.g. it crashed)
+        """
+        return self.filter(
+            models.Q(status=JOB_QUEUED) | models.Q(
+                status=JOB_RUNNING, lease_expires_at__lte=timezone.now()
+            )
+        )
+
+    def claim(self, worker, lease_seconds):
+        """
+        Claims the oldest claimable job for ``worker`` and returns it,
+        returns ``None`` if the queue is empty
+
+        :param worker: unique name of the worker process
+        :param lease_seconds: number of seconds until the lease expires
+        """
+        while True:
+            with transaction.atomic():
+                job = self.claimable().select_for_update(
+                    skip_locked=True
+                ).order_by('id').first()
+
+                if job is None:
+                    return None
+
+                claimed = self.filter(id=job.id).claimable().update(
+                    status=JOB_RUNNING,
+                    worker=worker,
+                    started_at=timezone.now(),
+                    lease_expires_at=timezone.now() + timezone.timedelta(
+                        seconds=lease_seconds
+                    )
+                )
+
+            if claimed:
+                return self.select_related('newsletter').get(id=job.id)
+
+    def renew_lease(self, worker, lease_seconds):
+        """
+        Extends the lease of the running jobs of ``worker``,
+        returns ``False`` if the lease was lost
+
+        :param worker: unique name of the worker process
+        :param lease_seconds: number of seconds until the lease expires
+        """
+        return self.filter(worker=worker, status=JOB_RUNNING).update(
+            lease_expires_at=timezone.now() + timezone.timedelta(
+                seconds=lease_seconds
+            )
+        ) > 0
@@ -0,0 +1,31 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Issue, Post, PostCategory
+from .utils.page_cache import invalidate_page_cache
+from .utils.render_cache import (
+    invalidate_rendered_feed_items,
+    invalidate_rendered_newsletter,
+    invalidate_rendered_newsletters,
+)
+
+
+@receiver([post_save, post_delete], sender=Issue)
+def invalidate_issue_cache(sender, instance, **kwargs):
+    invalidate_rendered_newsletter(instance.id)
+    invalidate_page_cache()
+
+
+@receiver([post_save, post_delete], sender=Post)
+def invalidate_post_issue_cache(sender, instance, **kwargs):
+    if instance.issue_id:
+        invalidate_rendered_newsletter(instance.issue_id)
+    invalidate_page_cache()
+
+
+@receiver([post_save, post_delete], sender=PostCategory)
+def invalidate_post_category_cache(sender, instance, **kwargs):
+    # categories are shown in the newsletters of all the issues
+    invalidate_rendered_newsletters()
+    invalidate_rendered_feed_items()
+    invalidate_page_cache()
@@ -1,9 +1,14 @@
 from django.urls import path
 
+from .feeds import LatestIssuesAtomFeed, LatestIssuesFeed
 from .views import (
+    IssueDetailAPIView,
     IssueDetailView,
+    IssueListAPIView,
     IssueListView,
+    LatestIssueAPIView,
     LatestIssueView,
+    NewsletterOneClickUnsubscribeView,
     NewsletterSubscribeView,
     NewsletterSubscriptionConfirmView,
     NewsletterUnsubscribeView,
@@ -15,11 +20,29 @@ app_name = 'newsfeed'
 urlpatterns = [
     path('', LatestIssueView.as_view(), name='latest_issue'),
     path('issues/', IssueListView.as_view(), name='issue_list'),
+    path(
+        'issues/page/<int:page>/',
+        IssueListView.as_view(),
+        name='issue_list_page'
+    ),
     path(
         'issues/<slug:issue_number>/',
         IssueDetailView.as_view(),
         name='issue_detail'
     ),
+    path('issues/feed/rss/', LatestIssuesFeed(), name='issue_rss_feed'),
+    path('issues/feed/atom/', LatestIssuesAtomFeed(), name='issue_atom_feed'),
+    path('api/issues/', IssueListAPIView.as_view(), name='issue_list_api'),
+    path(
+        'api/issues/latest/',
+        LatestIssueAPIView.as_view(),
+        name='latest_issue_api'
+    ),
+    path(
+        'api/issues/<int:issue_number>/',
+        IssueDetailAPIView.as_view(),
+        name='issue_detail_api'
+    ),
     path(
         'subscribe/',
         NewsletterSubscribeView.as_view(),
@@ -34,4 +57,9 @@ urlpatterns = [
         NewsletterUnsubscribeView.as_view(),
         name='newsletter_unsubscribe'
     ),
+    path(
+        'unsubscribe/<str:signed_token>/',
+        NewsletterOneClickUnsubscribeView.as_view(),
+        name='newsletter_one_click_unsubscribe'
+    ),
 ]
@@ -0,0 +1,203 @@
+import asyncio
+import logging
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from newsfeed.utils.send_newsletters import NewsletterEmailSender
+
+try:
+    import aiosmtplib
+except ImportError:  # pragma: no cover
+    aiosmtplib = None
+
+try:
+    # asgiref is only installed with Django 3.0 and later
+    from asgiref.sync import async_to_sync, sync_to_async
+except ImportError:  # pragma: no cover
+    async_to_sync = sync_to_async = None
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncNewsletterEmailSender(NewsletterEmailSender):
+    """
+    Sends email newsletters with asyncio
+
+    ``NEWSFEED_EMAIL_CONNECTIONS`` SMTP sessions are kept open at the same
+    time in a single thread, each session sends one batch after another.
+    The SMTP server is configured with django's ``EMAIL_*`` settings.
+    Requires ``aiosmtplib`` and ``asgiref``
+    (``pip install django-newsfeed[async]``).
+    """
+
+    def __init__(self, *args, **kwargs):
+        if aiosmtplib is None or async_to_sync is None:
+            raise ImproperlyConfigured(
+                'aiosmtplib and asgiref are required to use '
+                'AsyncNewsletterEmailSender. '
+                'Install them with "pip install django-newsfeed[async]".'
+            )
+
+        super().__init__(*args, **kwargs)
+
+    @staticmethod
+    def _get_smtp_client():
+        """Returns an SMTP client configured with the email settings"""
+        return aiosmtplib.SMTP(
+            hostname=settings.EMAIL_HOST,
+            port=settings.EMAIL_PORT,
+            username=settings.EMAIL_HOST_USER or None,
+            password=settings.EMAIL_HOST_PASSWORD or None,
+            use_tls=settings.EMAIL_USE_SSL,
+            start_tls=settings.EMAIL_USE_TLS,
+            timeout=settings.EMAIL_TIMEOUT,
+        )
+
+    async def _send_batch_async(
+        self, smtp, subscriber_ids, messages, newsletter
+    ):
+        """
+        Sends a batch of email messages with an SMTP session and returns
+        the IDs of the subscribers the emails were sent to and failed to
+
+        :param smtp: SMTP client of the session
+        :param subscriber_ids: subscriber IDs of the messages
+        :param messages: list of EmailMessage
+        :param newsletter: Newsletter instance that is being sent
+        """
+        issue_number = newsletter.issue.issue_number
+        sent_ids, failed_ids = [], []
+
+        # Wait until the rate limiter allows sending this batch
+        # without blocking the other sessions
+        await sync_to_async(
+            self.rate_limiter.acquire, thread_sensitive=False
+        )(len(messages))
+
+        for index, message in enumerate(messages):
+            subscriber_id = subscriber_ids[index]
+
+            try:
+                if not smtp.is_connected:
+                    await smtp.connect()
+            except Exception as e:
+                # the rest of the batch can not be sent without a session
+                smtp.close()
+                failed_ids.extend(subscriber_ids[index:])
+                logger.error(
+                    'An error occurred while connecting to send '
+                    'newsletters for ISSUE # %s '
+                    'newsletter ID: %s '
+                    'EXCEPTION: %s',
+                    issue_number, newsletter.id, e
+                )
+                break
+
+            try:
+                await smtp.sendmail(
+                    message.from_email,
+                    message.recipients(),
+                    message.message().as_bytes(linesep='\r\n')
+                )
+            except Exception as e:
+                # the session is opened again for the next message
+                smtp.close()
+                failed_ids.append(subscriber_id)
+                logger.error(
+                    'An error occurred while sending '
+                    'newsletter for ISSUE # %s '
+                    'newsletter ID: %s subscriber ID: %s '
+                    'EXCEPTION: %s',
+                    issue_number, newsletter.id, subscriber_id, e
+                )
+            else:
+                sent_ids.append(subscriber_id)
+
+        logger.info(
+            'Sent %s of %s newsletters in one batch for ISSUE # %s',
+            len(sent_ids), len(messages), issue_number
+        )
+
+        return sent_ids, failed_ids
+
+    @staticmethod
+    async def _close_smtp_client(smtp):
+        """Ends the SMTP session, the connection is closed on errors"""
+        if not smtp.is_connected:
+            return
+
+        try:
+            await smtp.quit()
+        except Exception:
+            smtp.close()
+
+    async def _send_batches_async(self, batches, newsletter):
+        """
+        Sends the batches with concurrent SMTP sessions
+        and returns the number of emails sent
+
+        :param batches: iterable of subscriber ID and EmailMessage lists
+        :param newsletter: Newsletter instance that is being sent
+        """
+        # Only keep a few batches per session in memory
+        batch_queue = asyncio.Queue(maxsize=self.max_connections * 2)
+        # batches are fetched and deliveries are recorded in the
+        # main thread because the database can not be used here
+        get_next_batch = sync_to_async(next, thread_sensitive=True)
+        record_deliveries = sync_to_async(
+            self._record_deliveries, thread_sensitive=True
+        )
+        keep_lease = sync_to_async(self._keep_lease, thread_sensitive=True)
+        sent_emails = 0
+
+        async def renew_lease():
+            # the lease is also renewed while the batches are being sent
+            while await keep_lease(newsletter):
+                await asyncio.sleep(self.lease_seconds / 3)
+
+        async def produce():
+            while True:
+                batch = await get_next_batch(batches, None)
+                await batch_queue.put(batch)
+
+                if batch is None:
+                    return
+
+        async def consume():
+            nonlocal sent_emails
+            smtp = self._get_smtp_client()
+
+            try:
+                while True:
+                    batch = await batch_queue.get()
+
+                    if batch is None:
+                        # let the other sessions stop too
+                        await batch_queue.put(None)
+                        return
+
+                    subscriber_ids, messages = batch
+                    sent_ids, failed_ids = await self._send_batch_async(
+                        smtp, subscriber_ids, messages, newsletter
+                    )
+                    await record_deliveries(newsletter, sent_ids, failed_ids)
+                    sent_emails += len(sent_ids)
+            finally:
+                await self._close_smtp_client(smtp)
+
+        lease_renewal = asyncio.ensure_future(renew_lease())
+
+        try:
+            await asyncio.gather(
+                produce(),
+                *[consume() for _ in range(self.max_connections)]
+            )
+        finally:
+            lease_renewal.cancel()
+
+        return sent_emails
+
+    def _send_newsletter_batches(self, batches, newsletter):
+        return async_to_sync(self._send_batches_async)(batches, newsletter)
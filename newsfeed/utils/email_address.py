@@ -0,0 +1,7 @@
+def normalize_email_address(email_address):
+    """
+    Strips the email address and lowercases the domain part,
+    the local part is kept as it is because it can be case sensitive
+    """
+    local_part, at, domain = email_address.strip().rpartition('@')
+    return local_part + at + domain.lower()
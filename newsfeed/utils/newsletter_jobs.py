@@ -0,0 +1,132 @@
+import logging
+import time
+
+from django.utils import timezone
+
+from newsfeed.app_settings import NEWSFEED_EMAIL_LEASE_SECONDS
+from newsfeed.constants import JOB_COMPLETED, JOB_FAILED, JOB_SKIPPED
+from newsfeed.models import Newsletter, NewsletterJob
+from newsfeed.utils.send_newsletters import (
+    get_lease_owner,
+    send_email_newsletter,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_newsletters(newsletters, respect_schedule=False):
+    """
+    Adds a job to the newsletter queue for each newsletter
+
+    :param newsletters: Newsletter QuerySet
+    :param respect_schedule: if ``True`` newsletters with future schedule
+        will not be sent
+    """
+    return NewsletterJob.objects.bulk_create(
+        [
+            NewsletterJob(
+                newsletter=newsletter,
+                respect_schedule=respect_schedule
+            )
+            for newsletter in newsletters
+        ]
+    )
+
+
+def get_skip_reason(newsletter_id):
+    """
+    Returns the reason a newsletter was not sent by a job
+
+    :param newsletter_id: ID of the Newsletter of the job
+    """
+    newsletter = Newsletter.objects.get(id=newsletter_id)
+
+    if newsletter.is_sending:
+        return f'skipped: newsletter is being sent by {newsletter.lease_owner}'
+
+    if newsletter.is_sent:
+        return 'skipped: newsletter was already sent'
+
+    return 'skipped: newsletter is not scheduled to be sent yet'
+
+
+def run_newsletter_job(job):
+    """
+    Sends the newsletter of a claimed job and saves the result of the job,
+    the lease of the job is renewed while the newsletter is being sent
+
+    :param job: NewsletterJob instance claimed by the worker
+    """
+    logger.info('Running newsletter job ID: %s', job.id)
+    jobs = NewsletterJob.objects.filter(id=job.id)
+
+    def renew_job_lease():
+        jobs.renew_lease(job.worker, NEWSFEED_EMAIL_LEASE_SECONDS)
+
+    try:
+        send_newsletter = send_email_newsletter(
+            newsletters=Newsletter.objects.filter(id=job.newsletter_id),
+            respect_schedule=job.respect_schedule,
+            lease_heartbeat=renew_job_lease
+        )
+    except Exception as e:
+        job.status = JOB_FAILED
+        job.error = str(e)
+        logger.error(
+            'An error occurred while running newsletter job ID: %s '
+            'EXCEPTION: %s',
+            job.id, e
+        )
+    else:
+        sent_email_counts = send_newsletter.sent_email_counts
+
+        # the newsletter was not claimed by the sender
+        if job.newsletter_id not in sent_email_counts:
+            job.status = JOB_SKIPPED
+            job.error = get_skip_reason(job.newsletter_id)
+            logger.info('Newsletter job ID: %s %s', job.id, job.error)
+        else:
+            job.status = JOB_COMPLETED
+            job.sent_emails = sent_email_counts[job.newsletter_id]
+
+    job.finished_at = timezone.now()
+    job.lease_expires_at = None
+
+    # the result is not saved if another worker took over the job
+    if not jobs.filter(worker=job.worker).update(
+        status=job.status,
+        error=job.error,
+        sent_emails=job.sent_emails,
+        finished_at=job.finished_at,
+        lease_expires_at=None,
+    ):
+        logger.error(
+            'Newsletter job ID: %s was taken over by another worker', job.id
+        )
+
+    return job
+
+
+def process_newsletter_jobs(once=False, sleep=5):
+    """
+    Runs the queued newsletter jobs one after another
+
+    :param once: if ``True`` stops when the queue is empty
+    :param sleep: seconds to wait before checking an empty queue again
+    """
+    worker = get_lease_owner()
+    processed = 0
+
+    while True:
+        job = NewsletterJob.objects.claim(
+            worker, NEWSFEED_EMAIL_LEASE_SECONDS
+        )
+
+        if job is not None:
+            run_newsletter_job(job)
+            processed += 1
+        elif once:
+            return processed
+        else:
+            time.sleep(sleep)
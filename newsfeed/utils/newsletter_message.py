@@ -0,0 +1,191 @@
+import copy
+from email.utils import formatdate, make_msgid
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.core.mail.message import (
+    RFC5322_EMAIL_LINE_LENGTH_LIMIT, SafeMIMEText
+)
+from django.core.mail.utils import DNS_NAME
+
+
+# rendered in the newsletter in place of the unsubscribe URL,
+# it is replaced with the URL of each subscriber
+UNSUBSCRIBE_URL_PLACEHOLDER = '__newsfeed_unsubscribe_url__'
+UNSUBSCRIBE_URL_MAX_LENGTH = 256
+
+
+class NewsletterMIMEText(SafeMIMEText):
+    """
+    MIME message that serializes its body only once
+
+    Copies of the message share the serialized body,
+    only their headers are serialized separately.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # serialized body for each line separator
+        self._body_bytes = {}
+        # ``(old, new)`` bytes replaced in the serialized body of a copy
+        self._body_replacements = ()
+        # payload of the serialized body, copies replace their own payload
+        self._body_payload = self._payload
+
+    def as_bytes(self, unixfrom=False, linesep='\n'):
+        if unixfrom:
+            return super().as_bytes(unixfrom=unixfrom, linesep=linesep)
+
+        body = self._body_bytes.get(linesep)
+
+        if body is None:
+            message = copy.copy(self)
+            message._payload = self._body_payload
+            body = SafeMIMEText.as_bytes(message, linesep=linesep).split(
+                linesep.encode() * 2, 1
+            )[1]
+            self._body_bytes[linesep] = body
+
+        for old, new in self._body_replacements:
+            body = body.replace(old, new)
+
+        policy = self.policy.clone(linesep=linesep)
+        headers = b''.join(
+            policy.fold_binary(name, value)
+            for name, value in self.raw_items()
+        )
+
+        return headers + linesep.encode() + body
+
+
+class NewsletterMessageTemplate:
+    """
+    Newsletter email message that is encoded once and copied for each
+    subscriber with only the recipient headers changed
+
+    The unsubscribe URL of each subscriber is spliced into the encoded
+    body in place of ``UNSUBSCRIBE_URL_PLACEHOLDER``, the body is only
+    encoded again for each subscriber if the placeholder can not be found
+    as it is in the encoded body (e.g. quoted-printable encoding).
+
+    :param subject: subject of the newsletter
+    :param html: rendered html of the newsletter
+    :param from_email: email address of the sender
+    :param site_url: URL of the site, used for the List-Unsubscribe header
+    """
+
+    def __init__(self, subject, html, from_email, site_url=''):
+        self.subject = subject
+        self.html = html
+        self.from_email = from_email
+        self.site_url = site_url
+
+        self.mime_message = self._get_encoded_message(html)
+        self.has_unsubscribe_url = UNSUBSCRIBE_URL_PLACEHOLDER in html
+        self.splice_unsubscribe_url = self._can_splice_unsubscribe_url()
+
+    def _can_splice_unsubscribe_url(self):
+        # quoted-printable lines are wrapped and base64 is not readable,
+        # only 7bit and 8bit bodies contain the placeholder as it is
+        encoding = self.mime_message['Content-Transfer-Encoding']
+
+        if encoding not in ('7bit', '8bit'):
+            return False
+
+        # the lines must stay within the limit with the URL in them
+        max_line_length = (
+            RFC5322_EMAIL_LINE_LENGTH_LIMIT - UNSUBSCRIBE_URL_MAX_LENGTH
+        )
+
+        return all(
+            len(line.encode()) <= max_line_length
+            for line in self.html.splitlines()
+            if UNSUBSCRIBE_URL_PLACEHOLDER in line
+        )
+
+    def _get_encoded_message(self, html):
+        mime_message = NewsletterMIMEText(
+            html, 'html', settings.DEFAULT_CHARSET
+        )
+        mime_message['Subject'] = self.subject
+        mime_message['From'] = self.from_email
+
+        return mime_message
+
+    def get_mime_message(self, to_email, unsubscribe_url=None):
+        """
+        Returns a copy of the encoded message for a subscriber
+
+        :param to_email: subscribers email address
+        :param unsubscribe_url: subscribers unsubscribe URL path
+        """
+        if unsubscribe_url and self.has_unsubscribe_url:
+            if self.splice_unsubscribe_url:
+                mime_message = self._copy_encoded_message()
+                # the payload of the copy is used by the other
+                # serializations (``as_string()``, generators),
+                # ``as_bytes()`` splices the URL into the shared body
+                mime_message._payload = mime_message._payload.replace(
+                    UNSUBSCRIBE_URL_PLACEHOLDER, unsubscribe_url
+                )
+                mime_message._body_replacements = (
+                    (
+                        UNSUBSCRIBE_URL_PLACEHOLDER.encode(),
+                        unsubscribe_url.encode()
+                    ),
+                )
+            else:
+                mime_message = self._get_encoded_message(
+                    self.html.replace(
+                        UNSUBSCRIBE_URL_PLACEHOLDER, unsubscribe_url
+                    )
+                )
+        else:
+            mime_message = self._copy_encoded_message()
+
+        mime_message['To'] = to_email
+        mime_message['Date'] = formatdate(
+            localtime=settings.EMAIL_USE_LOCALTIME
+        )
+        mime_message['Message-ID'] = make_msgid(domain=DNS_NAME)
+
+        if unsubscribe_url:
+            # RFC 8058 one-click unsubscribe
+            mime_message['List-Unsubscribe'] = (
+                f'<{self.site_url}{unsubscribe_url}>'
+            )
+            mime_message['List-Unsubscribe-Post'] = (
+                'List-Unsubscribe=One-Click'
+            )
+
+        return mime_message
+
+    def _copy_encoded_message(self):
+        mime_message = copy.copy(self.mime_message)
+        # headers are not shared with the template
+        mime_message._headers = list(self.mime_message._headers)
+
+        return mime_message
+
+
+class NewsletterEmailMessage(EmailMessage):
+    """EmailMessage that uses the encoded message of a template"""
+    content_subtype = 'html'
+
+    def __init__(
+        self, template, to_email, connection=None, unsubscribe_url=None
+    ):
+        super().__init__(
+            subject=template.subject,
+            body=template.html,
+            from_email=template.from_email,
+            to=[to_email],
+            connection=connection
+        )
+        self.template = template
+        self.unsubscribe_url = unsubscribe_url
+
+    def message(self):
+        return self.template.get_mime_message(
+            self.to[0], unsubscribe_url=self.unsubscribe_url
+        )
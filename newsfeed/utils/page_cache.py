@@ -0,0 +1,132 @@
+import math
+import uuid
+from functools import wraps
+
+from django.contrib.messages import get_messages
+from django.db.models import Min
+from django.utils import timezone
+from django.utils.cache import get_cache_key, has_vary_header, learn_cache_key
+from django.views.decorators.csrf import csrf_protect
+
+from newsfeed.app_settings import NEWSFEED_PAGE_CACHE_TIMEOUT
+from newsfeed.utils.render_cache import get_cache
+
+
+# the cached pages are stored with the generation in their key,
+# a new generation is started when the content of the site changes
+PAGE_CACHE_GENERATION_KEY = 'newsfeed:page_cache:gen'
+
+
+def get_next_publish_timeout():
+    """
+    Returns the number of seconds until the next scheduled issue
+    is published, returns ``None`` if no issue is scheduled
+    """
+    from newsfeed.models import Issue
+
+    next_publish_date = Issue.objects.filter(
+        is_draft=False, publish_date__gt=timezone.now()
+    ).aggregate(publish_date=Min('publish_date'))['publish_date']
+
+    if next_publish_date is None:
+        return None
+
+    return math.ceil((next_publish_date - timezone.now()).total_seconds())
+
+
+def get_page_cache_generation():
+    """
+    Returns the current generation of the page cache, the generation
+    expires when the next scheduled issue is published
+    """
+    cache = get_cache()
+    generation = cache.get(PAGE_CACHE_GENERATION_KEY)
+
+    if generation is None:
+        generation = uuid.uuid4().hex
+        cache.set(
+            PAGE_CACHE_GENERATION_KEY, generation, get_next_publish_timeout()
+        )
+
+    return generation
+
+
+def invalidate_page_cache():
+    """Starts a new generation of the page cache"""
+    get_cache().delete(PAGE_CACHE_GENERATION_KEY)
+
+
+def _is_cacheable(request, response):
+    """
+    Returns ``True`` if the response can be stored in the page cache,
+    these are the same checks as ``UpdateCacheMiddleware``
+    """
+    if response.streaming or response.status_code not in (200, 304):
+        return False
+
+    # responses that set a cookie on a request without cookies
+    # would share the cookie with every request
+    if not request.COOKIES and response.cookies:
+        if has_vary_header(response, 'Cookie'):
+            return False
+
+    return 'private' not in response.get('Cache-Control', '')
+
+
+def newsfeed_cache_page(view_func):
+    """
+    Caches the responses of a view for ``NEWSFEED_PAGE_CACHE_TIMEOUT``
+    seconds or until the content of the site changes
+
+    Unlike ``cache_page`` this does not add the ``Cache-Control: max-age``
+    and ``Expires`` headers to the responses, so browsers and proxies
+    do not keep the pages after the cache is invalidated.
+    Requests with pending messages are not cached because
+    the messages are shown on the page.
+    """
+    # Adds the ``Vary: Cookie`` header before the response is cached
+    # if the page uses a CSRF token
+    protected_view = csrf_protect(view_func)
+
+    @wraps(view_func)
+    def wrapped_view(request, *args, **kwargs):
+        cacheable_request = NEWSFEED_PAGE_CACHE_TIMEOUT and (
+            request.method in ('GET', 'HEAD')
+        )
+
+        if not cacheable_request or get_messages(request):
+            return view_func(request, *args, **kwargs)
+
+        cache = get_cache()
+        key_prefix = f'newsfeed:page:{get_page_cache_generation()}'
+        cache_key = get_cache_key(
+            request, key_prefix, request.method, cache=cache
+        )
+
+        if cache_key is not None:
+            response = cache.get(cache_key)
+
+            if response is not None:
+                return response
+
+        response = protected_view(request, *args, **kwargs)
+
+        if not _is_cacheable(request, response):
+            return response
+
+        cache_key = learn_cache_key(
+            request, response, NEWSFEED_PAGE_CACHE_TIMEOUT, key_prefix,
+            cache=cache
+        )
+
+        def set_cache(response):
+            cache.set(cache_key, response, NEWSFEED_PAGE_CACHE_TIMEOUT)
+
+        if callable(getattr(response, 'render', None)):
+            response.add_post_render_callback(set_cache)
+        else:
+            set_cache(response)
+
+        return response
+
+    return wrapped_view
@@ -0,0 +1,96 @@
+class CursorPage:
+    """A page of ``CursorPaginator``"""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage after {self.previous_cursor}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Paginates a queryset in the descending order of a unique field,
+    the value of the field is used as the cursor of the pages so
+    the pages are read without ``COUNT`` and ``OFFSET`` queries
+
+    :param queryset: queryset to paginate
+    :param per_page: number of objects on each page
+    :param field: name of the unique field
+    """
+
+    def __init__(self, queryset, per_page, field):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.field = field
+
+    def _get_cursor(self, obj):
+        return getattr(obj, self.field)
+
+    def page(self, after=None, before=None):
+        """
+        Returns the page of objects that come after (lower values)
+        or before (higher values) the cursor, the first page is
+        returned if no cursor is given
+
+        :param after: cursor of the ``next`` link
+        :param before: cursor of the ``previous`` link
+        """
+        if before is not None:
+            # the previous page is read in the ascending order
+            # and reversed, the extra object tells if there is more
+            objects = list(
+                self.queryset.filter(
+                    **{f'{self.field}__gt': before}
+                ).order_by(self.field)[:self.per_page + 1]
+            )
+            has_previous = len(objects) > self.per_page
+            objects = objects[:self.per_page][::-1]
+
+            if not objects:
+                return CursorPage(objects)
+
+            return CursorPage(
+                objects,
+                next_cursor=self._get_cursor(objects[-1]),
+                previous_cursor=(
+                    self._get_cursor(objects[0]) if has_previous else None
+                ),
+            )
+
+        queryset = self.queryset.order_by(f'-{self.field}')
+
+        if after is not None:
+            queryset = queryset.filter(**{f'{self.field}__lt': after})
+
+        objects = list(queryset[:self.per_page + 1])
+        has_next = len(objects) > self.per_page
+        objects = objects[:self.per_page]
+
+        if not objects:
+            return CursorPage(objects)
+
+        return CursorPage(
+            objects,
+            next_cursor=self._get_cursor(objects[-1]) if has_next else None,
+            previous_cursor=(
+                self._get_cursor(objects[0]) if after is not None else None
+            ),
+        )
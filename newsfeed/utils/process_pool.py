@@ -0,0 +1,24 @@
+import multiprocessing
+
+import django
+from django.apps import apps
+
+
+def _initialize_worker():
+    """Sets up django in the worker processes"""
+    if not apps.ready:
+        django.setup()
+
+
+def get_process_pool(processes):
+    """
+    Returns a multiprocessing pool of worker processes with django set up
+
+    The workers are started with the ``spawn`` method so that they do not
+    inherit the database connections of the current process. Settings
+    are loaded from the ``DJANGO_SETTINGS_MODULE`` environment variable.
+
+    :param processes: number of worker processes
+    """
+    context = multiprocessing.get_context('spawn')
+    return context.Pool(processes, initializer=_initialize_worker)
@@ -0,0 +1,80 @@
+import threading
+import time
+
+from django.utils.module_loading import import_string
+
+from newsfeed.app_settings import (
+    NEWSFEED_EMAIL_RATE_LIMIT,
+    NEWSFEED_EMAIL_RATE_LIMIT_BURST,
+    NEWSFEED_EMAIL_RATE_LIMITER,
+)
+
+
+class TokenBucketRateLimiter:
+    """
+    Limits the number of emails sent per second using a token bucket
+
+    The limiter is thread safe, so one instance can be shared by all
+    the threads of a send run.
+
+    :param rate: number of emails allowed per second,
+        if it is ``0`` the rate is not limited
+    :param burst: number of emails that can be sent at once
+        without waiting, defaults to ``rate``
+    """
+
+    def __init__(self, rate=0, burst=0):
+        self.rate = rate
+        self.burst = burst or rate
+        self.tokens = self.burst
+        self.updated_at = time.monotonic()
+        # total time (in seconds) spent waiting for the tokens
+        self.throttled_time = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """
+        Takes tokens from the bucket and waits until they are available
+
+        Requests larger than the bucket are allowed, the bucket goes
+        into debt so that the average rate is still respected.
+        Returns the time (in seconds) spent waiting.
+
+        :param tokens: number of emails that are going to be sent
+        """
+        if not self.rate:
+            return 0
+
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.burst,
+                self.tokens + (now - self.updated_at) * self.rate
+            )
+            self.updated_at = now
+            self.tokens -= tokens
+
+            wait = max(0, -self.tokens / self.rate)
+            self.throttled_time += wait
+
+        if wait:
+            time.sleep(wait)
+
+        return wait
+
+
+def get_rate_limiter(rate=None, burst=None):
+    """
+    Returns an instance of the rate limiter class set in
+    ``NEWSFEED_EMAIL_RATE_LIMITER``
+
+    :param rate: emails per second, defaults to ``NEWSFEED_EMAIL_RATE_LIMIT``
+    :param burst: emails that can be sent at once,
+        defaults to ``NEWSFEED_EMAIL_RATE_LIMIT_BURST``
+    """
+    rate_limiter_class = import_string(NEWSFEED_EMAIL_RATE_LIMITER)
+
+    return rate_limiter_class(
+        rate=NEWSFEED_EMAIL_RATE_LIMIT if rate is None else rate,
+        burst=NEWSFEED_EMAIL_RATE_LIMIT_BURST if burst is None else burst,
+    )
@@ -0,0 +1,121 @@
+from django.core.cache import caches
+
+from newsfeed.app_settings import (
+    NEWSFEED_CACHE_ALIAS,
+    NEWSFEED_FEED_CACHE_TIMEOUT,
+    NEWSFEED_NEWSLETTER_CACHE_TIMEOUT,
+)
+
+
+RENDERED_NEWSLETTER_KEY_PREFIX = 'newsfeed:rendered_newsletter'
+# changed to invalidate the rendered newsletters of all the issues
+RENDERED_NEWSLETTER_GENERATION_KEY = f'{RENDERED_NEWSLETTER_KEY_PREFIX}:gen'
+
+RENDERED_FEED_ITEM_KEY_PREFIX = 'newsfeed:rendered_feed_item'
+# changed to invalidate the rendered feed items of all the issues
+RENDERED_FEED_ITEM_GENERATION_KEY = f'{RENDERED_FEED_ITEM_KEY_PREFIX}:gen'
+
+
+def get_cache():
+    return caches[NEWSFEED_CACHE_ALIAS]
+
+
+def get_rendered_newsletter_cache_key(issue_id):
+    return f'{RENDERED_NEWSLETTER_KEY_PREFIX}:{issue_id}'
+
+
+def get_rendered_newsletter_html(issue, render):
+    """
+    Returns the rendered newsletter html of an issue from the cache,
+    the newsletter is rendered again if the content of the issue changed
+
+    :param issue: Issue instance of the newsletter
+    :param render: function that renders the newsletter html
+    """
+    cache = get_cache()
+    key = get_rendered_newsletter_cache_key(issue.id)
+    cached = cache.get_many([key, RENDERED_NEWSLETTER_GENERATION_KEY])
+    version = (
+        cached.get(RENDERED_NEWSLETTER_GENERATION_KEY, 0),
+        issue.get_content_version()
+    )
+
+    if key in cached and cached[key][0] == version:
+        return cached[key][1]
+
+    html = render()
+    cache.set(key, (version, html), NEWSFEED_NEWSLETTER_CACHE_TIMEOUT)
+
+    return html
+
+
+def invalidate_rendered_newsletter(issue_id):
+    """
+    Removes the rendered newsletter of an issue from the cache
+
+    :param issue_id: ID of the issue
+    """
+    get_cache().delete(get_rendered_newsletter_cache_key(issue_id))
+
+
+def _incr_generation(key):
+    cache = get_cache()
+
+    try:
+        cache.incr(key)
+    except ValueError:
+        # the key does not exist
+        cache.set(key, 1, None)
+
+
+def invalidate_rendered_newsletters():
+    """Invalidates the rendered newsletters of all the issues"""
+    _incr_generation(RENDERED_NEWSLETTER_GENERATION_KEY)
+
+
+def get_rendered_feed_item_cache_key(issue_id):
+    return f'{RENDERED_FEED_ITEM_KEY_PREFIX}:{issue_id}'
+
+
+def get_rendered_feed_items(issues, get_version, render):
+    """
+    Returns a dict of the rendered feed item of each issue by issue ID,
+    the items are read from the cache with one request and only
+    the issues whose content changed are rendered again
+
+    :param issues: list of Issue instances
+    :param get_version: function that returns the content version of an issue
+    :param render: function that renders the feed item of an issue
+    """
+    cache = get_cache()
+    keys = {
+        issue.id: get_rendered_feed_item_cache_key(issue.id)
+        for issue in issues
+    }
+    cached = cache.get_many(
+        [*keys.values(), RENDERED_FEED_ITEM_GENERATION_KEY]
+    )
+    generation = cached.get(RENDERED_FEED_ITEM_GENERATION_KEY, 0)
+
+    items = {}
+    rendered = {}
+
+    for issue in issues:
+        key = keys[issue.id]
+        version = (generation, get_version(issue))
+
+        if key in cached and cached[key][0] == version:
+            items[issue.id] = cached[key][1]
+        else:
+            items[issue.id] = render(issue)
+            rendered[key] = (version, items[issue.id])
+
+    if rendered:
+        cache.set_many(rendered, NEWSFEED_FEED_CACHE_TIMEOUT)
+
+    return items
+
+
+def invalidate_rendered_feed_items():
+    """Invalidates the rendered feed items of all the issues"""
+    _incr_generation(RENDERED_FEED_ITEM_GENERATION_KEY)
@@ -1,42 +1,116 @@
 import logging
+import math
+import os
+import queue
+import random
+import socket
+import threading
 import time
+import uuid
+from concurrent.futures import (
+    ALL_COMPLETED, FIRST_COMPLETED, ThreadPoolExecutor, wait
+)
+from contextlib import contextmanager
 
 from django.conf import settings
-from django.core.mail import EmailMessage, get_connection
+from django.core.mail import get_connection
+from django.db import connections
+from django.db.models import Count, Max, Min
 from django.template.loader import render_to_string
-from django.urls import reverse
 from django.utils import timezone
+from django.utils.module_loading import import_string
 
 from newsfeed.app_settings import (
     NEWSFEED_EMAIL_BATCH_WAIT,
     NEWSFEED_EMAIL_BATCH_SIZE,
+    NEWSFEED_EMAIL_CONNECTIONS,
+    NEWSFEED_EMAIL_LEASE_SECONDS,
+    NEWSFEED_EMAIL_MAX_ATTEMPTS,
+    NEWSFEED_EMAIL_PROCESSES,
+    NEWSFEED_EMAIL_RATE_LIMIT,
+    NEWSFEED_EMAIL_RATE_LIMIT_BURST,
+    NEWSFEED_EMAIL_RETRY_BACKOFF,
+    NEWSFEED_EMAIL_RETRY_BACKOFF_MAX,
+    NEWSFEED_EMAIL_SENDER_CLASS,
     NEWSFEED_SITE_BASE_URL,
 )
-from newsfeed.models import Newsletter, Subscriber
+from newsfeed.constants import DELIVERY_FAILED, DELIVERY_SENT
+from newsfeed.models import Newsletter, NewsletterDelivery, Subscriber
+from newsfeed.querysets import group_posts_by_category
+from newsfeed.utils.newsletter_message import (
+    UNSUBSCRIBE_URL_PLACEHOLDER,
+    NewsletterEmailMessage,
+    NewsletterMessageTemplate,
+)
+from newsfeed.utils.process_pool import get_process_pool
+from newsfeed.utils.rate_limit import get_rate_limiter
+from newsfeed.utils.render_cache import get_rendered_newsletter_html
+from newsfeed.utils.unsubscribe import get_unsubscribe_url
 
 
 logger = logging.getLogger(__name__)
 
+# number of subscribers fetched from the database at a time
+# if ``NEWSFEED_EMAIL_BATCH_SIZE`` is not set
+SUBSCRIBER_FETCH_SIZE = 1000
+
 
 class NewsletterEmailSender:
     """The main class that handles sending email newsletters"""
 
-    def __init__(self, newsletters=None, respect_schedule=True):
+    def __init__(
+        self, newsletters=None, respect_schedule=True,
+        subscriber_id_range=None, mark_sent=True, lease_owner=None
+    ):
         self.newsletters = self._get_newsletters(
             newsletters=newsletters, respect_schedule=respect_schedule
         )
-        # get subscriber email addresses
-        self.subscriber_emails = Subscriber.objects.subscribed().values_list(
-            'email_address', flat=True
-        )
+        # subscribers who will receive the newsletters
+        self.subscribers = Subscriber.objects.subscribed()
+
+        if subscriber_id_range is not None:
+            start_id, end_id = subscriber_id_range
+            self.subscribers = self.subscribers.filter(
+                id__gte=start_id, id__lt=end_id
+            )
         # Size of each batch to be sent
         self.batch_size = NEWSFEED_EMAIL_BATCH_SIZE
         # list of newsletters that were sent
         self.sent_newsletters = []
+        # number of emails sent for each newsletter ID
+        self.sent_email_counts = {}
+        # if ``False`` newsletters are not saved to sent state,
+        # this is used when the subscribers are split between processes
+        self.mark_sent = mark_sent
+        # Newsletters are claimed before sending so that multiple processes
+        # never send the same newsletter, if ``lease_owner`` is provided
+        # the newsletters were already claimed by that owner
+        self.claim_newsletters = lease_owner is None
+        self.lease_owner = lease_owner or get_lease_owner()
+        self.lease_seconds = NEWSFEED_EMAIL_LEASE_SECONDS
+        # time of the last lease renewal (``time.monotonic()``)
+        self.lease_renewed_at = time.monotonic()
+        # set when the lease of the newsletter was lost to another process
+        self.lease_lost = False
+        # function that is called after each renewal of the lease,
+        # e.g. to renew the lease of the job that sends the newsletters
+        self.lease_heartbeat = None
+        # Failed emails are retried until they were attempted
+        # ``max_attempts`` times, waiting exponentially longer
+        # (starting from ``retry_backoff`` seconds) after each attempt
+        self.max_attempts = NEWSFEED_EMAIL_MAX_ATTEMPTS
+        self.retry_backoff = NEWSFEED_EMAIL_RETRY_BACKOFF
+        self.retry_backoff_max = NEWSFEED_EMAIL_RETRY_BACKOFF_MAX
+        # number of emails retried, recovered by a retry and abandoned
+        self.retry_counts = {'retried': 0, 'recovered': 0, 'abandoned': 0}
         # Waiting time after each batch (in seconds)
         self.per_batch_wait = NEWSFEED_EMAIL_BATCH_WAIT
+        # limits the number of emails sent per second
+        self.rate_limiter = get_rate_limiter()
         # connection to the server
         self.connection = get_connection()
+        # Number of connections used to send batches in parallel
+        self.max_connections = NEWSFEED_EMAIL_CONNECTIONS
         self.email_host_user = settings.EMAIL_HOST_USER
 
     @staticmethod
@@ -63,21 +137,30 @@ class NewsletterEmailSender:
 
     @staticmethod
     def _render_newsletter(newsletter):
-        """renders newsletter template and returns html and subject"""
+        """
+        renders newsletter template and returns html and subject,
+        the html is cached for each issue until the issue is changed
+        """
         issue = newsletter.issue
         subject = newsletter.subject
-        posts = issue.posts.visible().select_related('category')
 
-        context = {
-            'issue': issue,
-            'post_list': posts,
-            'unsubscribe_url': reverse('newsfeed:newsletter_unsubscribe'),
-            'site_url': NEWSFEED_SITE_BASE_URL
-        }
+        def render():
+            posts = issue.posts.visible().ordered_by_category()
 
-        html = render_to_string(
-            'newsfeed/email/newsletter_email.html', context
-        )
+            context = {
+                'issue': issue,
+                'post_list': posts,
+                'category_list': group_posts_by_category(posts),
+                # replaced with the unsubscribe URL of each subscriber
+                'unsubscribe_url': UNSUBSCRIBE_URL_PLACEHOLDER,
+                'site_url': NEWSFEED_SITE_BASE_URL
+            }
+
+            return render_to_string(
+                'newsfeed/email/newsletter_email.html', context
+            )
+
+        html = get_rendered_newsletter_html(issue, render)
 
         rendered_newsletter = {
             'subject': subject,
@@ -86,61 +169,657 @@ class NewsletterEmailSender:
 
         return rendered_newsletter
 
-    def _generate_email_message(self, to_email, rendered_newsletter):
+    def _get_message_template(self, rendered_newsletter):
+        """
+        Returns the message template of the rendered newsletter,
+        the template is encoded only once for all the subscribers
+
+        :param rendered_newsletter: rendered html of the newsletter with subject
+        """
+        if 'message_template' not in rendered_newsletter:
+            rendered_newsletter['message_template'] = (
+                NewsletterMessageTemplate(
+                    subject=rendered_newsletter.get('subject'),
+                    html=rendered_newsletter.get('html'),
+                    from_email=self.email_host_user,
+                    site_url=NEWSFEED_SITE_BASE_URL
+                )
+            )
+
+        return rendered_newsletter['message_template']
+
+    def _generate_email_message(
+        self, to_email, rendered_newsletter, unsubscribe_url=None
+    ):
         """
         Generates email message for an email_address
 
         :param to_email: subscribers email address
         :param rendered_newsletter: rendered html of the newsletter with subject
+        :param unsubscribe_url: subscribers one-click unsubscribe URL
         """
-        message = EmailMessage(
-            subject=rendered_newsletter.get('subject'),
-            body=rendered_newsletter.get('html'),
-            from_email=self.email_host_user, to=[to_email],
-            connection=self.connection
+        return NewsletterEmailMessage(
+            template=self._get_message_template(rendered_newsletter),
+            to_email=to_email,
+            connection=self.connection,
+            unsubscribe_url=unsubscribe_url
         )
-        message.content_subtype = "html"
 
-        return message
+    def _get_retry_deliveries(self, newsletter):
+        """
+        Returns the failed deliveries of the newsletter
+        that have attempts left
 
-    def _get_batch_email_messages(self, rendered_newsletter):
+        :param newsletter: Newsletter instance that is being sent
         """
-        Yields EmailMessage list in batches
+        return newsletter.deliveries.failed().filter(
+            attempts__lt=self.max_attempts,
+            subscriber_id__in=self.subscribers.values('id')
+        )
+
+    def _get_retry_delay(self, attempts):
+        """
+        Returns the number of seconds to wait before the next attempt,
+        the delay doubles after each attempt and half of it is random
+        so that the retries of different batches are spread out
+
+        :param attempts: number of attempts made
+        """
+        delay = min(
+            self.retry_backoff * 2 ** (attempts - 1), self.retry_backoff_max
+        )
+
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _get_subscriber_batches(self, newsletter=None, retry=False):
+        """
+        Yields lists of ``(id, email_address, token)`` tuples
+        of the subscribers
+
+        Subscribers are fetched by primary key ranges (keyset pagination)
+        so that each batch is a single indexed query and only one batch
+        is kept in memory at a time. Without a batch size the subscribers
+        are fetched ``SUBSCRIBER_FETCH_SIZE`` at a time.
+
+        :param newsletter: if provided subscribers who have already
+            been attempted are skipped
+        :param retry: if ``True`` only the subscribers with failed
+            deliveries that are due for a retry are included
+        """
+        subscribers = self.subscribers
+
+        if retry:
+            subscribers = subscribers.filter(
+                id__in=self._get_retry_deliveries(
+                    newsletter
+                ).due().values('subscriber_id')
+            )
+        elif newsletter is not None:
+            subscribers = subscribers.without_deliveries(
+                newsletter.deliveries.all()
+            )
+
+        if self.batch_size > 0:
+            fetch_size = self.batch_size
+        else:
+            fetch_size = SUBSCRIBER_FETCH_SIZE
+        last_id = 0
+
+        while True:
+            batch = list(
+                subscribers.filter(
+                    id__gt=last_id
+                ).order_by('id').values_list(
+                    'id', 'email_address', 'token'
+                )[:fetch_size]
+            )
+
+            if not batch:
+                return
+
+            yield batch
+
+            if len(batch) < fetch_size:
+                return
+
+            last_id = batch[-1][0]
+
+    def _get_email_message_batches(
+        self, rendered_newsletter, newsletter=None, retry=False
+    ):
+        """
+        Yields subscriber ID list and EmailMessage list in batches
 
         :param rendered_newsletter: newsletter with html and subject
+        :param newsletter: if provided subscribers who have already
+            been attempted are skipped
+        :param retry: if ``True`` only the failed deliveries
+            that are due for a retry are included
         """
+        subscriber_count = self.subscribers.count()
 
         # if there is no subscriber then stop iteration
-        if len(self.subscriber_emails) == 0:
+        if subscriber_count == 0:
             logger.info('No subscriber found.')
             return
 
-        # if there is no batch size specified
-        # by the user send all in one batch
-        if not self.batch_size or self.batch_size <= 0:
-            self.batch_size = len(self.subscriber_emails)
+        # if there is no batch size specified by the user all the
+        # emails are sent in one session, see ``_send_batches()``
+        logger.info(
+            'Batch size for sending emails to %s subscriber(s) is set to %s',
+            subscriber_count,
+            self.batch_size if self.batch_size > 0 else subscriber_count
+        )
+
+        for batch in self._get_subscriber_batches(
+            newsletter=newsletter, retry=retry
+        ):
+            subscriber_ids = [subscriber_id for subscriber_id, _, _ in batch]
+            messages = [
+                self._generate_email_message(
+                    email, rendered_newsletter,
+                    unsubscribe_url=get_unsubscribe_url(token)
+                )
+                for _, email, token in batch
+            ]
+
+            yield subscriber_ids, messages
+
+    def _get_batch_email_messages(self, rendered_newsletter):
+        """
+        Yields EmailMessage list in batches
+
+        :param rendered_newsletter: newsletter with html and subject
+        """
+        for _, messages in self._get_email_message_batches(
+            rendered_newsletter
+        ):
+            yield messages
+
+    def _record_deliveries(self, newsletter, sent_ids, failed_ids):
+        """
+        Records the delivery status of a batch in the delivery log,
+        failed deliveries are scheduled for a retry or abandoned
+        if they have no attempts left
+
+        :param newsletter: Newsletter instance that is being sent
+        :param sent_ids: IDs of the subscribers the emails were sent to
+        :param failed_ids: IDs of the subscribers the emails failed to
+        """
+        if sent_ids:
+            NewsletterDelivery.objects.record(
+                newsletter, sent_ids, DELIVERY_SENT
+            )
+
+        if not failed_ids:
+            return
+
+        NewsletterDelivery.objects.record(
+            newsletter, failed_ids, DELIVERY_FAILED
+        )
+
+        deliveries = NewsletterDelivery.objects.filter(
+            newsletter=newsletter, subscriber_id__in=failed_ids
+        ).failed()
+        abandoned = deliveries.filter(
+            attempts__gte=self.max_attempts
+        ).abandon()
+
+        for attempts in set(deliveries.values_list('attempts', flat=True)):
+            deliveries.filter(attempts=attempts).retry_later(
+                self._get_retry_delay(attempts)
+            )
+
+        if abandoned:
+            self.retry_counts['abandoned'] += abandoned
+            logger.error(
+                'Gave up sending newsletter ID: %s to %s subscriber(s) '
+                'after %s attempt(s)',
+                newsletter.id, abandoned, self.max_attempts
+            )
+
+    @staticmethod
+    def _close_connection(connection):
+        """Closes a connection, errors of a broken connection are ignored"""
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _send_batch(
+        self, connection, subscriber_ids, messages, newsletter,
+        keep_open=False
+    ):
+        """
+        Sends a batch of email messages and returns the IDs of the
+        subscribers the emails were sent to and failed to
+
+        The connection is kept open for the batch and the messages are
+        sent one by one, because email backends stop at the first error
+        after the messages before it were already sent.
+
+        :param connection: email backend connection used for this batch
+        :param subscriber_ids: subscriber IDs of the messages
+        :param messages: list of EmailMessage
+        :param newsletter: Newsletter instance that is being sent
+        :param keep_open: if ``True`` the connection is kept open
+            for the next batch
+        """
+        issue_number = newsletter.issue.issue_number
+        sent_ids, failed_ids = [], []
+        # the connection is only closed after the batch
+        # if it was opened for this batch
+        opened = False
+
+        # Wait until the rate limiter allows sending this batch
+        # this is to prevent server overload
+        self.rate_limiter.acquire(len(messages))
+
+        for index, message in enumerate(messages):
+            subscriber_id = subscriber_ids[index]
+
+            try:
+                if connection.open():
+                    opened = True
+            except Exception as e:
+                # the rest of the batch can not be sent without a connection
+                failed_ids.extend(subscriber_ids[index:])
+                logger.error(
+                    'An error occurred while connecting to send '
+                    'newsletters for ISSUE # %s '
+                    'newsletter ID: %s '
+                    'EXCEPTION: %s',
+                    issue_number, newsletter.id, e
+                )
+                break
+
+            try:
+                sent = connection.send_messages([message])
+            except Exception as e:
+                # the connection is opened again for the next message
+                sent = 0
+                self._close_connection(connection)
+                logger.error(
+                    'An error occurred while sending '
+                    'newsletter for ISSUE # %s '
+                    'newsletter ID: %s subscriber ID: %s '
+                    'EXCEPTION: %s',
+                    issue_number, newsletter.id, subscriber_id, e
+                )
+
+            if sent:
+                sent_ids.append(subscriber_id)
+            else:
+                failed_ids.append(subscriber_id)
+
+        if opened and not keep_open:
+            self._close_connection(connection)
 
         logger.info(
-            'Batch size for sending emails is set to %s',
-            self.batch_size
+            'Sent %s of %s newsletters in one batch for ISSUE # %s',
+            len(sent_ids), len(messages), issue_number
         )
 
-        for i in range(0, len(self.subscriber_emails), self.batch_size):
-            emails = self.subscriber_emails[i:i + self.batch_size]
+        if sent_ids and not keep_open and self.per_batch_wait:
+            logger.info(
+                'Waiting %s seconds before sending '
+                'next batch of newsletter for ISSUE # %s',
+                self.per_batch_wait, issue_number
+            )
+            time.sleep(self.per_batch_wait)
+
+        return sent_ids, failed_ids
+
+    def _wait_for_batches(
+        self, futures, newsletter, return_when=ALL_COMPLETED
+    ):
+        """
+        Waits for the batches that are being sent like ``wait()``
+        while renewing the lease of the newsletter, so that the lease
+        is kept while a large or throttled batch is being sent
+
+        :param futures: futures of the batches that are being sent
+        :param newsletter: Newsletter instance that is being sent
+        :param return_when: ``FIRST_COMPLETED`` or ``ALL_COMPLETED``
+        """
+        lease_kept = True
+
+        while True:
+            done, pending = wait(
+                futures, timeout=self.lease_seconds / 3,
+                return_when=return_when
+            )
+
+            if not pending or (done and return_when == FIRST_COMPLETED):
+                return done, pending
+
+            if lease_kept:
+                # the batches that are already being sent are
+                # recorded even if the lease was lost
+                lease_kept = self._keep_lease(newsletter)
+
+    def _send_batches(self, batches, newsletter):
+        """
+        Sends batches one after another with a single connection
+        and returns the number of emails sent
+
+        The batches are sent from the current thread so that email
+        backends that use the database stay in the caller's connection,
+        the lease of the newsletter is renewed from a heartbeat thread
+        while a batch is being sent. Without a batch size all the
+        emails are sent in one session.
+
+        :param batches: iterable of subscriber ID and EmailMessage lists
+        :param newsletter: Newsletter instance that is being sent
+        """
+        sent_emails = 0
+        keep_open = self.batch_size <= 0
+
+        with self._lease_heartbeat(newsletter):
+            try:
+                for subscriber_ids, messages in batches:
+                    sent_ids, failed_ids = self._send_batch(
+                        self.connection, subscriber_ids, messages,
+                        newsletter, keep_open=keep_open
+                    )
+                    self._record_deliveries(newsletter, sent_ids, failed_ids)
+                    sent_emails += len(sent_ids)
+            finally:
+                if keep_open:
+                    self._close_connection(self.connection)
+
+        return sent_emails
+
+    @contextmanager
+    def _lease_heartbeat(self, newsletter):
+        """
+        Renews the lease of the newsletter from a heartbeat thread
+        until the block exits or the lease is lost
+
+        :param newsletter: Newsletter instance that is being sent
+        """
+        stopped = threading.Event()
+
+        def heartbeat():
+            try:
+                while not stopped.wait(self.lease_seconds / 3):
+                    try:
+                        if not self._keep_lease(newsletter):
+                            return
+                    except Exception as e:
+                        logger.error(
+                            'An error occurred while renewing the lease '
+                            'of newsletter ID: %s EXCEPTION: %s',
+                            newsletter.id, e
+                        )
+            finally:
+                # the thread has its own database connections
+                connections.close_all()
+
+        thread = threading.Thread(target=heartbeat, daemon=True)
+        thread.start()
+
+        try:
+            yield
+        finally:
+            stopped.set()
+            thread.join()
+
+    def _send_batches_concurrently(self, batches, newsletter):
+        """
+        Sends batches in parallel using a pool of connections
+        and returns the number of emails sent
+
+        Each worker thread takes a connection from the pool for the batch
+        it sends, so a failing connection is only opened again for that
+        worker and does not affect the batches sent by the others.
+
+        :param batches: iterable of subscriber ID and EmailMessage lists
+        :param newsletter: Newsletter instance that is being sent
+        """
+        connection_pool = queue.Queue()
+
+        for _ in range(self.max_connections):
+            connection_pool.put(get_connection())
+
+        def send(subscriber_ids, messages):
+            connection = connection_pool.get()
+
+            try:
+                return self._send_batch(
+                    connection, subscriber_ids, messages, newsletter
+                )
+            finally:
+                connection_pool.put(connection)
+                # close the database connections opened by
+                # email backends that use the database
+                connections.close_all()
+
+        def record(futures):
+            # deliveries are recorded from the main thread
+            # so that the workers do not use the database
+            sent_emails = 0
+
+            for future in futures:
+                sent_ids, failed_ids = future.result()
+                self._record_deliveries(newsletter, sent_ids, failed_ids)
+                sent_emails += len(sent_ids)
+
+            return sent_emails
+
+        sent_emails = 0
+        # Only keep a few batches per connection in memory
+        max_pending = self.max_connections * 2
+
+        with ThreadPoolExecutor(max_workers=self.max_connections) as executor:
+            pending = set()
+
+            for subscriber_ids, messages in batches:
+                if len(pending) >= max_pending:
+                    done, pending = self._wait_for_batches(
+                        pending, newsletter, return_when=FIRST_COMPLETED
+                    )
+                    sent_emails += record(done)
+
+                pending.add(executor.submit(send, subscriber_ids, messages))
+
+            done, _ = self._wait_for_batches(pending, newsletter)
+            sent_emails += record(done)
+
+        return sent_emails
+
+    def _send_newsletter_batches(self, batches, newsletter):
+        """
+        Sends all the batches of a newsletter and
+        returns the number of emails sent
+
+        :param batches: iterable of subscriber ID and EmailMessage lists
+        :param newsletter: Newsletter instance that is being sent
+        """
+        if self.max_connections > 1:
+            return self._send_batches_concurrently(batches, newsletter)
+
+        return self._send_batches(batches, newsletter)
+
+    def _get_next_newsletter(self, processed_ids):
+        """
+        Claims and returns the next newsletter to be sent,
+        returns ``None`` if there is no newsletter left
+
+        :param processed_ids: IDs of the newsletters already processed
+        """
+        newsletters = self.newsletters.exclude(id__in=processed_ids)
+
+        if not self.claim_newsletters:
+            return newsletters.order_by('id').first()
+
+        return newsletters.claim(self.lease_owner, self.lease_seconds)
+
+    def _renew_lease_per_batch(self, batches, newsletter):
+        """
+        Yields the batches while renewing the lease of the newsletter,
+        stops if the lease was lost to another process
+
+        :param batches: iterable of subscriber ID and EmailMessage lists
+        :param newsletter: Newsletter instance that is being sent
+        """
+        for batch in batches:
+            if not self._keep_lease(newsletter):
+                return
+
+            yield batch
 
-            yield map(
-                lambda email: self._generate_email_message(
-                    email, rendered_newsletter
-                ), emails
+    def _keep_lease(self, newsletter):
+        """
+        Renews the lease of the newsletter if a third of it has passed
+        since the last renewal, returns ``False`` if the lease was lost
+
+        :param newsletter: Newsletter instance that is being sent
+        """
+        if self.lease_lost:
+            return False
+
+        if time.monotonic() - self.lease_renewed_at < self.lease_seconds / 3:
+            return True
+
+        return self._renew_lease(newsletter)
+
+    def _renew_lease(self, newsletter):
+        """
+        Renews the lease of the newsletter,
+        returns ``False`` if the lease was lost to another process
+
+        :param newsletter: Newsletter instance that is being sent
+        """
+        renewed = Newsletter.objects.filter(
+            id=newsletter.id
+        ).renew_lease(self.lease_owner, self.lease_seconds)
+
+        if renewed:
+            self.lease_renewed_at = time.monotonic()
+
+            if self.lease_heartbeat:
+                self.lease_heartbeat()
+        else:
+            self.lease_lost = True
+            logger.error(
+                'Lost the lease of newsletter ID: %s, '
+                'stopped sending newsletter for ISSUE # %s',
+                newsletter.id, newsletter.issue.issue_number
             )
 
+        return renewed
+
+    def _count_retries(self, batches):
+        """
+        Yields the batches while counting the retried emails
+
+        :param batches: iterable of subscriber ID and EmailMessage lists
+        """
+        for subscriber_ids, messages in batches:
+            self.retry_counts['retried'] += len(subscriber_ids)
+            yield subscriber_ids, messages
+
+    def _wait_for_retry(self, newsletter, seconds):
+        """
+        Waits until the next retry is due while keeping the lease,
+        returns ``False`` if the lease was lost
+
+        :param newsletter: Newsletter instance that is being sent
+        :param seconds: number of seconds to wait
+        """
+        wait_until = time.monotonic() + seconds
+
+        while True:
+            if not self._renew_lease(newsletter):
+                return False
+
+            remaining = wait_until - time.monotonic()
+
+            if remaining <= 0:
+                return True
+
+            time.sleep(min(remaining, self.lease_seconds / 3))
+
+    def _retry_failed_deliveries(self, rendered_newsletter, newsletter):
+        """
+        Retries the failed deliveries of the newsletter with backoff
+        until they are sent or out of attempts and returns the number
+        of emails sent, failures of an interrupted run are retried
+        the next time the newsletter is sent
+
+        :param rendered_newsletter: newsletter with html and subject
+        :param newsletter: Newsletter instance that is being sent
+        """
+        sent_emails = 0
+
+        while True:
+            retries = self._get_retry_deliveries(newsletter).aggregate(
+                count=Count('id'), next_attempt_at=Min('next_attempt_at')
+            )
+
+            if not retries['count']:
+                break
+
+            wait = 0
+
+            if retries['next_attempt_at'] is not None:
+                wait = (
+                    retries['next_attempt_at'] - timezone.now()
+                ).total_seconds()
+
+            logger.info(
+                'Retrying %s failed email(s) for ISSUE # %s in %.1f seconds',
+                retries['count'], newsletter.issue.issue_number, max(wait, 0)
+            )
+
+            if not self._wait_for_retry(newsletter, wait):
+                break
+
+            batches = self._renew_lease_per_batch(
+                self._count_retries(
+                    self._get_email_message_batches(
+                        rendered_newsletter, newsletter=newsletter, retry=True
+                    )
+                ),
+                newsletter
+            )
+            sent_emails += self._send_newsletter_batches(batches, newsletter)
+
+        self.retry_counts['recovered'] += sent_emails
+
+        return sent_emails
+
+    def _release_newsletter(self, newsletter, sent):
+        """
+        Releases the lease of the newsletter and saves it to sent state
+
+        :param newsletter: Newsletter instance that was sent
+        :param sent: if ``True`` the newsletter is saved to sent state
+        """
+        if not self.mark_sent:
+            return
+
+        fields = {'is_sent': True, 'sent_at': timezone.now()} if sent else {}
+
+        return Newsletter.objects.filter(
+            id=newsletter.id
+        ).release_lease(self.lease_owner, **fields)
+
     def send_emails(self):
         """sends newsletter emails to subscribers"""
-        for newsletter in self.newsletters:
+        processed_ids = []
+
+        while True:
+            newsletter = self._get_next_newsletter(processed_ids)
+
+            if newsletter is None:
+                break
+
+            processed_ids.append(newsletter.id)
             issue_number = newsletter.issue.issue_number
-            # this is used to calculate how many emails were
-            # sent for each newsletter
-            sent_emails = 0
+            self.lease_renewed_at = time.monotonic()
+            self.lease_lost = False
 
             rendered_newsletter = self._render_newsletter(newsletter)
 
@@ -149,42 +828,32 @@ class NewsletterEmailSender:
                 issue_number
             )
 
-            for email_messages in self._get_batch_email_messages(
-                rendered_newsletter
-            ):
-                messages = list(email_messages)
-
-                try:
-                    # send mass email with one connection open
-                    sent = self.connection.send_messages(messages)
+            # subscribers who already received the newsletter
+            # in a previous run are skipped
+            batches = self._renew_lease_per_batch(
+                self._get_email_message_batches(
+                    rendered_newsletter, newsletter=newsletter
+                ),
+                newsletter
+            )
 
-                    logger.info(
-                        'Sent %s newsletters in one batch for ISSUE # %s',
-                        len(messages), issue_number
-                    )
+            # this is used to calculate how many emails were
+            # sent for each newsletter
+            sent_emails = self._send_newsletter_batches(batches, newsletter)
+            sent_emails += self._retry_failed_deliveries(
+                rendered_newsletter, newsletter
+            )
 
-                    sent_emails += sent
-                except Exception as e:
-                    # create a new connection on error
-                    self.connection = get_connection()
-                    logger.error(
-                        'An error occurred while sending '
-                        'newsletters for ISSUE # %s '
-                        'newsletter ID: %s '
-                        'EXCEPTION: %s',
-                        issue_number, newsletter.id, e
-                    )
-                finally:
-                    # Wait sometime before sending next batch
-                    # this is to prevent server overload
-                    logger.info(
-                        'Waiting %s seconds before sending '
-                        'next batch of newsletter for ISSUE # %s',
-                        self.per_batch_wait, issue_number
-                    )
-                    time.sleep(self.per_batch_wait)
+            self.sent_email_counts[newsletter.id] = sent_emails
+            # the newsletter is sent again later if
+            # any failed email is left to retry
+            sent = (
+                sent_emails > 0 or newsletter.deliveries.sent().exists()
+            ) and not self._get_retry_deliveries(newsletter).exists()
 
-            if sent_emails > 0:
+            # Save newsletter to sent state, this is skipped
+            # if the lease was lost to another process
+            if self._release_newsletter(newsletter, sent) and sent:
                 self.sent_newsletters.append(newsletter.id)
 
             logger.info(
@@ -192,20 +861,214 @@ class NewsletterEmailSender:
                 sent_emails, issue_number
             )
 
-        # Save newsletters to sent state
-        Newsletter.objects.filter(
-            id__in=self.sent_newsletters
-        ).update(is_sent=True, sent_at=timezone.now())
-
         logger.info(
             'Newsletter sending process completed. '
-            'Successfully sent newsletters with ID %s', self.sent_newsletters
+            'Successfully sent newsletters with ID %s, '
+            'retried %s email(s), recovered %s, abandoned %s, '
+            'spent %.2f seconds throttled',
+            self.sent_newsletters, self.retry_counts['retried'],
+            self.retry_counts['recovered'], self.retry_counts['abandoned'],
+            self.rate_limiter.throttled_time
         )
 
 
-def send_email_newsletter(newsletters=None, respect_schedule=True):
-    send_newsletter = NewsletterEmailSender(
-        newsletters=newsletters,
-        respect_schedule=respect_schedule
+def get_lease_owner():
+    """Returns a unique name for the current process"""
+    return f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+
+
+def _send_newsletter_shard(
+    newsletter_id, subscriber_id_range, shards, lease_owner
+):
+    """
+    Sends a newsletter to the subscribers of one shard and returns
+    the number of emails sent with the retry counts,
+    this runs in a worker process
+
+    :param newsletter_id: ID of the Newsletter to send
+    :param subscriber_id_range: ``(start_id, end_id)`` subscriber ID range
+    :param shards: total number of shards, used to split the rate limit
+    :param lease_owner: owner of the newsletter lease
+    """
+    send_newsletter = import_string(NEWSFEED_EMAIL_SENDER_CLASS)(
+        newsletters=Newsletter.objects.filter(id=newsletter_id),
+        respect_schedule=False,
+        subscriber_id_range=subscriber_id_range,
+        mark_sent=False,
+        lease_owner=lease_owner
+    )
+    # The rate limit is shared between all the shards
+    send_newsletter.rate_limiter = get_rate_limiter(
+        rate=NEWSFEED_EMAIL_RATE_LIMIT / shards,
+        burst=NEWSFEED_EMAIL_RATE_LIMIT_BURST / shards,
     )
     send_newsletter.send_emails()
+
+    return (
+        send_newsletter.sent_email_counts.get(newsletter_id, 0),
+        send_newsletter.retry_counts
+    )
+
+
+class ShardedNewsletterEmailSender(NewsletterEmailSender):
+    """
+    Sends email newsletters from multiple processes
+
+    Subscribers are split into disjoint ID ranges and each range is sent by
+    a worker process with its own connections. A newsletter is only saved
+    to sent state when every shard has completed.
+    """
+
+    def __init__(self, newsletters=None, respect_schedule=True, processes=None):
+        super().__init__(
+            newsletters=newsletters, respect_schedule=respect_schedule
+        )
+        # Number of worker processes and subscriber shards
+        self.processes = processes or NEWSFEED_EMAIL_PROCESSES
+
+    def _get_shards(self):
+        """Returns ``(start_id, end_id)`` subscriber ID ranges for each shard"""
+        id_range = Subscriber.objects.subscribed().aggregate(
+            min_id=Min('id'), max_id=Max('id')
+        )
+
+        if id_range['min_id'] is None:
+            return []
+
+        start_id, end_id = id_range['min_id'], id_range['max_id'] + 1
+        shard_size = math.ceil((end_id - start_id) / self.processes)
+
+        return [
+            (shard_start, min(shard_start + shard_size, end_id))
+            for shard_start in range(start_id, end_id, shard_size)
+        ]
+
+    def _send_shards(self, newsletter, shards):
+        """
+        Sends the newsletter for each shard and returns the number of emails
+        sent and the number of shards that completed successfully
+
+        :param newsletter: Newsletter instance to send
+        :param shards: list of subscriber ID ranges
+        """
+        tasks = [
+            (newsletter.id, shard, len(shards), self.lease_owner)
+            for shard in shards
+        ]
+
+        if self.processes > 1:
+            with get_process_pool(self.processes) as pool:
+                results = [
+                    pool.apply_async(_send_newsletter_shard, task)
+                    for task in tasks
+                ]
+
+                # the shards renew the lease of the newsletter,
+                # the heartbeat is renewed while waiting for them
+                for result in results:
+                    while not result.ready():
+                        result.wait(self.lease_seconds / 3)
+
+                        if not result.ready():
+                            self._keep_lease(newsletter)
+
+                outcomes = [
+                    self._get_shard_result(result.get) for result in results
+                ]
+        else:
+            outcomes = [
+                self._get_shard_result(_send_newsletter_shard, *task)
+                for task in tasks
+            ]
+
+        completed = [outcome for outcome in outcomes if outcome is not None]
+
+        for _, retry_counts in completed:
+            for key, count in retry_counts.items():
+                self.retry_counts[key] += count
+
+        return sum(sent for sent, _ in completed), len(completed)
+
+    @staticmethod
+    def _get_shard_result(func, *args):
+        """
+        Returns the number of emails sent by a shard
+        with the retry counts or ``None`` on error
+        """
+        try:
+            return func(*args)
+        except Exception as e:
+            logger.error('An error occurred in a newsletter shard: %s', e)
+
+    def send_emails(self):
+        """sends newsletter emails to subscribers from worker processes"""
+        processed_ids = []
+
+        while True:
+            newsletter = self._get_next_newsletter(processed_ids)
+
+            if newsletter is None:
+                break
+
+            processed_ids.append(newsletter.id)
+            issue_number = newsletter.issue.issue_number
+            shards = self._get_shards()
+
+            logger.info(
+                'Sending newsletter for ISSUE # %s in %s shard(s)',
+                issue_number, len(shards)
+            )
+
+            sent_emails, completed_shards = self._send_shards(
+                newsletter, shards
+            )
+            sent = completed_shards == len(shards) and (
+                sent_emails > 0 or newsletter.deliveries.sent().exists()
+            ) and not self._get_retry_deliveries(newsletter).exists()
+
+            self.sent_email_counts[newsletter.id] = sent_emails
+
+            if completed_shards < len(shards):
+                logger.error(
+                    '%s of %s shard(s) failed for ISSUE # %s, '
+                    'the newsletter will not be saved to sent state',
+                    len(shards) - completed_shards, len(shards), issue_number
+                )
+
+            # Save newsletter to sent state, this is skipped
+            # if the lease was lost to another process
+            if self._release_newsletter(newsletter, sent) and sent:
+                self.sent_newsletters.append(newsletter.id)
+
+            logger.info(
+                'Successfully Sent %s email(s) for ISSUE # %s ',
+                sent_emails, issue_number
+            )
+
+        logger.info(
+            'Newsletter sending process completed. '
+            'Successfully sent newsletters with ID %s, '
+            'retried %s email(s), recovered %s, abandoned %s',
+            self.sent_newsletters, self.retry_counts['retried'],
+            self.retry_counts['recovered'], self.retry_counts['abandoned']
+        )
+
+
+def send_email_newsletter(
+    newsletters=None, respect_schedule=True, lease_heartbeat=None
+):
+    if NEWSFEED_EMAIL_PROCESSES > 1:
+        send_newsletter = ShardedNewsletterEmailSender(
+            newsletters=newsletters,
+            respect_schedule=respect_schedule
+        )
+    else:
+        send_newsletter = import_string(NEWSFEED_EMAIL_SENDER_CLASS)(
+            newsletters=newsletters,
+            respect_schedule=respect_schedule
+        )
+
+    send_newsletter.lease_heartbeat = lease_heartbeat
+    send_newsletter.send_emails()
+
+    return send_newsletter
@@ -1,19 +1,27 @@
+import functools
+
 from django.conf import settings
 from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
+from django.utils.html import escape
 
 from newsfeed.app_settings import NEWSFEED_SITE_BASE_URL
 
 
-def send_subscription_verification_email(verification_url, to_email):
+# Rendered in place of the verification URL and replaced for each subscriber
+VERIFICATION_URL_PLACEHOLDER = '__newsfeed_verification_url__'
+
+
+def render_verification_email(site_url, verification_url):
     """
-    Sends verification e-mail to subscribers
+    Returns the rendered subject, text body and html body
+    of the verification e-mail
 
+    :param site_url: base URL of the site
     :param verification_url: subscribers unique verification url
-    :param to_email: subscribers email
     """
     context = {
-        'site_url': NEWSFEED_SITE_BASE_URL,
+        'site_url': site_url,
         'verification_url': verification_url
     }
 
@@ -30,9 +38,65 @@ def send_subscription_verification_email(verification_url, to_email):
         'newsfeed/email/email_verification.html', context
     )
 
+    return subject, text_body, html_body
+
+
+@functools.lru_cache(maxsize=None)
+def get_verification_email_template(site_url):
+    """
+    Returns the verification e-mail rendered once with a placeholder
+    in place of the verification URL, ``None`` if the templates
+    do not contain the placeholder (e.g. a filter changed the URL)
+
+    :param site_url: base URL of the site
+    """
+    rendered = render_verification_email(
+        site_url, VERIFICATION_URL_PLACEHOLDER
+    )
+
+    if not any(VERIFICATION_URL_PLACEHOLDER in part for part in rendered):
+        return None
+
+    return rendered
+
+
+def get_subscription_verification_email(
+    verification_url, to_email, connection=None
+):
+    """
+    Returns the verification e-mail message of a subscriber
+
+    :param verification_url: subscribers unique verification url
+    :param to_email: subscribers email
+    :param connection: email connection to send the message with
+    """
+    template = get_verification_email_template(NEWSFEED_SITE_BASE_URL)
+
+    if template is None:
+        subject, text_body, html_body = render_verification_email(
+            NEWSFEED_SITE_BASE_URL, verification_url
+        )
+    else:
+        # the templates are auto escaped, the URL is escaped the same way
+        subject, text_body, html_body = (
+            part.replace(VERIFICATION_URL_PLACEHOLDER, escape(verification_url))
+            for part in template
+        )
+
     message = EmailMultiAlternatives(
-        subject, text_body, settings.EMAIL_HOST_USER, [to_email]
+        subject, text_body, settings.EMAIL_HOST_USER, [to_email],
+        connection=connection
     )
 
     message.attach_alternative(html_body, 'text/html')
-    message.send()
+    return message
+
+
+def send_subscription_verification_email(verification_url, to_email):
+    """
+    Sends verification e-mail to subscribers
+
+    :param verification_url: subscribers unique verification url
+    :param to_email: subscribers email
+    """
+    get_subscription_verification_email(verification_url, to_email).send()
@@ -0,0 +1,269 @@
+import hashlib
+import json
+import logging
+import math
+import os
+from urllib.parse import urlsplit
+
+from django.http import HttpRequest
+from django.urls import reverse
+
+from newsfeed.app_settings import NEWSFEED_SITE_BASE_URL
+from newsfeed.models import Issue, PostCategory
+from newsfeed.utils.process_pool import get_process_pool
+from newsfeed.views import IssueDetailView, IssueListView, LatestIssueView
+
+
+logger = logging.getLogger(__name__)
+
+STATIC_EXPORT_MANIFEST = 'manifest.json'
+
+
+def _get_request(path):
+    """
+    Returns a GET request of a page on the host of
+    ``NEWSFEED_SITE_BASE_URL``
+
+    :param path: URL path of the page
+    """
+    site_url = urlsplit(NEWSFEED_SITE_BASE_URL)
+    default_port = 443 if site_url.scheme == 'https' else 80
+
+    request = HttpRequest()
+    request.method = 'GET'
+    request.path = request.path_info = path
+    request.META['SERVER_NAME'] = site_url.hostname
+    request.META['SERVER_PORT'] = str(site_url.port or default_port)
+
+    return request
+
+
+def _render_page(view_class, path, initkwargs=None, **kwargs):
+    """
+    Returns the rendered content of a view, the ``get()`` method
+    of the view is called directly so that the page cache and
+    the conditional GET of the view are skipped
+
+    :param view_class: class based view
+    :param path: URL path of the page
+    :param initkwargs: attributes of the view instance
+    :param kwargs: keyword arguments of the view
+    """
+    request = _get_request(path)
+    view = view_class(**(initkwargs or {}))
+    view.setup(request, **kwargs)
+    response = view.get(request, **kwargs)
+
+    if hasattr(response, 'render'):
+        response.render()
+
+    if response.status_code != 200:
+        raise ValueError(
+            f'{path} returned status code {response.status_code}'
+        )
+
+    return response.content
+
+
+def _write_page(output_dir, path, content):
+    """
+    Writes the content of a page to ``<path>/index.html`` and
+    returns the file path relative to the output directory
+    with the md5 hash of the content
+    """
+    file_name = os.path.join(path.strip('/'), 'index.html')
+    file_path = os.path.join(output_dir, file_name)
+
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+    with open(file_path, 'wb') as f:
+        f.write(content)
+
+    return file_name, hashlib.md5(content).hexdigest()
+
+
+def _export_issue_pages(output_dir, issue_numbers):
+    """
+    Renders the detail pages of the issues, this function is run
+    in the worker processes of the exporter
+
+    :param output_dir: directory of the static site
+    :param issue_numbers: list of issue numbers to render
+    """
+    pages = []
+
+    for issue_number in issue_numbers:
+        path = reverse(
+            'newsfeed:issue_detail', kwargs={'issue_number': issue_number}
+        )
+        content = _render_page(
+            IssueDetailView, path, issue_number=str(issue_number)
+        )
+        pages.append((issue_number, *_write_page(output_dir, path, content)))
+
+    return pages
+
+
+class StaticSiteExporter:
+    """
+    Exports the latest issue, issue list and issue detail pages
+    to static html files
+
+    Issue detail pages are only rendered again when the content version
+    of the issue changed since the last export. A manifest with the md5
+    hash of every file and the files that were changed or removed
+    by the export is written to ``manifest.json``.
+    """
+
+    def __init__(self, output_dir, processes=1, force=False):
+        self.output_dir = output_dir
+        # Number of worker processes that render the issue pages
+        self.processes = processes
+        # Render all the pages even if the content did not change
+        self.force = force
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.output_dir, STATIC_EXPORT_MANIFEST)
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)['files']
+        except (FileNotFoundError, ValueError, KeyError):
+            return {}
+
+    def _write_manifest(self, manifest):
+        with open(self.manifest_path, 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+
+    @staticmethod
+    def _get_issue_versions():
+        """
+        Returns the version of each released issue by issue number,
+        the version also changes when the post categories change
+        """
+        categories_version = PostCategory.objects.get_version()
+
+        return {
+            issue_number: f'{version}:{categories_version}'
+            for issue_number, version in
+            Issue.objects.released().get_content_versions().items()
+        }
+
+    def _needs_render(self, file_name, old_file, version):
+        """Checks if an issue page of the last export is outdated"""
+        if self.force or old_file is None:
+            return True
+
+        if old_file.get('version') != version:
+            return True
+
+        return not os.path.exists(os.path.join(self.output_dir, file_name))
+
+    def _render_issue_pages(self, issue_numbers):
+        """Renders the issue detail pages in the worker processes"""
+        if not issue_numbers:
+            return []
+
+        if self.processes > 1:
+            chunk_size = math.ceil(len(issue_numbers) / self.processes)
+            chunks = [
+                issue_numbers[index:index + chunk_size]
+                for index in range(0, len(issue_numbers), chunk_size)
+            ]
+
+            with get_process_pool(self.processes) as pool:
+                results = [
+                    pool.apply_async(
+                        _export_issue_pages, (self.output_dir, chunk)
+                    )
+                    for chunk in chunks
+                ]
+                return [page for result in results for page in result.get()]
+
+        return _export_issue_pages(self.output_dir, issue_numbers)
+
+    def _render_list_pages(self, issue_count):
+        """Renders the latest issue page and all the issue list pages"""
+        list_view = (IssueListView, {'pagination': 'page'})
+        page_count = max(math.ceil(issue_count / IssueListView.paginate_by), 1)
+        pages = [
+            (reverse('newsfeed:latest_issue'), (LatestIssueView, {}), {}),
+            (reverse('newsfeed:issue_list'), list_view, {}),
+        ]
+        pages += [
+            (
+                reverse('newsfeed:issue_list_page', kwargs={'page': page}),
+                list_view, {'page': page}
+            )
+            for page in range(2, page_count + 1)
+        ]
+
+        return [
+            _write_page(
+                self.output_dir, path,
+                _render_page(view_class, path, initkwargs, **kwargs)
+            )
+            for path, (view_class, initkwargs), kwargs in pages
+        ]
+
+    def export(self):
+        """
+        Exports the pages and returns the manifest of the export
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        old_files = self._load_manifest()
+        issue_versions = self._get_issue_versions()
+        files = {}
+        issue_numbers = []
+
+        # Issue pages whose content did not change are kept
+        for issue_number, version in sorted(issue_versions.items()):
+            path = reverse(
+                'newsfeed:issue_detail', kwargs={'issue_number': issue_number}
+            )
+            file_name = os.path.join(path.strip('/'), 'index.html')
+            old_file = old_files.get(file_name)
+
+            if self._needs_render(file_name, old_file, version):
+                issue_numbers.append(issue_number)
+            else:
+                files[file_name] = old_file
+
+        for issue_number, file_name, md5 in self._render_issue_pages(
+            issue_numbers
+        ):
+            files[file_name] = {
+                'md5': md5, 'version': issue_versions[issue_number]
+            }
+
+        for file_name, md5 in self._render_list_pages(len(issue_versions)):
+            files[file_name] = {'md5': md5}
+
+        removed = sorted(set(old_files) - set(files))
+
+        for file_name in removed:
+            try:
+                os.remove(os.path.join(self.output_dir, file_name))
+            except FileNotFoundError:
+                pass
+
+        manifest = {
+            'files': files,
+            'changed': sorted(
+                file_name for file_name, file in files.items()
+                if old_files.get(file_name, {}).get('md5') != file['md5']
+            ),
+            'removed': removed,
+            'rendered_issues': len(issue_numbers),
+        }
+        self._write_manifest(manifest)
+
+        logger.info(
+            'Exported %s issue page(s), %s file(s) changed, %s removed',
+            len(issue_numbers), len(manifest['changed']), len(removed)
+        )
+
+        return manifest
@@ -0,0 +1,78 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from newsfeed.models import Subscriber
+
+
+SUBSCRIBER_EXPORT_FIELDS = (
+    'email_address', 'verified', 'subscribed',
+    'verification_sent_date', 'created_at',
+)
+SUBSCRIBER_EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/jsonl',
+}
+
+
+class Echo:
+    """File-like object that returns the written value"""
+
+    def write(self, value):
+        return value
+
+
+def filter_subscribers(
+    queryset=None, subscribed=None, verified=None,
+    created_after=None, created_before=None,
+):
+    """
+    Returns the subscribers matching the filters,
+    filters that are ``None`` are not applied
+
+    :param queryset: Subscriber queryset to filter
+    :param subscribed: subscribed status of the subscribers
+    :param verified: verified status of the subscribers
+    :param created_after: minimum creation date (inclusive)
+    :param created_before: maximum creation date (exclusive)
+    """
+    if queryset is None:
+        queryset = Subscriber.objects.all()
+
+    filters = {
+        'subscribed': subscribed,
+        'verified': verified,
+        'created_at__gte': created_after,
+        'created_at__lt': created_before,
+    }
+
+    return queryset.filter(
+        **{key: value for key, value in filters.items() if value is not None}
+    )
+
+
+def stream_subscribers(queryset, file_format='csv', chunk_size=2000):
+    """
+    Yields the lines of a CSV or JSON Lines export of the subscribers,
+    the rows are read in chunks with ``iterator()``
+
+    :param queryset: Subscriber queryset to export
+    :param file_format: ``csv`` or ``jsonl``
+    :param chunk_size: number of rows fetched from the database at a time
+    """
+    rows = queryset.order_by('id').values_list(
+        *SUBSCRIBER_EXPORT_FIELDS
+    ).iterator(chunk_size=chunk_size)
+
+    if file_format == 'jsonl':
+        for row in rows:
+            yield json.dumps(
+                dict(zip(SUBSCRIBER_EXPORT_FIELDS, row)), cls=DjangoJSONEncoder
+            ) + '\n'
+    else:
+        writer = csv.writer(Echo())
+        yield writer.writerow(SUBSCRIBER_EXPORT_FIELDS)
+
+        for row in rows:
+            yield writer.writerow(row)
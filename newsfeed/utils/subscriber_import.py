@@ -0,0 +1,158 @@
+import csv
+import itertools
+import json
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+
+from newsfeed.models import Subscriber
+from newsfeed.utils.email_address import normalize_email_address
+
+
+def read_csv_email_addresses(file, column='email_address'):
+    """
+    Yields the email addresses of a CSV file with a header row,
+    raises ``ValueError`` if the header row does not have the column
+
+    :param file: file object opened in text mode
+    :param column: name of the email address column
+    """
+    reader = csv.DictReader(file)
+
+    # an empty file does not have a header row
+    if reader.fieldnames is not None and column not in reader.fieldnames:
+        raise ValueError(
+            f'Column "{column}" not found, '
+            f'available columns: {", ".join(reader.fieldnames)}'
+        )
+
+    for row in reader:
+        yield row.get(column) or ''
+
+
+def read_jsonl_email_addresses(file, column='email_address'):
+    """
+    Yields the email addresses of a JSON Lines file, every line is
+    either an object with the email address or the email address string
+
+    :param file: file object opened in text mode
+    :param column: name of the email address key
+    """
+    for line in file:
+        if not line.strip():
+            continue
+
+        try:
+            value = json.loads(line)
+        except ValueError:
+            yield ''
+            continue
+
+        if isinstance(value, dict):
+            value = value.get(column)
+
+        yield value if isinstance(value, str) else ''
+
+
+class SubscriberImporter:
+    """
+    Imports email addresses as subscribers in chunks
+
+    Each chunk is validated and normalized, deduplicated against the
+    existing subscribers with one query and inserted with one
+    ``bulk_create()``. Duplicates in later chunks are found
+    as existing subscribers because the chunks are inserted in order.
+    """
+
+    def __init__(self, chunk_size=500, verified=False, progress=None):
+        self.chunk_size = chunk_size
+        # Imported subscribers are subscribed without verification
+        self.verified = verified
+        # Function that is called with the stats after each chunk
+        self.progress = progress
+        self.stats = {
+            'processed': 0,
+            'created': 0,
+            'existing': 0,
+            'duplicate': 0,
+            'invalid': 0,
+        }
+        self.started_at = None
+
+    @property
+    def rate(self):
+        """Returns the number of email addresses processed per second"""
+        elapsed = time.monotonic() - self.started_at
+        return self.stats['processed'] / elapsed if elapsed else 0
+
+    def _get_valid_email_addresses(self, chunk):
+        """
+        Returns the unique valid email addresses of a chunk
+        in the order of the file
+        """
+        email_addresses = {}
+
+        for email_address in chunk:
+            email_address = normalize_email_address(email_address)
+
+            try:
+                validate_email(email_address)
+            except ValidationError:
+                self.stats['invalid'] += 1
+                continue
+
+            if email_address in email_addresses:
+                self.stats['duplicate'] += 1
+            else:
+                email_addresses[email_address] = None
+
+        return list(email_addresses)
+
+    def _import_chunk(self, chunk):
+        email_addresses = self._get_valid_email_addresses(chunk)
+        existing = set(
+            Subscriber.objects.filter(
+                email_address__in=email_addresses
+            ).values_list('email_address', flat=True)
+        )
+        # tokens are generated by the default of the field for each subscriber
+        subscribers = [
+            Subscriber(
+                email_address=email_address,
+                verified=self.verified,
+                subscribed=self.verified,
+            )
+            for email_address in email_addresses
+            if email_address not in existing
+        ]
+
+        Subscriber.objects.bulk_create(
+            subscribers, batch_size=self.chunk_size, ignore_conflicts=True
+        )
+
+        self.stats['processed'] += len(chunk)
+        self.stats['created'] += len(subscribers)
+        self.stats['existing'] += len(email_addresses) - len(subscribers)
+
+    def import_subscribers(self, email_addresses):
+        """
+        Imports the email addresses and returns the stats of the import
+
+        :param email_addresses: iterable of email addresses
+        """
+        self.started_at = time.monotonic()
+        email_addresses = iter(email_addresses)
+
+        while True:
+            chunk = list(itertools.islice(email_addresses, self.chunk_size))
+
+            if not chunk:
+                break
+
+            self._import_chunk(chunk)
+
+            if self.progress:
+                self.progress(self.stats)
+
+        return self.stats
@@ -0,0 +1,36 @@
+from django.core import signing
+from django.urls import reverse
+
+
+UNSUBSCRIBE_TOKEN_SALT = 'newsfeed.unsubscribe'
+
+
+def sign_unsubscribe_token(token):
+    """
+    Signs a subscribers token for the unsubscribe URL
+
+    :param token: subscribers unique token
+    """
+    return signing.Signer(salt=UNSUBSCRIBE_TOKEN_SALT).sign(str(token))
+
+
+def unsign_unsubscribe_token(signed_token):
+    """
+    Returns the subscribers token from a signed token,
+    raises ``django.core.signing.BadSignature`` if the signature is invalid
+
+    :param signed_token: token signed with ``sign_unsubscribe_token``
+    """
+    return signing.Signer(salt=UNSUBSCRIBE_TOKEN_SALT).unsign(signed_token)
+
+
+def get_unsubscribe_url(token):
+    """
+    Returns the one-click unsubscribe URL of a subscriber
+
+    :param token: subscribers unique token
+    """
+    return reverse(
+        'newsfeed:newsletter_one_click_unsubscribe',
+        kwargs={'signed_token': sign_unsubscribe_token(token)}
+    )
@@ -0,0 +1,124 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.core.mail import get_connection
+
+from newsfeed.utils.send_verification import (
+    get_subscription_verification_email,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class VerificationEmailOutbox:
+    """
+    Queue of verification emails that are rendered and sent
+    by a background thread of the current process
+
+    The thread keeps its email connection open while there are emails
+    in the queue and closes it after ``idle_timeout`` seconds without
+    any email. The queue is in memory, emails that are still queued
+    when the process is killed are not sent.
+    """
+    # Seconds to keep the email connection open without any email
+    idle_timeout = 5
+    # Seconds to wait for the queued emails when the process exits
+    exit_timeout = 30
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def put(self, verification_url, to_email):
+        """
+        Queues the verification email of a subscriber
+
+        :param verification_url: subscribers unique verification url
+        :param to_email: subscribers email
+        """
+        self._start_worker()
+        self.queue.put((verification_url, to_email))
+
+    def flush(self, timeout=None):
+        """
+        Waits until the queued emails are sent,
+        returns ``False`` if the timeout expired
+
+        :param timeout: maximum number of seconds to wait
+        """
+        if timeout is None:
+            self.queue.join()
+            return True
+
+        deadline = time.monotonic() + timeout
+
+        while self.queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+
+            time.sleep(0.05)
+
+        return True
+
+    def _start_worker(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+
+            if self._thread is None:
+                atexit.register(self.flush, self.exit_timeout)
+
+            self._thread = threading.Thread(
+                target=self._run, name='newsfeed-verification-outbox',
+                daemon=True
+            )
+            self._thread.start()
+
+    @staticmethod
+    def _close_connection(connection):
+        try:
+            connection.close()
+        except Exception as e:
+            logger.error('Could not close the email connection: %s', e)
+
+    def _run(self):
+        connection = None
+
+        while True:
+            try:
+                verification_url, to_email = self.queue.get(
+                    timeout=self.idle_timeout if connection else None
+                )
+            except queue.Empty:
+                self._close_connection(connection)
+                connection = None
+                continue
+
+            try:
+                if connection is None:
+                    connection = get_connection()
+                    connection.open()
+
+                get_subscription_verification_email(
+                    verification_url, to_email, connection=connection
+                ).send()
+            except Exception as e:
+                logger.error(
+                    'Could not send the verification email to %s: %s',
+                    to_email, e
+                )
+
+                if connection is not None:
+                    # the connection is opened again for the next email
+                    self._close_connection(connection)
+                    connection = None
+            finally:
+                self.queue.task_done()
+
+
+verification_outbox = VerificationEmailOutbox()
@@ -1,32 +1,138 @@
+import itertools
+import json
+from operator import itemgetter
+
 from django.contrib import messages
+from django.contrib.messages import get_messages
+from django.core.signing import BadSignature
 from django.db.models import Prefetch
-from django.http import JsonResponse
-from django.views.generic import DetailView, FormView, ListView, TemplateView
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import add_never_cache_headers, patch_cache_control
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import condition
+from django.views.generic import (
+    DetailView,
+    FormView,
+    ListView,
+    TemplateView,
+    View,
+)
 from django.views.generic.detail import SingleObjectMixin
 
 from .app_settings import (
+    NEWSFEED_CACHE_CONTROL,
+    NEWSFEED_ISSUE_LIST_PAGINATION,
     NEWSFEED_SUBSCRIPTION_REDIRECT_URL,
     NEWSFEED_UNSUBSCRIPTION_REDIRECT_URL,
 )
 from .forms import SubscriberEmailForm
 from .models import Issue, Post, Subscriber
+from .querysets import group_posts_by_category
 from .utils.check_ajax import is_ajax
+from .utils.page_cache import newsfeed_cache_page
+from .utils.pagination import CursorPaginator
+from .utils.unsubscribe import unsign_unsubscribe_token
+
+
+class PageCacheMixin:
+    """Mixin to cache the responses of the view with the page cache"""
+
+    def dispatch(self, request, *args, **kwargs):
+        return newsfeed_cache_page(super().dispatch)(
+            request, *args, **kwargs
+        )
+
+
+class ConditionalGetMixin:
+    """
+    Mixin to add ``ETag`` and ``Last-Modified`` headers to the responses,
+    returns ``304 Not Modified`` without rendering the view
+    if the validators of the client match
 
+    Requests with pending messages are always rendered
+    because the messages are shown on the page.
+    """
+    # keyword arguments of ``django.utils.cache.patch_cache_control()``
+    cache_control = None
+
+    def get_validators(self):
+        """Returns an ``(etag, last_modified)`` tuple for the request"""
+        raise NotImplementedError(
+            'subclasses of ConditionalGetMixin must provide '
+            'a get_validators() method'
+        )
 
-class IssueListView(ListView):
+    def dispatch(self, request, *args, **kwargs):
+        if get_messages(request):
+            response = super().dispatch(request, *args, **kwargs)
+            # the page with the messages must not be reused
+            add_never_cache_headers(response)
+            return response
+
+        etag, last_modified = self.get_validators()
+
+        response = condition(
+            etag_func=lambda request, *args, **kwargs: etag,
+            last_modified_func=lambda request, *args, **kwargs: last_modified,
+        )(super().dispatch)(request, *args, **kwargs)
+
+        if self.cache_control:
+            patch_cache_control(response, **self.cache_control)
+
+        return response
+
+
+class IssueListView(ConditionalGetMixin, PageCacheMixin, ListView):
     model = Issue
     paginate_by = 15
     template_name = 'newsfeed/issue_list.html'
+    cache_control = NEWSFEED_CACHE_CONTROL.get('issue_list')
+    # ``page`` for page numbers or ``cursor`` for cursor pagination
+    pagination = NEWSFEED_ISSUE_LIST_PAGINATION
+
+    def get_validators(self):
+        return Issue.objects.released().get_validators()
+
+    def get_cursor(self, name):
+        cursor = self.request.GET.get(name)
+
+        if cursor is None:
+            return None
+
+        try:
+            return int(cursor)
+        except ValueError:
+            raise Http404('Invalid cursor.')
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.pagination != 'cursor':
+            return super().paginate_queryset(queryset, page_size)
+
+        page = CursorPaginator(queryset, page_size, 'issue_number').page(
+            after=self.get_cursor('after'), before=self.get_cursor('before')
+        )
+        return None, page, page.object_list, page.has_other_pages()
 
     def get_queryset(self):
         return super().get_queryset().released()
 
 
-class IssueDetailView(SingleObjectMixin, ListView):
+class IssueDetailView(
+    ConditionalGetMixin, PageCacheMixin, SingleObjectMixin, ListView
+):
     model = Post
     template_name = "newsfeed/issue_detail.html"
     slug_url_kwarg = 'issue_number'
     slug_field = 'issue_number'
+    cache_control = NEWSFEED_CACHE_CONTROL.get('issue_detail')
+
+    def get_validators(self):
+        return Issue.objects.released().filter(
+            issue_number=self.kwargs[self.slug_url_kwarg]
+        ).get_validators()
 
     def get(self, request, *args, **kwargs):
         self.object = self.get_object(
@@ -37,27 +143,157 @@ class IssueDetailView(SingleObjectMixin, ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['issue'] = self.object
+        context['category_list'] = group_posts_by_category(self.object_list)
         return context
 
     def get_queryset(self):
-        return self.object.posts.visible().select_related('category')
+        return self.object.posts.visible().ordered_by_category()
 
 
-class LatestIssueView(TemplateView):
+class LatestIssueView(PageCacheMixin, TemplateView):
     model = Post
     template_name = "newsfeed/latest_issue.html"
 
     def get_context_data(self, **kwargs):
-        prefetch_posts = Post.objects.visible().select_related('category')
+        prefetch_posts = Post.objects.visible().ordered_by_category()
         latest_issue = Issue.objects.prefetch_related(
             Prefetch('posts', queryset=prefetch_posts)
         ).first()
 
         context = super().get_context_data(**kwargs)
         context['latest_issue'] = latest_issue
+        context['category_list'] = group_posts_by_category(
+            latest_issue.posts.all() if latest_issue else []
+        )
         return context
 
 
+class InvalidFieldsError(ValueError):
+    pass
+
+
+class IssueAPIMixin:
+    """
+    Mixin for the JSON API views of the issues, the fields of the
+    response can be selected with the ``fields`` and ``post_fields``
+    query parameters (e.g. ``?fields=issue_number,title``)
+    """
+    issue_fields = (
+        'issue_number', 'title', 'short_description',
+        'publish_date', 'issue_type',
+    )
+    post_fields = ('title', 'source_url', 'short_description')
+
+    def get_fields(self, param, allowed_fields):
+        value = self.request.GET.get(param)
+
+        if not value:
+            return list(allowed_fields)
+
+        fields = value.split(',')
+        invalid_fields = [
+            field for field in fields if field not in allowed_fields
+        ]
+
+        if invalid_fields:
+            raise InvalidFieldsError(
+                f'Invalid {param}: {", ".join(invalid_fields)}. '
+                f'Available {param}: {", ".join(allowed_fields)}.'
+            )
+
+        return fields
+
+    def get_api_data(self, **kwargs):
+        raise NotImplementedError(
+            'subclasses of IssueAPIMixin must provide '
+            'a get_api_data() method'
+        )
+
+    def get(self, request, *args, **kwargs):
+        try:
+            return self.get_api_data(**kwargs)
+        except InvalidFieldsError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+
+    def get_issue_response(self, queryset):
+        """
+        Returns the response of an issue with its visible posts
+        grouped by category, raises ``Http404`` if there is no issue
+
+        :param queryset: queryset of the issue
+        """
+        issue_fields = self.get_fields('fields', self.issue_fields)
+        post_fields = self.get_fields('post_fields', self.post_fields)
+
+        issue = queryset.values('id', *issue_fields).first()
+
+        if issue is None:
+            raise Http404('No issue found matching the query.')
+
+        posts = Post.objects.filter(
+            issue_id=issue.pop('id')
+        ).visible().ordered_by_category().values(
+            'category_id', 'category__name', *post_fields
+        )
+        issue['categories'] = [
+            {
+                'name': category_posts[0]['category__name'],
+                'posts': [
+                    {field: post[field] for field in post_fields}
+                    for post in category_posts
+                ],
+            }
+            for category_posts in (
+                list(posts) for _, posts in itertools.groupby(
+                    posts, key=itemgetter('category_id')
+                )
+            )
+        ]
+
+        return JsonResponse(issue)
+
+
+class IssueListAPIView(IssueAPIMixin, View):
+    """Streams all the released issues as JSON"""
+    chunk_size = 2000
+
+    def stream_issues(self, issues):
+        yield '{"issues": ['
+
+        for index, issue in enumerate(issues):
+            yield (',' if index else '') + json.dumps(
+                issue, cls=DjangoJSONEncoder
+            )
+
+        yield ']}'
+
+    def get_api_data(self, **kwargs):
+        fields = self.get_fields('fields', self.issue_fields)
+        issues = Issue.objects.released().values(*fields).iterator(
+            chunk_size=self.chunk_size
+        )
+
+        return StreamingHttpResponse(
+            self.stream_issues(issues), content_type='application/json'
+        )
+
+
+class IssueDetailAPIView(IssueAPIMixin, View):
+
+    def get_api_data(self, **kwargs):
+        return self.get_issue_response(
+            Issue.objects.released().filter(
+                issue_number=kwargs['issue_number']
+            )
+        )
+
+
+class LatestIssueAPIView(IssueAPIMixin, View):
+
+    def get_api_data(self, **kwargs):
+        return self.get_issue_response(Issue.objects.released())
+
+
 class SubscriptionAjaxResponseMixin(FormView):
     """Mixin to add Ajax support to the subscription form"""
     form_class = SubscriberEmailForm
@@ -162,3 +398,35 @@ class NewsletterSubscriptionConfirmView(DetailView):
             object=self.object, subscribed=subscribed
         )
         return self.render_to_response(context)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class NewsletterOneClickUnsubscribeView(DetailView):
+    """
+    Unsubscribes with the signed token of the unsubscribe link in the
+    newsletter, a ``POST`` request unsubscribes without any confirmation
+    (RFC 8058 ``List-Unsubscribe-Post``), a ``GET`` request shows
+    a button to confirm the unsubscription
+    """
+    template_name = "newsfeed/newsletter_one_click_unsubscribe.html"
+    model = Subscriber
+
+    def get_object(self, queryset=None):
+        try:
+            token = unsign_unsubscribe_token(self.kwargs['signed_token'])
+        except BadSignature:
+            raise Http404('Invalid unsubscribe link.')
+
+        if queryset is None:
+            queryset = self.get_queryset()
+
+        return get_object_or_404(queryset, token=token)
+
+    def post(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        self.object.unsubscribe()
+
+        context = self.get_context_data(
+            object=self.object, unsubscribed=True
+        )
+        return self.render_to_response(context)
@@ -20,6 +20,12 @@ setup(
     install_requires=[
         'Django >= 2.2',
     ],
+    extras_require={
+        'async': [
+            'aiosmtplib >= 2.0; python_version >= "3.7"',
+            'asgiref >= 3.2',
+        ],
+    },
     test_suite="runtests.runtests",
     license="GNU Public License",
     zip_safe=False,
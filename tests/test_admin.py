@@ -1,3 +1,5 @@
+import csv
+import json
 from unittest import mock
 
 from django.contrib.auth.models import User
@@ -7,7 +9,10 @@ from django.utils import timezone
 
 from model_bakery import baker
 
-from newsfeed.models import Issue, Newsletter, Post
+from newsfeed.constants import DELIVERY_SENT, JOB_QUEUED, JOB_RUNNING
+from newsfeed.models import (
+    Issue, Newsletter, NewsletterDelivery, NewsletterJob, Post, Subscriber
+)
 
 
 class IssueAdminTest(TestCase):
@@ -29,6 +34,7 @@ class IssueAdminTest(TestCase):
 
     def test_publish_issues_action(self):
         self.assertTrue(self.unreleased_issue.is_draft)
+        updated_at = self.unreleased_issue.updated_at
         data = {
             'action': 'publish_issues',
             '_selected_action': [self.unreleased_issue.id]
@@ -44,6 +50,7 @@ class IssueAdminTest(TestCase):
 
         self.unreleased_issue.refresh_from_db()
         self.assertFalse(self.unreleased_issue.is_draft)
+        self.assertGreater(self.unreleased_issue.updated_at, updated_at)
 
     def test_make_draft_action(self):
         self.assertFalse(self.released_issue.is_draft)
@@ -81,7 +88,7 @@ class NewsletterAdminTest(TestCase):
         )
         self.client.force_login(self.admin)
 
-    @mock.patch('newsfeed.admin.send_email_newsletter')
+    @mock.patch('newsfeed.utils.send_newsletters.send_email_newsletter')
     def test_send_newsletters_action(self, send_email_newsletter):
         data = {
             'action': 'send_newsletters',
@@ -94,7 +101,71 @@ class NewsletterAdminTest(TestCase):
         self.assertRedirects(
             response, reverse('admin:newsfeed_newsletter_changelist')
         )
-        send_email_newsletter.assert_called_once()
+        # Newsletters are sent by the worker, not in the request
+        send_email_newsletter.assert_not_called()
+
+        job = NewsletterJob.objects.get()
+        self.assertEqual(job.newsletter, self.released_newsletter)
+        self.assertEqual(job.status, JOB_QUEUED)
+        self.assertFalse(job.respect_schedule)
+
+    def test_change_view_shows_delivery_progress(self):
+        subscriber = baker.make(Subscriber, subscribed=True, verified=True)
+        baker.make(
+            NewsletterDelivery, newsletter=self.released_newsletter,
+            subscriber=subscriber, status=DELIVERY_SENT
+        )
+
+        response = self.client.get(
+            reverse(
+                'admin:newsfeed_newsletter_change',
+                args=[self.released_newsletter.id]
+            )
+        )
+
+        self.assertContains(
+            response, '1 sent, 0 failed, 0 abandoned, 0 remaining'
+        )
+
+
+class NewsletterJobAdminTest(TestCase):
+
+    def setUp(self):
+        self.admin = baker.make(
+            User, username='admin', password='test_passWord',
+            is_staff=True, is_superuser=True
+        )
+        self.newsletter = baker.make(Newsletter)
+        self.job = baker.make(
+            NewsletterJob, newsletter=self.newsletter, status=JOB_RUNNING
+        )
+        subscribers = baker.make(
+            Subscriber, subscribed=True, verified=True, _quantity=3
+        )
+        NewsletterDelivery.objects.record(
+            self.newsletter, [s.id for s in subscribers[:2]], DELIVERY_SENT
+        )
+        self.client.force_login(self.admin)
+
+    def test_changelist_shows_job_progress(self):
+        response = self.client.get(
+            reverse('admin:newsfeed_newsletterjob_changelist')
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Running')
+        self.assertContains(response, '<td class="field-sent">2</td>')
+
+    def test_change_view_shows_delivery_progress(self):
+        response = self.client.get(
+            reverse(
+                'admin:newsfeed_newsletterjob_change', args=[self.job.id]
+            )
+        )
+
+        self.assertContains(
+            response, '2 sent, 0 failed, 0 abandoned, 1 remaining'
+        )
 
 
 class PostAdminTest(TestCase):
@@ -115,6 +186,7 @@ class PostAdminTest(TestCase):
 
     def test_hide_post_action(self):
         self.assertTrue(self.visible_post.is_visible)
+        updated_at = self.visible_post.updated_at
         data = {
             'action': 'hide_post',
             '_selected_action': [self.visible_post.id]
@@ -130,6 +202,7 @@ class PostAdminTest(TestCase):
 
         self.visible_post.refresh_from_db()
         self.assertFalse(self.visible_post.is_visible)
+        self.assertGreater(self.visible_post.updated_at, updated_at)
 
     def test_make_post_visible_action(self):
         self.assertFalse(self.invisible_post.is_visible)
@@ -148,3 +221,77 @@ class PostAdminTest(TestCase):
 
         self.invisible_post.refresh_from_db()
         self.assertTrue(self.invisible_post.is_visible)
+
+
+class SubscriberAdminTest(TestCase):
+
+    def setUp(self):
+        self.admin = baker.make(
+            User, username='admin', password='test_passWord',
+            is_staff=True, is_superuser=True
+        )
+        self.subscribers = baker.make(
+            Subscriber, subscribed=True, verified=True, _quantity=3
+        )
+        self.client.force_login(self.admin)
+
+    def export(self, action):
+        data = {
+            'action': action,
+            '_selected_action': [s.id for s in self.subscribers[:2]]
+        }
+        return self.client.post(
+            reverse('admin:newsfeed_subscriber_changelist'), data
+        )
+
+    def test_export_subscribers_csv_action(self):
+        response = self.export('export_subscribers_csv')
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(
+            response['Content-Disposition'],
+            'attachment; filename="subscribers.csv"'
+        )
+
+        rows = list(
+            csv.reader(
+                b''.join(response.streaming_content).decode().splitlines()
+            )
+        )
+
+        self.assertEqual(rows[0][0], 'email_address')
+        self.assertEqual(
+            [row[0] for row in rows[1:]],
+            [s.email_address for s in self.subscribers[:2]]
+        )
+
+    def test_export_subscribers_jsonl_action(self):
+        response = self.export('export_subscribers_jsonl')
+
+        lines = b''.join(response.streaming_content).decode().splitlines()
+
+        self.assertEqual(response['Content-Type'], 'application/jsonl')
+        self.assertEqual(
+            [json.loads(line)['email_address'] for line in lines],
+            [s.email_address for s in self.subscribers[:2]]
+        )
+        self.assertTrue(json.loads(lines[0])['subscribed'])
+
+    def test_filter_subscribers_by_created_at(self):
+        old_subscriber = self.subscribers[0]
+        Subscriber.objects.filter(id=old_subscriber.id).update(
+            created_at=timezone.now() - timezone.timedelta(days=30)
+        )
+        since = (timezone.now() - timezone.timedelta(days=7)).date()
+
+        response = self.client.get(
+            reverse('admin:newsfeed_subscriber_changelist'),
+            {'created_at__gte': since.isoformat()}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            sorted(s.id for s in response.context['cl'].result_list),
+            sorted(s.id for s in self.subscribers[1:])
+        )
@@ -0,0 +1,456 @@
+import csv
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from model_bakery import baker
+
+from newsfeed.constants import JOB_COMPLETED, JOB_FAILED, JOB_SKIPPED
+from newsfeed.models import (
+    Issue, Newsletter, NewsletterJob, Post, Subscriber
+)
+from newsfeed.querysets import NewsletterJobQuerySet
+from newsfeed.utils.page_cache import PAGE_CACHE_GENERATION_KEY
+
+
+class NewsfeedWorkerCommandTest(TestCase):
+
+    def setUp(self):
+        baker.make(Subscriber, subscribed=True, verified=True, _quantity=3)
+        self.released_issue = baker.make(
+            Issue, is_draft=False,
+            publish_date=timezone.now() - timezone.timedelta(days=1),
+        )
+        self.newsletter = baker.make(
+            Newsletter, issue=self.released_issue, is_sent=False,
+            schedule=timezone.now() + timezone.timedelta(days=1),
+        )
+
+    def test_newsfeed_worker_sends_queued_newsletters(self):
+        job = baker.make(NewsletterJob, newsletter=self.newsletter)
+        out = StringIO()
+
+        call_command('newsfeed_worker', '--once', stdout=out)
+
+        self.assertIn('Processed 1 newsletter job(s)', out.getvalue())
+        self.assertEqual(len(mail.outbox), 3)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, JOB_COMPLETED)
+        self.assertEqual(job.sent_emails, 3)
+        self.assertTrue(job.worker)
+        self.assertIsNotNone(job.started_at)
+        self.assertIsNotNone(job.finished_at)
+
+        self.newsletter.refresh_from_db()
+        self.assertTrue(self.newsletter.is_sent)
+
+    def test_newsfeed_worker_respects_schedule(self):
+        job = baker.make(
+            NewsletterJob, newsletter=self.newsletter, respect_schedule=True
+        )
+
+        call_command('newsfeed_worker', '--once', stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, JOB_SKIPPED)
+        self.assertEqual(
+            job.error, 'skipped: newsletter is not scheduled to be sent yet'
+        )
+        self.assertEqual(job.sent_emails, 0)
+        self.assertIsNone(job.lease_expires_at)
+
+    def test_newsfeed_worker_skips_newsletter_leased_by_others(self):
+        Newsletter.objects.filter(id=self.newsletter.id).update(
+            lease_owner='cron-node',
+            lease_expires_at=timezone.now() + timezone.timedelta(minutes=5)
+        )
+        job = baker.make(NewsletterJob, newsletter=self.newsletter)
+
+        call_command('newsfeed_worker', '--once', stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, JOB_SKIPPED)
+        self.assertEqual(
+            job.error, 'skipped: newsletter is being sent by cron-node'
+        )
+
+    @mock.patch(
+        'newsfeed.utils.send_newsletters.NEWSFEED_EMAIL_LEASE_SECONDS', 0
+    )
+    def test_newsfeed_worker_renews_job_lease(self):
+        job = baker.make(NewsletterJob, newsletter=self.newsletter)
+
+        with mock.patch.object(
+            NewsletterJobQuerySet, 'renew_lease',
+            autospec=True, return_value=True
+        ) as renew_lease:
+            call_command('newsfeed_worker', '--once', stdout=StringIO())
+
+        # renewed with the newsletter lease while it was being sent
+        self.assertTrue(renew_lease.called)
+        job.refresh_from_db()
+        self.assertEqual(job.status, JOB_COMPLETED)
+        self.assertEqual(renew_lease.call_args[0][1], job.worker)
+
+    @mock.patch('newsfeed.utils.newsletter_jobs.send_email_newsletter')
+    def test_newsfeed_worker_with_error(self, send_email_newsletter):
+        send_email_newsletter.side_effect = Exception('SMTP is down')
+        job = baker.make(NewsletterJob, newsletter=self.newsletter)
+
+        call_command('newsfeed_worker', '--once', stdout=StringIO())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, JOB_FAILED)
+        self.assertEqual(job.error, 'SMTP is down')
+
+    def test_newsfeed_worker_with_empty_queue(self):
+        out = StringIO()
+
+        call_command('newsfeed_worker', '--once', stdout=out)
+
+        self.assertIn('Processed 0 newsletter job(s)', out.getvalue())
+
+
+class NewsfeedExportStaticCommandTest(TestCase):
+
+    def setUp(self):
+        self.issues = baker.make(
+            Issue, is_draft=False, _quantity=16,
+            publish_date=timezone.now() - timezone.timedelta(days=1),
+        )
+        self.post = baker.make(
+            Post, issue=self.issues[0], is_visible=True, title='Post title'
+        )
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.output_dir = temp_dir.name
+
+    def export(self, *args):
+        out = StringIO()
+        call_command(
+            'newsfeed_export_static', self.output_dir, *args, stdout=out
+        )
+
+        with open(os.path.join(self.output_dir, 'manifest.json')) as f:
+            return json.load(f), out.getvalue()
+
+    def get_issue_file(self, issue):
+        return f'newsfeed/issues/{issue.issue_number}/index.html'
+
+    def test_newsfeed_export_static(self):
+        manifest, out = self.export()
+
+        self.assertIn('Rendered 16 issue page(s)', out)
+        self.assertEqual(
+            set(manifest['files']),
+            {
+                'newsfeed/index.html',
+                'newsfeed/issues/index.html',
+                'newsfeed/issues/page/2/index.html',
+                *[self.get_issue_file(issue) for issue in self.issues],
+            }
+        )
+        self.assertEqual(manifest['changed'], sorted(manifest['files']))
+
+        with open(
+            os.path.join(self.output_dir, self.get_issue_file(self.issues[0]))
+        ) as f:
+            self.assertIn('Post title', f.read())
+
+    def test_newsfeed_export_static_is_incremental(self):
+        self.export()
+
+        manifest, out = self.export()
+
+        self.assertEqual(manifest['rendered_issues'], 0)
+        self.assertEqual(manifest['changed'], [])
+
+        self.post.title = 'Changed title'
+        self.post.save()
+
+        manifest, out = self.export()
+
+        self.assertEqual(manifest['rendered_issues'], 1)
+        self.assertIn(self.get_issue_file(self.issues[0]), manifest['changed'])
+
+    def test_newsfeed_export_static_removes_unreleased_issues(self):
+        self.export()
+        self.issues[1].is_draft = True
+        self.issues[1].save()
+
+        manifest, out = self.export()
+
+        # the second issue list page is removed with 15 issues left
+        self.assertEqual(
+            manifest['removed'],
+            [
+                self.get_issue_file(self.issues[1]),
+                'newsfeed/issues/page/2/index.html',
+            ]
+        )
+        self.assertFalse(
+            os.path.exists(
+                os.path.join(
+                    self.output_dir, self.get_issue_file(self.issues[1])
+                )
+            )
+        )
+
+    @override_settings(ALLOWED_HOSTS=['newsfeed.example.com'])
+    @mock.patch('newsfeed.utils.page_cache.NEWSFEED_PAGE_CACHE_TIMEOUT', 60)
+    def test_newsfeed_export_static_with_page_cache(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        manifest, out = self.export()
+
+        self.assertIn('Rendered 16 issue page(s)', out)
+        self.assertIn('newsfeed/index.html', manifest['files'])
+        # the pages are rendered without the page cache
+        self.assertIsNone(cache.get(PAGE_CACHE_GENERATION_KEY))
+
+    def test_newsfeed_export_static_with_force(self):
+        self.export()
+
+        manifest, out = self.export('--force')
+
+        self.assertEqual(manifest['rendered_issues'], 16)
+        self.assertEqual(manifest['changed'], [])
+
+
+class NewsfeedImportSubscribersCommandTest(TestCase):
+
+    def setUp(self):
+        self.existing_subscriber = baker.make(
+            Subscriber, email_address='existing@example.com'
+        )
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = temp_dir.name
+
+    def write_file(self, name, content):
+        path = os.path.join(self.temp_dir, name)
+
+        with open(path, 'w') as f:
+            f.write(content)
+
+        return path
+
+    def import_subscribers(self, path, *args):
+        out = StringIO()
+        call_command('newsfeed_import_subscribers', path, *args, stdout=out)
+        return out.getvalue()
+
+    def test_import_subscribers_from_csv(self):
+        path = self.write_file(
+            'subscribers.csv',
+            'name,email_address\n'
+            'A,first@EXAMPLE.com\n'
+            'B, second@example.com \n'
+            'C,existing@example.com\n'
+            'D,first@example.com\n'
+            'E,invalid\n'
+            'F,third@example.com\n'
+        )
+
+        out = self.import_subscribers(path, '--chunk-size', '2')
+
+        self.assertIn(
+            'Created 3 subscriber(s), 2 existing, 0 duplicate, 1 invalid', out
+        )
+        self.assertIn('Processed 6 email address(es)', out)
+        self.assertEqual(
+            set(Subscriber.objects.values_list('email_address', flat=True)),
+            {
+                'existing@example.com', 'first@example.com',
+                'second@example.com', 'third@example.com',
+            }
+        )
+        self.assertEqual(
+            Subscriber.objects.values('token').distinct().count(), 4
+        )
+        self.assertFalse(Subscriber.objects.subscribed().exists())
+
+    def test_import_subscribers_finds_existing_with_domain_case(self):
+        self.client.post(
+            reverse('newsfeed:newsletter_subscribe'),
+            data={'email_address': 'Alice@Example.COM'}
+        )
+        path = self.write_file(
+            'subscribers.csv', 'email_address\nAlice@Example.COM\n'
+        )
+
+        out = self.import_subscribers(path)
+
+        self.assertIn('Created 0 subscriber(s), 1 existing', out)
+        self.assertEqual(
+            list(Subscriber.objects.filter(
+                email_address__iexact='alice@example.com'
+            ).values_list('email_address', flat=True)),
+            ['Alice@example.com']
+        )
+
+    def test_import_subscribers_deduplicates_chunk(self):
+        path = self.write_file(
+            'subscribers.csv',
+            'email_address\nfirst@example.com\nfirst@example.com\n'
+        )
+
+        out = self.import_subscribers(path)
+
+        self.assertIn('Created 1 subscriber(s), 0 existing, 1 duplicate', out)
+
+    def test_import_subscribers_from_jsonl(self):
+        path = self.write_file(
+            'subscribers.jsonl',
+            '{"email": "first@example.com"}\n'
+            '"second@example.com"\n'
+            '\n'
+            'not json\n'
+        )
+
+        out = self.import_subscribers(path, '--column', 'email', '--verified')
+
+        self.assertIn('Created 2 subscriber(s), 0 existing', out)
+        self.assertIn('1 invalid', out)
+        self.assertEqual(Subscriber.objects.subscribed().count(), 2)
+
+    def test_import_subscribers_with_unknown_format(self):
+        path = self.write_file('subscribers.txt', 'first@example.com\n')
+
+        with self.assertRaises(CommandError):
+            self.import_subscribers(path)
+
+    def test_import_subscribers_with_missing_column(self):
+        path = self.write_file(
+            'subscribers.csv', 'name,email\nA,first@example.com\n'
+        )
+
+        with self.assertRaisesMessage(
+            CommandError,
+            'Column "email_address" not found, available columns: name, email'
+        ):
+            self.import_subscribers(path)
+
+        self.assertEqual(Subscriber.objects.count(), 1)
+
+    def test_import_subscribers_with_invalid_chunk_size(self):
+        path = self.write_file(
+            'subscribers.csv', 'email_address\nfirst@example.com\n'
+        )
+
+        for chunk_size in ('0', '-1'):
+            with self.assertRaisesMessage(
+                CommandError, '--chunk-size must be a positive number'
+            ):
+                self.import_subscribers(path, '--chunk-size', chunk_size)
+
+        self.assertEqual(Subscriber.objects.count(), 1)
+
+    def test_import_subscribers_with_missing_file(self):
+        with self.assertRaises(CommandError):
+            self.import_subscribers(
+                os.path.join(self.temp_dir, 'missing.csv')
+            )
+
+
+class NewsfeedExportSubscribersCommandTest(TestCase):
+
+    def setUp(self):
+        self.subscribed = baker.make(
+            Subscriber, subscribed=True, verified=True, _quantity=2
+        )
+        self.unsubscribed = baker.make(
+            Subscriber, subscribed=False, verified=True
+        )
+        self.unverified = baker.make(
+            Subscriber, subscribed=False, verified=False
+        )
+        Subscriber.objects.filter(id=self.unverified.id).update(
+            created_at=timezone.now() - timezone.timedelta(days=10)
+        )
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.path = os.path.join(temp_dir.name, 'subscribers.csv')
+
+    def export(self, *args):
+        out = StringIO()
+        call_command(
+            'newsfeed_export_subscribers', self.path, *args, stdout=out
+        )
+
+        with open(self.path, newline='') as f:
+            return f.read(), out.getvalue()
+
+    def test_export_subscribers_csv(self):
+        content, out = self.export()
+
+        rows = list(csv.reader(content.splitlines()))
+
+        self.assertIn('Exported 4 subscriber(s)', out)
+        self.assertEqual(
+            rows[0],
+            [
+                'email_address', 'verified', 'subscribed',
+                'verification_sent_date', 'created_at',
+            ]
+        )
+        self.assertEqual(len(rows), 5)
+
+    def test_export_subscribers_with_filters(self):
+        content, out = self.export(
+            '--format', 'jsonl', '--subscribed', 'false', '--verified', 'yes'
+        )
+
+        self.assertIn('Exported 1 subscriber(s)', out)
+        self.assertEqual(
+            json.loads(content)['email_address'],
+            self.unsubscribed.email_address
+        )
+
+    def test_export_subscribers_with_created_at_range(self):
+        created_before = timezone.now() - timezone.timedelta(days=5)
+
+        content, out = self.export(
+            '--format', 'jsonl',
+            '--created-before', created_before.isoformat(),
+        )
+
+        self.assertIn('Exported 1 subscriber(s)', out)
+        self.assertEqual(
+            json.loads(content)['email_address'],
+            self.unverified.email_address
+        )
+
+        content, out = self.export(
+            '--created-after', created_before.date().isoformat()
+        )
+
+        self.assertIn('Exported 3 subscriber(s)', out)
+
+    def test_export_subscribers_to_stdout(self):
+        out = StringIO()
+        call_command(
+            'newsfeed_export_subscribers', '-', '--format', 'jsonl',
+            '--subscribed', 'true', stdout=out
+        )
+
+        self.assertEqual(
+            [
+                json.loads(line)['email_address']
+                for line in out.getvalue().splitlines()
+            ],
+            [s.email_address for s in self.subscribed]
+        )
@@ -1,11 +1,31 @@
-from unittest import mock
+import importlib
+from unittest import mock, skipUnless
 
+from django.apps import apps
+from django.db import connection
+from django.db.models import Q
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from model_bakery import baker
 
-from newsfeed.models import Issue, Newsletter, Post, PostCategory, Subscriber
+from newsfeed.constants import (
+    DELIVERY_ABANDONED, DELIVERY_FAILED, DELIVERY_SENT, JOB_RUNNING
+)
+from newsfeed.models import (
+    Issue,
+    Newsletter,
+    NewsletterDelivery,
+    NewsletterJob,
+    Post,
+    PostCategory,
+    Subscriber,
+)
+from newsfeed.querysets import group_posts_by_category
+from newsfeed.utils.unsubscribe import (
+    sign_unsubscribe_token, unsign_unsubscribe_token
+)
 
 
 class PostModelTest(TestCase):
@@ -28,6 +48,36 @@ class PostModelTest(TestCase):
 
         self.assertEqual(posts.count(), 4)
 
+    def test_ordered_by_category(self):
+        Post.objects.all().delete()
+        first, second = baker.make(PostCategory, order=1), baker.make(
+            PostCategory, order=0
+        )
+        posts = [
+            baker.make(Post, category=first, order=1),
+            baker.make(Post, category=None, order=0),
+            baker.make(Post, category=second, order=2),
+            baker.make(Post, category=first, order=0),
+            baker.make(Post, category=second, order=1),
+        ]
+
+        with self.assertNumQueries(1):
+            ordered_posts = list(Post.objects.ordered_by_category())
+            [post.category for post in ordered_posts]
+
+        self.assertEqual(
+            ordered_posts,
+            [posts[4], posts[2], posts[3], posts[0], posts[1]]
+        )
+        self.assertEqual(
+            group_posts_by_category(ordered_posts),
+            [
+                (second, [posts[4], posts[2]]),
+                (first, [posts[3], posts[0]]),
+                (None, [posts[1]]),
+            ]
+        )
+
 
 class IssueModelTest(TestCase):
 
@@ -98,6 +148,48 @@ class SubscriberModelTest(TestCase):
 
         self.assertEqual(subscribers.count(), 1)
 
+    def test_normalize_email_addresses_migration(self):
+        migration = importlib.import_module(
+            'newsfeed.migrations.0008_normalize_subscriber_email_addresses'
+        )
+        mixed_case = baker.make(Subscriber, email_address='Bob@Example.COM')
+        subscribed = baker.make(
+            Subscriber, email_address='alice@example.com', subscribed=True
+        )
+        duplicate = baker.make(
+            Subscriber, email_address='alice@EXAMPLE.com', subscribed=True
+        )
+
+        migration.normalize_email_addresses(apps, None)
+
+        mixed_case.refresh_from_db()
+        self.assertEqual(mixed_case.email_address, 'Bob@example.com')
+        subscribed.refresh_from_db()
+        self.assertTrue(subscribed.subscribed)
+        # the duplicate is not sent the newsletters anymore
+        duplicate.refresh_from_db()
+        self.assertEqual(duplicate.email_address, 'alice@EXAMPLE.com')
+        self.assertFalse(duplicate.subscribed)
+
+    def test_without_deliveries_queryset(self):
+        newsletter = baker.make(Newsletter)
+        other_newsletter = baker.make(Newsletter)
+        delivered = baker.make(Subscriber, subscribed=True, verified=True)
+        NewsletterDelivery.objects.record(
+            newsletter, [delivered.id], DELIVERY_SENT
+        )
+        NewsletterDelivery.objects.record(
+            other_newsletter, [self.verified_subscriber.id], DELIVERY_SENT
+        )
+
+        subscribers = Subscriber.objects.subscribed().without_deliveries(
+            newsletter.deliveries.all()
+        )
+
+        self.assertEqual(list(subscribers), [self.verified_subscriber])
+        # a correlated anti-join instead of NOT IN over all the deliveries
+        self.assertIn('NOT EXISTS', str(subscribers.query))
+
     def test_token_expired(self):
         self.unverified_subscriber.verification_sent_date = (
             timezone.now() - timezone.timedelta(days=3)
@@ -126,15 +218,61 @@ class SubscriberModelTest(TestCase):
 
     @mock.patch('newsfeed.models.uuid')
     def test_reset_token_with_existing_token(self, uuid):
-        old_token = self.unverified_subscriber.token
+        used_token = str(self.verified_subscriber.token)
         new_token = 'new_token'
-        uuid.uuid4.side_effect = [old_token, new_token]
+        uuid.uuid4.side_effect = [used_token, new_token]
 
-        self.unverified_subscriber.reset_token()
+        with CaptureQueriesContext(connection) as queries:
+            self.unverified_subscriber.reset_token()
 
-        self.assertNotEqual(old_token, self.unverified_subscriber.token)
+        # no SELECT to check the token, the update is retried
+        self.assertEqual(
+            [
+                query['sql'].split()[0]
+                for query in queries.captured_queries
+                if query['sql'].startswith(('SELECT', 'UPDATE'))
+            ],
+            ['UPDATE', 'UPDATE']
+        )
+
+        self.assertEqual(new_token, self.unverified_subscriber.token)
+        self.unverified_subscriber.refresh_from_db()
         self.assertEqual(new_token, self.unverified_subscriber.token)
 
+    def test_reset_token_saves_only_token(self):
+        old_token = self.unverified_subscriber.token
+        sent_date = timezone.now()
+
+        with CaptureQueriesContext(connection) as queries:
+            reset = self.unverified_subscriber.reset_token(
+                verification_sent_date=sent_date
+            )
+
+        self.assertTrue(reset)
+        updates = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertNotIn('email_address', updates[0])
+
+        self.unverified_subscriber.refresh_from_db()
+        self.assertNotEqual(old_token, self.unverified_subscriber.token)
+        self.assertEqual(
+            self.unverified_subscriber.verification_sent_date, sent_date
+        )
+
+    def test_reset_token_with_condition(self):
+        old_token = self.unverified_subscriber.token
+
+        reset = self.unverified_subscriber.reset_token(
+            condition=Q(subscribed=True)
+        )
+
+        self.assertFalse(reset)
+        self.unverified_subscriber.refresh_from_db()
+        self.assertEqual(str(old_token), self.unverified_subscriber.token)
+
     def test_subscribe(self):
         self.unverified_subscriber.verification_sent_date = timezone.now()
         self.unverified_subscriber.save()
@@ -233,6 +371,21 @@ class SubscriberModelTest(TestCase):
         self.assertEqual(new_unverified_subscriber.token, old_token)
         send_verification_email.assert_not_called()
 
+    @mock.patch('newsfeed.models.send_subscription_verification_email')
+    def test_send_verification_email_sent_by_concurrent_request(
+        self, send_verification_email
+    ):
+        # another request sent the email after the subscriber was loaded
+        Subscriber.objects.filter(id=self.unverified_subscriber.id).update(
+            verification_sent_date=timezone.now()
+        )
+        old_token = self.unverified_subscriber.token
+
+        self.unverified_subscriber.send_verification_email(False)
+
+        self.assertEqual(self.unverified_subscriber.token, old_token)
+        send_verification_email.assert_not_called()
+
     def test_get_absolute_url(self):
         expected_url = (
             f'/newsfeed/subscribe/confirm/{self.unverified_subscriber.token}/'
@@ -242,6 +395,18 @@ class SubscriberModelTest(TestCase):
             expected_url
         )
 
+    def test_get_unsubscribe_url(self):
+        signed_token = sign_unsubscribe_token(self.unverified_subscriber.token)
+
+        self.assertEqual(
+            self.unverified_subscriber.get_unsubscribe_url(),
+            f'/newsfeed/unsubscribe/{signed_token}/'
+        )
+        self.assertEqual(
+            unsign_unsubscribe_token(signed_token),
+            str(self.unverified_subscriber.token)
+        )
+
 
 class NewsletterModelTest(TestCase):
 
@@ -249,9 +414,221 @@ class NewsletterModelTest(TestCase):
         newsletter = baker.make(Newsletter)
         self.assertEqual(newsletter.subject, str(newsletter))
 
+    def test_get_delivery_progress(self):
+        newsletter = baker.make(Newsletter)
+        sent, failed, abandoned, _ = baker.make(
+            Subscriber, subscribed=True, verified=True, _quantity=4
+        )
+        baker.make(
+            NewsletterDelivery, newsletter=newsletter,
+            subscriber=sent, status=DELIVERY_SENT
+        )
+        baker.make(
+            NewsletterDelivery, newsletter=newsletter,
+            subscriber=failed, status=DELIVERY_FAILED
+        )
+        baker.make(
+            NewsletterDelivery, newsletter=newsletter,
+            subscriber=abandoned, status=DELIVERY_ABANDONED
+        )
+
+        self.assertEqual(
+            newsletter.get_delivery_progress(),
+            {'sent': 1, 'failed': 1, 'abandoned': 1, 'remaining': 2}
+        )
+
+
+class NewsletterQuerySetTest(TestCase):
+
+    def setUp(self):
+        self.newsletters = baker.make(Newsletter, _quantity=2)
+
+    def test_claim(self):
+        newsletter = Newsletter.objects.claim('owner-1', 60)
+
+        self.assertEqual(newsletter.id, self.newsletters[0].id)
+        self.assertEqual(newsletter.lease_owner, 'owner-1')
+        self.assertTrue(newsletter.is_sending)
+
+        # leased newsletters are skipped
+        newsletter = Newsletter.objects.claim('owner-2', 60)
+        self.assertEqual(newsletter.id, self.newsletters[1].id)
+
+        self.assertIsNone(Newsletter.objects.claim('owner-3', 60))
+
+    def test_claim_expired_lease(self):
+        Newsletter.objects.update(
+            lease_owner='owner-1',
+            lease_expires_at=timezone.now() - timezone.timedelta(seconds=1)
+        )
+
+        newsletter = Newsletter.objects.claim('owner-2', 60)
+
+        self.assertEqual(newsletter.id, self.newsletters[0].id)
+        self.assertEqual(newsletter.lease_owner, 'owner-2')
+
+    def test_renew_lease(self):
+        Newsletter.objects.claim('owner-1', 60)
+        newsletters = Newsletter.objects.filter(id=self.newsletters[0].id)
+
+        self.assertTrue(newsletters.renew_lease('owner-1', 120))
+        self.assertFalse(newsletters.renew_lease('owner-2', 120))
+
+    def test_release_lease(self):
+        Newsletter.objects.claim('owner-1', 60)
+        newsletters = Newsletter.objects.filter(id=self.newsletters[0].id)
+
+        self.assertEqual(newsletters.release_lease('owner-2'), 0)
+        self.assertEqual(newsletters.release_lease('owner-1', is_sent=True), 1)
+
+        newsletter = newsletters.get()
+        self.assertTrue(newsletter.is_sent)
+        self.assertFalse(newsletter.is_sending)
+        self.assertEqual(newsletter.lease_owner, '')
+
+
+class NewsletterJobModelTest(TestCase):
+
+    def test_str(self):
+        job = baker.make(NewsletterJob)
+        self.assertEqual(str(job), f'{job.newsletter} (Queued)')
+
+    def test_claim(self):
+        jobs = baker.make(NewsletterJob, _quantity=2)
+
+        job = NewsletterJob.objects.claim('worker-1', 60)
+
+        self.assertEqual(job.id, jobs[0].id)
+        self.assertEqual(job.status, JOB_RUNNING)
+        self.assertEqual(job.worker, 'worker-1')
+        self.assertIsNotNone(job.started_at)
+        self.assertGreater(job.lease_expires_at, timezone.now())
+
+        self.assertEqual(NewsletterJob.objects.claim('worker-2', 60), jobs[1])
+        self.assertIsNone(NewsletterJob.objects.claim('worker-3', 60))
+
+    def test_claim_job_with_expired_lease(self):
+        crashed_job = baker.make(
+            NewsletterJob, status=JOB_RUNNING, worker='crashed-worker',
+            lease_expires_at=timezone.now() - timezone.timedelta(minutes=1)
+        )
+        baker.make(
+            NewsletterJob, status=JOB_RUNNING, worker='running-worker',
+            lease_expires_at=timezone.now() + timezone.timedelta(minutes=1)
+        )
+
+        job = NewsletterJob.objects.claim('worker-1', 60)
+
+        self.assertEqual(job, crashed_job)
+        self.assertEqual(job.worker, 'worker-1')
+        self.assertIsNone(NewsletterJob.objects.claim('worker-2', 60))
+
+    def test_renew_lease(self):
+        job = baker.make(NewsletterJob)
+        NewsletterJob.objects.claim('worker-1', 0)
+
+        self.assertTrue(NewsletterJob.objects.renew_lease('worker-1', 60))
+        self.assertFalse(NewsletterJob.objects.renew_lease('worker-2', 60))
+
+        job.refresh_from_db()
+        self.assertGreater(job.lease_expires_at, timezone.now())
+
+
+class NewsletterDeliveryModelTest(TestCase):
+
+    def setUp(self):
+        self.newsletter = baker.make(Newsletter)
+        self.subscribers = baker.make(Subscriber, _quantity=3)
+
+    def test_str(self):
+        delivery = baker.make(
+            NewsletterDelivery, newsletter=self.newsletter,
+            subscriber=self.subscribers[0], status=DELIVERY_SENT
+        )
+        self.assertEqual(
+            str(delivery),
+            f'{self.newsletter} - {self.subscribers[0]}'
+        )
+
+    def test_record(self):
+        subscriber_ids = [subscriber.id for subscriber in self.subscribers]
+
+        NewsletterDelivery.objects.record(
+            self.newsletter, subscriber_ids[:2], DELIVERY_FAILED
+        )
+        NewsletterDelivery.objects.record(
+            self.newsletter, subscriber_ids, DELIVERY_SENT
+        )
+
+        deliveries = NewsletterDelivery.objects.filter(
+            newsletter=self.newsletter
+        ).order_by('subscriber_id')
+
+        self.assertEqual(deliveries.sent().count(), 3)
+        self.assertFalse(deliveries.failed().exists())
+        self.assertEqual(
+            list(deliveries.values_list('attempts', flat=True)), [2, 2, 1]
+        )
+
+    def test_retry_later_and_abandon(self):
+        subscriber_ids = [subscriber.id for subscriber in self.subscribers]
+        NewsletterDelivery.objects.record(
+            self.newsletter, subscriber_ids, DELIVERY_FAILED
+        )
+        deliveries = NewsletterDelivery.objects.filter(
+            newsletter=self.newsletter
+        )
+
+        deliveries.filter(subscriber_id=subscriber_ids[0]).retry_later(60)
+        deliveries.filter(subscriber_id=subscriber_ids[1]).abandon()
+
+        self.assertEqual(
+            list(deliveries.due().values_list('subscriber_id', flat=True)),
+            subscriber_ids[1:]
+        )
+        self.assertEqual(
+            list(deliveries.failed().values_list('subscriber_id', flat=True)),
+            [subscriber_ids[0], subscriber_ids[2]]
+        )
+        self.assertEqual(deliveries.abandoned().count(), 1)
+
 
 class PostCategoryModelTest(TestCase):
 
     def test_str(self):
         category = baker.make(PostCategory)
         self.assertEqual(category.name, str(category))
+
+
+@skipUnless(
+    connection.vendor in ('sqlite', 'postgresql'),
+    'query plans are only checked on SQLite and PostgreSQL'
+)
+class PartialIndexQueryPlanTest(TestCase):
+
+    def assertUsesIndex(self, queryset, index_name):
+        if connection.vendor == 'postgresql':
+            # the test tables are too small for the planner
+            # to prefer an index over a sequential scan
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+        self.assertIn(index_name, queryset.explain())
+
+    def test_subscribed_subscribers_use_partial_index(self):
+        queryset = Subscriber.objects.subscribed().filter(
+            id__gt=100
+        ).order_by('id').values_list('id', 'email_address', 'token')[:50]
+
+        self.assertUsesIndex(queryset, 'newsfeed_subscribed_idx')
+
+    def test_released_issues_use_partial_index(self):
+        self.assertUsesIndex(
+            Issue.objects.released()[:15], 'newsfeed_issue_released_idx'
+        )
+
+    def test_visible_posts_of_issue_use_partial_index(self):
+        self.assertUsesIndex(
+            Post.objects.filter(issue_id=1).visible(),
+            'newsfeed_post_visible_idx'
+        )
@@ -1,20 +1,58 @@
-from unittest import mock
+from email.generator import BytesGenerator
+from io import BytesIO
+import socketserver
+import threading
+import time
+from unittest import mock, skipIf
 
 from django.core import mail
+from django.core.cache import cache
+from django.core.mail import get_connection
+from django.core.mail.backends import locmem
+from django.core.mail.message import SafeMIMEText
+from django.db import connection, transaction
 from django.test import TestCase
 from django.test.client import RequestFactory
+from django.template.loader import render_to_string
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
 from model_bakery import baker
 
-from newsfeed.models import Issue, Subscriber, Newsletter
+from newsfeed.app_settings import NEWSFEED_SITE_BASE_URL
+from newsfeed.constants import DELIVERY_FAILED, DELIVERY_SENT
+from newsfeed.models import (
+    Issue,
+    Newsletter,
+    NewsletterDelivery,
+    Post,
+    PostCategory,
+    Subscriber,
+)
+from newsfeed.utils import async_send_newsletters
 from newsfeed.utils.check_ajax import is_ajax
+from newsfeed.utils.newsletter_message import (
+    UNSUBSCRIBE_URL_PLACEHOLDER,
+    NewsletterEmailMessage,
+    NewsletterMessageTemplate,
+)
+from newsfeed.utils.rate_limit import TokenBucketRateLimiter, get_rate_limiter
+from newsfeed.utils.render_cache import (
+    get_rendered_newsletter_cache_key, invalidate_rendered_newsletter
+)
 from newsfeed.utils.send_verification import (
-    send_subscription_verification_email
+    get_subscription_verification_email,
+    get_verification_email_template,
+    render_verification_email,
+    send_subscription_verification_email,
 )
+from newsfeed.utils.verification_outbox import VerificationEmailOutbox
 from newsfeed.utils.send_newsletters import (
-    NewsletterEmailSender, send_email_newsletter
+    NewsletterEmailSender,
+    ShardedNewsletterEmailSender,
+    _send_newsletter_shard,
+    send_email_newsletter,
 )
 
 
@@ -46,6 +84,181 @@ class SendSubscriptionVerificationEmailTest(TestCase):
         )
 
 
+class VerificationEmailTemplateTest(TestCase):
+
+    def setUp(self):
+        get_verification_email_template.cache_clear()
+        self.addCleanup(get_verification_email_template.cache_clear)
+        self.subscribers = baker.make(
+            Subscriber, subscribed=False, verified=False, _quantity=2
+        )
+
+    def send_emails(self):
+        with mock.patch(
+            'newsfeed.utils.send_verification.render_to_string',
+            wraps=render_to_string
+        ) as render:
+            for subscriber in self.subscribers:
+                send_subscription_verification_email(
+                    subscriber.get_verification_url(),
+                    subscriber.email_address
+                )
+
+        return render.call_count
+
+    def test_templates_are_rendered_once(self):
+        self.assertEqual(self.send_emails(), 3)
+        self.assertEqual(self.send_emails(), 0)
+
+        for message, subscriber in zip(mail.outbox, self.subscribers):
+            subject, text_body, html_body = render_verification_email(
+                NEWSFEED_SITE_BASE_URL, subscriber.get_verification_url()
+            )
+            self.assertEqual(message.subject, subject)
+            self.assertEqual(message.body, text_body)
+            self.assertEqual(message.alternatives[0][0], html_body)
+            self.assertIn(subscriber.get_verification_url(), message.body)
+
+    def test_verification_url_is_escaped(self):
+        verification_url = '/confirm/?token=1&next=/'
+
+        send_subscription_verification_email(
+            verification_url, 'test@test.com'
+        )
+
+        self.assertIn(
+            '/confirm/?token=1&amp;next=/', mail.outbox[0].alternatives[0][0]
+        )
+        self.assertEqual(
+            mail.outbox[0].body,
+            render_verification_email(
+                NEWSFEED_SITE_BASE_URL, verification_url
+            )[1]
+        )
+
+    @mock.patch(
+        'newsfeed.utils.send_verification.render_verification_email',
+        side_effect=lambda site_url, verification_url: (
+            'Subject', verification_url.upper(), verification_url.upper()
+        )
+    )
+    def test_templates_without_placeholder_are_rendered_for_each_email(
+        self, render_verification_email
+    ):
+        self.send_emails()
+
+        # the placeholder render and one render for each email
+        self.assertEqual(render_verification_email.call_count, 3)
+        self.assertEqual(
+            mail.outbox[0].body,
+            self.subscribers[0].get_verification_url().upper()
+        )
+
+
+class VerificationEmailOutboxTest(TestCase):
+
+    def setUp(self):
+        self.outbox = VerificationEmailOutbox()
+        self.subscribers = baker.make(
+            Subscriber, subscribed=False, verified=False, _quantity=3
+        )
+
+    def put_subscribers(self):
+        for subscriber in self.subscribers:
+            self.outbox.put(
+                subscriber.get_verification_url(), subscriber.email_address
+            )
+
+    @mock.patch(
+        'newsfeed.utils.verification_outbox.get_connection',
+        wraps=get_connection
+    )
+    def test_outbox_sends_emails_with_one_connection(self, get_connection):
+        self.put_subscribers()
+
+        self.assertTrue(self.outbox.flush(timeout=5))
+        self.assertEqual(
+            [message.to[0] for message in mail.outbox],
+            [s.email_address for s in self.subscribers]
+        )
+        self.assertIn(
+            self.subscribers[0].get_verification_url(), mail.outbox[0].body
+        )
+        get_connection.assert_called_once_with()
+
+    @mock.patch('newsfeed.utils.verification_outbox.get_connection')
+    def test_outbox_closes_idle_connection(self, get_connection):
+        self.outbox.idle_timeout = 0.01
+        self.put_subscribers()
+
+        self.assertTrue(self.outbox.flush(timeout=5))
+
+        for _ in range(100):
+            if get_connection.return_value.close.called:
+                break
+            time.sleep(0.01)
+
+        get_connection.return_value.close.assert_called_once_with()
+
+    @mock.patch(
+        'newsfeed.utils.verification_outbox.get_connection',
+        wraps=get_connection
+    )
+    def test_outbox_continues_after_error(self, get_connection):
+        with mock.patch(
+            'newsfeed.utils.verification_outbox.'
+            'get_subscription_verification_email',
+            side_effect=[
+                Exception('Error'),
+                *[
+                    get_subscription_verification_email(
+                        s.get_verification_url(), s.email_address
+                    )
+                    for s in self.subscribers[1:]
+                ]
+            ]
+        ):
+            self.put_subscribers()
+            self.assertTrue(self.outbox.flush(timeout=5))
+
+        self.assertEqual(len(mail.outbox), 2)
+        # the connection is opened again after the error
+        self.assertEqual(get_connection.call_count, 2)
+
+    @mock.patch('newsfeed.models.NEWSFEED_VERIFICATION_EMAIL_OUTBOX', True)
+    def test_send_verification_email_uses_outbox(self):
+        # the test transaction is never committed
+        with mock.patch(
+            'newsfeed.models.verification_outbox', self.outbox
+        ), mock.patch.object(
+            transaction, 'on_commit', side_effect=lambda func: func()
+        ):
+            self.subscribers[0].send_verification_email(True)
+
+        self.assertTrue(self.outbox.flush(timeout=5))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(
+            mail.outbox[0].to, [self.subscribers[0].email_address]
+        )
+
+    @mock.patch('newsfeed.models.NEWSFEED_VERIFICATION_EMAIL_OUTBOX', True)
+    def test_send_verification_email_is_queued_on_commit(self):
+        outbox = mock.Mock()
+
+        with mock.patch(
+            'newsfeed.models.verification_outbox', outbox
+        ), mock.patch.object(transaction, 'on_commit') as on_commit:
+            self.subscribers[0].send_verification_email(True)
+
+        # nothing is queued until the transaction is committed
+        outbox.put.assert_not_called()
+        on_commit.call_args[0][0]()
+        outbox.put.assert_called_once_with(
+            self.subscribers[0].get_verification_url(),
+            self.subscribers[0].email_address
+        )
+
+
 class SendNewsletterEmailTest(TestCase):
 
     def setUp(self):
@@ -94,6 +307,21 @@ class SendNewsletterEmailTest(TestCase):
             schedule=timezone.now() + timezone.timedelta(days=1),
         )
 
+    @staticmethod
+    def fail_first_messages(connection, count):
+        """Makes sending the first ``count`` messages of a connection fail"""
+        send_messages = connection.send_messages
+        errors = [Exception()] * count
+
+        def send_messages_with_error(messages):
+            if errors:
+                raise errors.pop()
+            return send_messages(messages)
+
+        connection.send_messages = mock.Mock(
+            side_effect=send_messages_with_error
+        )
+
     def test_send_email_newsletter(self):
         newsletters = Newsletter.objects.filter(
             id__in=[
@@ -141,15 +369,433 @@ class SendNewsletterEmailTest(TestCase):
 
         self.assertTrue(newsletters.filter(is_sent=True).exists())
 
+    def test_send_email_newsletter_with_unsubscribe_urls(self):
+        send_newsletter = NewsletterEmailSender(
+            newsletters=Newsletter.objects.filter(
+                id=self.released_newsletter_1.id
+            )
+        )
+        send_newsletter.send_emails()
+
+        self.assertEqual(len(mail.outbox), 5)
+
+        for message in mail.outbox:
+            subscriber = Subscriber.objects.get(email_address=message.to[0])
+            unsubscribe_url = (
+                f'http://127.0.0.1:8000{subscriber.get_unsubscribe_url()}'
+            )
+            mime_message = message.message()
+
+            self.assertEqual(
+                mime_message['List-Unsubscribe'], f'<{unsubscribe_url}>'
+            )
+            self.assertIn(
+                f'href="{unsubscribe_url}"'.encode(),
+                mime_message.as_bytes()
+            )
+
     @mock.patch('newsfeed.utils.send_newsletters.logger')
     def test_send_email_newsletter_with_error(self, logger):
         send_newsletter = NewsletterEmailSender()
+        send_newsletter.retry_backoff = 0
         send_newsletter.connection.send_messages = mock.Mock(
             side_effect=Exception()
         )
         send_newsletter.send_emails()
         logger.error.assert_called()
 
+    def test_send_email_newsletter_with_concurrent_connections(self):
+        send_newsletter = NewsletterEmailSender(
+            newsletters=Newsletter.objects.filter(
+                id=self.released_newsletter_1.id
+            )
+        )
+        send_newsletter.batch_size = 1
+        send_newsletter.max_connections = 3
+
+        send_newsletter.send_emails()
+
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            sorted(s.email_address for s in self.verified_subscribers)
+        )
+        self.assertEqual(
+            send_newsletter.sent_newsletters,
+            [self.released_newsletter_1.id]
+        )
+
+    def test_send_email_newsletter_concurrent_connection_error(self):
+        lock = threading.Lock()
+        errors = [Exception('Connection unexpectedly closed')]
+        send_messages = locmem.EmailBackend.send_messages
+
+        def send_messages_with_error(backend, messages):
+            with lock:
+                if errors:
+                    raise errors.pop()
+            return send_messages(backend, messages)
+
+        send_newsletter = NewsletterEmailSender(
+            newsletters=Newsletter.objects.filter(
+                id=self.released_newsletter_1.id
+            )
+        )
+        send_newsletter.batch_size = 1
+        send_newsletter.max_connections = 2
+        send_newsletter.retry_backoff = 0
+
+        with mock.patch.object(
+            locmem.EmailBackend, 'send_messages',
+            autospec=True, side_effect=send_messages_with_error
+        ):
+            send_newsletter.send_emails()
+
+        # the batch sent with the broken connection is retried
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(
+            send_newsletter.retry_counts,
+            {'retried': 1, 'recovered': 1, 'abandoned': 0}
+        )
+        self.assertTrue(
+            Newsletter.objects.get(id=self.released_newsletter_1.id).is_sent
+        )
+
+    def test_send_email_newsletter_consults_rate_limiter(self):
+        send_newsletter = NewsletterEmailSender(
+            newsletters=Newsletter.objects.filter(
+                id=self.released_newsletter_1.id
+            )
+        )
+        send_newsletter.batch_size = 2
+        send_newsletter.rate_limiter = mock.Mock(throttled_time=0)
+
+        send_newsletter.send_emails()
+
+        send_newsletter.rate_limiter.acquire.assert_has_calls(
+            [mock.call(2), mock.call(2), mock.call(1)]
+        )
+
+    @mock.patch('newsfeed.utils.send_newsletters.SUBSCRIBER_FETCH_SIZE', 2)
+    def test_send_email_newsletter_without_batch_size(self):
+        send_newsletter = NewsletterEmailSender(
+            newsletters=Newsletter.objects.filter(
+                id=self.released_newsletter_1.id
+            )
+        )
+        send_newsletter.batch_size = 0
+        send_newsletter.rate_limiter = mock.Mock(throttled_time=0)
+        send_newsletter.connection = mock.Mock()
+        # the connection is only opened by the first message
+        send_newsletter.connection.open.side_effect = (
+            lambda: send_newsletter.connection.open.call_count == 1
+        )
+        send_newsletter.connection.send_messages.return_value = 1
+
+        send_newsletter.send_emails()
+
+        # the subscribers are fetched in chunks
+        # and sent in one session
+        send_newsletter.rate_limiter.acquire.assert_has_calls(
+            [mock.call(2), mock.call(2), mock.call(1)]
+        )
+        self.assertEqual(send_newsletter.connection.send_messages.call_count, 5)
+        send_newsletter.connection.close.assert_called_once_with()
+        self.assertEqual(
+            send_newsletter.sent_newsletters,
+            [self.released_newsletter_1.id]
+        )
+
+    def test_send_email_newsletter_records_deliveries(self):
+        newsletter = self.released_newsletter_1
+        send_newsletter = NewsletterEmailSender(
+            newsletters=Newsletter.objects.filter(id=newsletter.id)
+        )
+        send_newsletter.batch_size = 2
+        send_newsletter.max_attempts = 1
+        self.fail_first_messages(send_newsletter.connection, 2)
+
+        send_newsletter.send_emails()
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(newsletter.deliveries.sent().count(), 3)
+        self.assertEqual(newsletter.deliveries.abandoned().count(), 2)
+        self.assertEqual(
+            newsletter.get_delivery_progress(),
+            {'sent': 3, 'failed': 0, 'abandoned': 2, 'remaining': 0}
+        )
+
+    def test_send_email_newsletter_retries_failed_deliveries(self):
+        newsletter = self.released_newsletter_1
+        send_newsletter = NewsletterEmailSender(
+            newsletters=Newsletter.objects.filter(id=newsletter.id)
+        )
+        send_newsletter.batch_size = 2
+        send_newsletter.retry_backoff = 0
+        self.fail_first_messages(send_newsletter.connection, 2)
+
+        send_newsletter.send_emails()
+
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(newsletter.deliveries.sent().count(), 5)
+        self.assertEqual(
+            sorted(newsletter.deliveries.values_list('attempts', flat=True)),
+            [1, 1, 1, 2, 2]
+        )
+        self.assertEqual(send_newsletter.sent_email_counts[newsletter.id], 5)
+        self.assertEqual(
+            send_newsletter.retry_counts,
+            {'retried': 2, 'recovered': 2, 'abandoned': 0}
+        )
+        newsletter.refresh_from_db()
+        self.assertTrue(newsletter.is_sent)
+
+    def test_send_email_newsletter_abandons_after_max_attempts(self):
+        newsletter = self.released_newsletter_1
+        send_newsletter = NewsletterEmailSender(
+            newsletters=Newsletter.objects.filter(id=newsletter.id)
+        )
+        send_newsletter.batch_size = 2
+        send_newsletter.retry_backoff = 0
+        send_newsletter.max_attempts = 3
+
+        with mock.patch.object(
+            locmem.EmailBackend, 'send_messages', side_effect=Exception()
+        ) as send_messages:
+            send_newsletter.send_emails()
+
+        # each of the 5 emails is attempted 3 times
+        self.assertEqual(send_messages.call_count, 15)
+        self.assertEqual(newsletter.deliveries.abandoned().count(), 5)
+        self.assertEqual(
+            send_newsletter.retry_counts,
+            {'retried': 10, 'recovered': 0, 'abandoned': 5}
+        )
+        newsletter.refresh_from_db()
+        self.assertFalse(newsletter.is_sent)
+
+    def test_send_email_newsletter_with_refused_recipient(self):
+        newsletter = self.released_newsletter_1
+        refused = self.verified_subscribers[2]
+        send_newsletter = NewsletterEmailSender(
+            newsletters=Newsletter.objects.filter(id=newsletter.id)
+        )
+        # the refused recipient is in the middle of the batch
+        send_newsletter.batch_size = 5
+        send_newsletter.retry_backoff = 0
+        send_newsletter.max_attempts = 3
+
+        with LocalSMTPServer(refused=[refused.email_address]) as server:
+            send_newsletter.connection = get_connection(
+                'django.core.mail.backends.smtp.EmailBackend',
+                host='127.0.0.1', port=server.server_address[1],
+                username='', password='', use_tls=False, timeout=5
+            )
+            send_newsletter.send_emails()
+
+        # the other subscribers of the batch received the newsletter once
+        self.assertEqual(
+            sorted(recipients[0] for _, recipients, _ in server.messages),
+            sorted(
+                s.email_address for s in self.verified_subscribers
+                if s != refused
+            )
+        )
+        self.assertEqual(newsletter.deliveries.sent().count(), 4)
+        self.assertEqual(
+            newsletter.deliveries.abandoned().get().subscriber, refused
+        )
+        self.assertEqual(
+            send_newsletter.retry_counts,
+            {'retried': 2, 'recovered': 0, 'abandoned': 1}
+        )
+
+    def test_send_email_newsletter_waits_for_scheduled_retries(self):
+        newsletter = self.released_newsletter_1
+        failed, *delivered = self.verified_subscribers
+        NewsletterDelivery.objects.record(
+            newsletter, [s.id for s in delivered], DELIVERY_SENT
+        )
+        # failed in a previous run
+        NewsletterDelivery.objects.record(
+            newsletter, [failed.id], DELIVERY_FAILED
+        )
+        NewsletterDelivery.objects.filter(
+            subscriber=failed
+        ).retry_later(0.2)
+
+        send_newsletter = NewsletterEmailSender(
+            newsletters=Newsletter.objects.filter(id=newsletter.id)
+        )
+        send_newsletter.send_emails()
+
+        self.assertEqual(
+            [message.to[0] for message in mail.outbox],
+            [failed.email_address]
+        )
+        self.assertEqual(
+            send_newsletter.retry_counts,
+            {'retried': 1, 'recovered': 1, 'abandoned': 0}
+        )
+        newsletter.refresh_from_db()
+        self.assertTrue(newsletter.is_sent)
+
+    def test_get_retry_delay(self):
+        send_newsletter = NewsletterEmailSender()
+        send_newsletter.retry_backoff = 10
+        send_newsletter.retry_backoff_max = 300
+
+        self.assertTrue(5 <= send_newsletter._get_retry_delay(1) <= 10)
+        self.assertTrue(20 <= send_newsletter._get_retry_delay(3) <= 40)
+        self.assertTrue(150 <= send_newsletter._get_retry_delay(10) <= 300)
+
+    def test_send_email_newsletter_resume_skips_delivered_subscribers(self):
+        newsletter = self.released_newsletter_1
+        delivered = self.verified_subscribers[:3]
+        NewsletterDelivery.objects.record(
+            newsletter, [s.id for s in delivered], DELIVERY_SENT
+        )
+
+        send_email_newsletter(
+            newsletters=Newsletter.objects.filter(id=newsletter.id)
+        )
+
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            sorted(s.email_address for s in self.verified_subscribers[3:])
+        )
+        newsletter.refresh_from_db()
+        self.assertTrue(newsletter.is_sent)
+
+    def test_send_email_newsletter_skips_newsletters_leased_by_others(self):
+        Newsletter.objects.filter(id=self.released_newsletter_1.id).update(
+            lease_owner='other-node',
+            lease_expires_at=timezone.now() + timezone.timedelta(minutes=5)
+        )
+
+        send_email_newsletter()
+
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(
+            mail.outbox[0].subject,
+            self.released_newsletter_2.subject
+        )
+        self.released_newsletter_1.refresh_from_db()
+        self.assertFalse(self.released_newsletter_1.is_sent)
+        self.assertEqual(self.released_newsletter_1.lease_owner, 'other-node')
+
+    def test_send_email_newsletter_claims_expired_leases(self):
+        Newsletter.objects.filter(id=self.released_newsletter_1.id).update(
+            lease_owner='crashed-node',
+            lease_expires_at=timezone.now() - timezone.timedelta(minutes=5)
+        )
+
+        send_email_newsletter()
+
+        self.assertEqual(len(mail.outbox), 10)
+        self.released_newsletter_1.refresh_from_db()
+        self.assertTrue(self.released_newsletter_1.is_sent)
+        self.assertFalse(self.released_newsletter_1.is_sending)
+
+    def test_send_email_newsletter_stops_when_lease_is_lost(self):
+        send_newsletter = NewsletterEmailSender(
+            newsletters=Newsletter.objects.filter(
+                id=self.released_newsletter_1.id
+            )
+        )
+        send_newsletter.batch_size = 2
+        # renew the lease before every batch
+        send_newsletter.lease_seconds = 0
+
+        send_newsletter.connection.send_messages = mock.Mock(
+            side_effect=lambda messages: len(messages)
+        )
+        record_deliveries = send_newsletter._record_deliveries
+
+        def take_over_lease(*args):
+            # another process takes over the lease after the first batch
+            record_deliveries(*args)
+            Newsletter.objects.update(lease_owner='other-node')
+
+        # the lease is renewed from the main thread in this test
+        with mock.patch.object(
+            send_newsletter, '_record_deliveries', side_effect=take_over_lease
+        ), mock.patch.object(
+            NewsletterEmailSender, '_lease_heartbeat',
+            return_value=mock.MagicMock()
+        ):
+            send_newsletter.send_emails()
+
+        # only the first batch was sent
+        self.assertEqual(send_newsletter.connection.send_messages.call_count, 2)
+        self.assertEqual(send_newsletter.sent_newsletters, [])
+        self.released_newsletter_1.refresh_from_db()
+        self.assertFalse(self.released_newsletter_1.is_sent)
+
+    def test_send_email_newsletter_keeps_lease_during_long_batch(self):
+        newsletter = self.released_newsletter_1
+        send_newsletter = NewsletterEmailSender(
+            newsletters=Newsletter.objects.filter(id=newsletter.id)
+        )
+        # all the subscribers are sent in one batch
+        send_newsletter.batch_size = 0
+        send_newsletter.lease_seconds = 0.3
+        send_messages = locmem.EmailBackend.send_messages
+        send_threads = set()
+        renew_threads = set()
+
+        def slow_send_messages(backend, messages):
+            # the batch takes longer than the lease
+            send_threads.add(threading.current_thread())
+            time.sleep(0.5)
+            return send_messages(backend, messages)
+
+        def renew_lease(sender, newsletter):
+            # the heartbeat thread can not use the database
+            # of the test case, it only records the renewal
+            renew_threads.add(threading.current_thread())
+            sender.lease_renewed_at = time.monotonic()
+            return True
+
+        with mock.patch.object(
+            locmem.EmailBackend, 'send_messages',
+            autospec=True, side_effect=slow_send_messages
+        ), mock.patch.object(
+            NewsletterEmailSender, '_renew_lease',
+            autospec=True, side_effect=renew_lease
+        ):
+            send_newsletter.send_emails()
+
+        # the batch was sent from the main thread and
+        # the lease was renewed while it was being sent
+        self.assertEqual(send_threads, {threading.main_thread()})
+        self.assertTrue(renew_threads)
+        self.assertNotIn(threading.main_thread(), renew_threads)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(send_newsletter.sent_newsletters, [newsletter.id])
+        newsletter.refresh_from_db()
+        self.assertTrue(newsletter.is_sent)
+
+    def test_lease_heartbeat_closes_database_connections(self):
+        newsletter = self.released_newsletter_1
+        send_newsletter = NewsletterEmailSender()
+        send_newsletter.lease_seconds = 0.03
+        close_threads = []
+
+        with mock.patch.object(
+            NewsletterEmailSender, '_keep_lease', return_value=True
+        ), mock.patch(
+            'newsfeed.utils.send_newsletters.connections.close_all',
+            side_effect=lambda: close_threads.append(
+                threading.current_thread()
+            )
+        ):
+            with send_newsletter._lease_heartbeat(newsletter):
+                time.sleep(0.05)
+
+        self.assertEqual(len(close_threads), 1)
+        self.assertIsNot(close_threads[0], threading.main_thread())
+
     def test_send_email_newsletter_with_no_subscribers(self):
         newsletters = Newsletter.objects.filter(
             id__in=[
@@ -238,6 +884,27 @@ class SendNewsletterEmailTest(TestCase):
         self.assertEqual(len(list(next(email_msg_generator))), 2)
         self.assertEqual(len(list(next(email_msg_generator))), 1)
 
+    def test_get_subscriber_batches_uses_keyset_pagination(self):
+        send_newsletter = NewsletterEmailSender()
+        send_newsletter.batch_size = 2
+
+        with CaptureQueriesContext(connection) as queries:
+            batches = list(send_newsletter._get_subscriber_batches())
+
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+        self.assertEqual(
+            [subscriber[1] for batch in batches for subscriber in batch],
+            list(
+                Subscriber.objects.subscribed().order_by('id').values_list(
+                    'email_address', flat=True
+                )
+            )
+        )
+        self.assertEqual(len(queries), 3)
+
+        for query in queries:
+            self.assertNotIn('OFFSET', query['sql'])
+
     def test_get_subscriber_emails_return_email_message_instances(self):
         rendered = NewsletterEmailSender._render_newsletter(
             self.released_newsletter_1
@@ -268,6 +935,551 @@ class SendNewsletterEmailTest(TestCase):
             next(email_msg_generator)
 
 
+class ShardedNewsletterEmailSenderTest(TestCase):
+
+    def setUp(self):
+        self.subscribers = baker.make(
+            Subscriber, subscribed=True, verified=True, _quantity=7
+        )
+        self.released_issue = baker.make(
+            Issue, is_draft=False,
+            publish_date=timezone.now() - timezone.timedelta(days=1),
+        )
+        self.newsletter = baker.make(
+            Newsletter, issue=self.released_issue, is_sent=False,
+            schedule=timezone.now() - timezone.timedelta(days=1),
+        )
+
+    def test_get_shards(self):
+        send_newsletter = ShardedNewsletterEmailSender(processes=3)
+        shards = send_newsletter._get_shards()
+
+        self.assertEqual(len(shards), 3)
+        self.assertEqual(shards[0][0], self.subscribers[0].id)
+        self.assertEqual(shards[-1][1], self.subscribers[-1].id + 1)
+
+        for (_, end_id), (start_id, _) in zip(shards, shards[1:]):
+            self.assertEqual(end_id, start_id)
+
+    def test_get_shards_with_no_subscribers(self):
+        Subscriber.objects.all().update(subscribed=False)
+        send_newsletter = ShardedNewsletterEmailSender(processes=3)
+
+        self.assertEqual(send_newsletter._get_shards(), [])
+
+    def test_send_newsletter_shard(self):
+        subscriber_id_range = (
+            self.subscribers[0].id, self.subscribers[3].id
+        )
+        sent, retry_counts = _send_newsletter_shard(
+            self.newsletter.id, subscriber_id_range, 2, 'test-owner'
+        )
+
+        self.assertEqual(sent, 3)
+        self.assertEqual(
+            retry_counts, {'retried': 0, 'recovered': 0, 'abandoned': 0}
+        )
+        self.assertEqual(
+            [message.to[0] for message in mail.outbox],
+            [s.email_address for s in self.subscribers[:3]]
+        )
+        self.newsletter.refresh_from_db()
+        self.assertFalse(self.newsletter.is_sent)
+
+    def test_send_emails(self):
+        send_newsletter = ShardedNewsletterEmailSender(processes=1)
+        send_newsletter.send_emails()
+
+        self.assertEqual(len(mail.outbox), 7)
+        self.newsletter.refresh_from_db()
+        self.assertTrue(self.newsletter.is_sent)
+
+    @mock.patch('newsfeed.utils.send_newsletters._send_newsletter_shard')
+    def test_send_emails_with_failed_shard(self, send_newsletter_shard):
+        send_newsletter_shard.side_effect = [
+            (4, {'retried': 1, 'recovered': 1, 'abandoned': 0}), Exception()
+        ]
+        send_newsletter = ShardedNewsletterEmailSender(processes=1)
+        send_newsletter._get_shards = mock.Mock(return_value=[(1, 5), (5, 8)])
+
+        send_newsletter.send_emails()
+
+        self.assertEqual(send_newsletter_shard.call_count, 2)
+        self.assertEqual(send_newsletter.sent_email_counts, {
+            self.newsletter.id: 4
+        })
+        self.assertEqual(
+            send_newsletter.retry_counts,
+            {'retried': 1, 'recovered': 1, 'abandoned': 0}
+        )
+        self.newsletter.refresh_from_db()
+        self.assertFalse(self.newsletter.is_sent)
+
+
+class LocalSMTPHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP server conversation that stores the received messages"""
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        self.reply('220 localhost ESMTP')
+        sender, recipients = None, []
+
+        for line in self.rfile:
+            command = line.decode().strip()
+            verb = command.split(' ', 1)[0].upper()
+
+            if verb == 'EHLO':
+                self.reply('250-localhost')
+                self.reply('250 AUTH PLAIN')
+            elif verb == 'AUTH':
+                self.reply('235 Authentication successful')
+            elif verb == 'MAIL':
+                sender, recipients = command[10:].strip('<>'), []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                recipient = command[8:].strip('<>')
+
+                if recipient in self.server.refused:
+                    self.reply('550 No such user')
+                else:
+                    recipients.append(recipient)
+                    self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = b''.join(iter(self.rfile.readline, b'.\r\n'))
+                self.server.messages.append((sender, recipients, data))
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+class LocalSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, refused=()):
+        super().__init__(('127.0.0.1', 0), LocalSMTPHandler)
+        self.messages = []
+        # recipients that are refused by the server
+        self.refused = set(refused)
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+
+
+@skipIf(
+    None in (
+        async_send_newsletters.aiosmtplib,
+        async_send_newsletters.async_to_sync,
+    ),
+    'aiosmtplib or asgiref is not installed'
+)
+class AsyncNewsletterEmailSenderTest(TestCase):
+    sender_class = async_send_newsletters.AsyncNewsletterEmailSender
+
+    def setUp(self):
+        self.subscribers = baker.make(
+            Subscriber, subscribed=True, verified=True, _quantity=5
+        )
+        self.released_issue = baker.make(
+            Issue, is_draft=False,
+            publish_date=timezone.now() - timezone.timedelta(days=1),
+        )
+        self.newsletter = baker.make(
+            Newsletter, issue=self.released_issue, is_sent=False,
+            schedule=timezone.now() - timezone.timedelta(days=1),
+        )
+
+    def send_emails(self, server, max_connections=2, batch_size=2):
+        with self.settings(
+            EMAIL_HOST='127.0.0.1', EMAIL_PORT=server.server_address[1],
+            EMAIL_USE_TLS=False, EMAIL_TIMEOUT=5
+        ):
+            send_newsletter = self.sender_class()
+            send_newsletter.batch_size = batch_size
+            send_newsletter.max_connections = max_connections
+            send_newsletter.retry_backoff = 0
+            send_newsletter.send_emails()
+
+        return send_newsletter
+
+    def test_send_emails(self):
+        with LocalSMTPServer() as server:
+            send_newsletter = self.send_emails(server)
+
+        self.assertEqual(
+            sorted(recipients[0] for _, recipients, _ in server.messages),
+            sorted(s.email_address for s in self.subscribers)
+        )
+        self.assertIn(
+            self.newsletter.subject.encode(), server.messages[0][2]
+        )
+        self.assertEqual(
+            send_newsletter.sent_email_counts, {self.newsletter.id: 5}
+        )
+        self.assertEqual(self.newsletter.deliveries.sent().count(), 5)
+        self.newsletter.refresh_from_db()
+        self.assertTrue(self.newsletter.is_sent)
+
+    def test_send_emails_with_connection_error(self):
+        send_batch = self.sender_class._send_batch_async
+        aiosmtplib = async_send_newsletters.aiosmtplib
+        calls = []
+
+        async def send_batch_with_error(self, smtp, *args):
+            calls.append(args)
+
+            if len(calls) == 1:
+                with mock.patch.object(
+                    smtp, 'sendmail',
+                    side_effect=aiosmtplib.SMTPServerDisconnected('error')
+                ):
+                    return await send_batch(self, smtp, *args)
+
+            return await send_batch(self, smtp, *args)
+
+        with mock.patch.object(
+            self.sender_class, '_send_batch_async',
+            send_batch_with_error
+        ), LocalSMTPServer() as server:
+            send_newsletter = self.send_emails(server, max_connections=1)
+
+        # the batch of the broken session is retried
+        self.assertEqual(
+            send_newsletter.sent_email_counts[self.newsletter.id], 5
+        )
+        self.assertEqual(len(server.messages), 5)
+        self.assertEqual(
+            send_newsletter.retry_counts,
+            {'retried': 2, 'recovered': 2, 'abandoned': 0}
+        )
+
+    def test_send_emails_with_refused_recipient(self):
+        refused = self.subscribers[2]
+
+        with LocalSMTPServer(refused=[refused.email_address]) as server:
+            send_newsletter = self.send_emails(
+                server, max_connections=1, batch_size=5
+            )
+
+        # the other subscribers of the batch received the newsletter once
+        self.assertEqual(
+            sorted(recipients[0] for _, recipients, _ in server.messages),
+            sorted(
+                s.email_address for s in self.subscribers if s != refused
+            )
+        )
+        self.assertEqual(
+            send_newsletter.sent_email_counts[self.newsletter.id], 4
+        )
+        self.assertEqual(
+            self.newsletter.deliveries.abandoned().get().subscriber, refused
+        )
+
+    def test_send_email_newsletter_with_sender_class_setting(self):
+        with mock.patch(
+            'newsfeed.utils.send_newsletters.NEWSFEED_EMAIL_SENDER_CLASS',
+            'newsfeed.utils.async_send_newsletters.AsyncNewsletterEmailSender'
+        ), LocalSMTPServer() as server, self.settings(
+            EMAIL_HOST='127.0.0.1', EMAIL_PORT=server.server_address[1],
+            EMAIL_USE_TLS=False, EMAIL_TIMEOUT=5
+        ):
+            send_newsletter = send_email_newsletter()
+
+        self.assertTrue(
+            isinstance(send_newsletter, self.sender_class)
+        )
+        self.assertEqual(len(server.messages), 5)
+
+
+class RenderedNewsletterCacheTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.issue = baker.make(
+            Issue, is_draft=False,
+            publish_date=timezone.now() - timezone.timedelta(days=1),
+        )
+        self.category = baker.make(PostCategory)
+        self.post = baker.make(
+            Post, issue=self.issue, category=self.category, is_visible=True
+        )
+        self.newsletter = baker.make(Newsletter, issue=self.issue)
+
+    def render_newsletter(self, newsletter=None):
+        with mock.patch(
+            'newsfeed.utils.send_newsletters.render_to_string',
+            wraps=render_to_string
+        ) as render:
+            rendered = NewsletterEmailSender._render_newsletter(
+                newsletter or self.newsletter
+            )
+
+        return rendered, render.call_count
+
+    def test_render_newsletter_is_cached(self):
+        rendered, renders = self.render_newsletter()
+        other_newsletter = baker.make(Newsletter, issue=self.issue)
+
+        with CaptureQueriesContext(connection) as queries:
+            cached, cached_renders = self.render_newsletter(other_newsletter)
+
+        self.assertEqual(renders, 1)
+        self.assertEqual(cached_renders, 0)
+        self.assertEqual(cached['html'], rendered['html'])
+        # only the content version of the issue is queried
+        self.assertEqual(len(queries), 1)
+
+    def test_render_newsletter_after_post_is_changed(self):
+        self.render_newsletter()
+
+        self.post.title = 'Updated post title'
+        self.post.save()
+        rendered, renders = self.render_newsletter()
+
+        self.assertEqual(renders, 1)
+        self.assertIn('Updated post title', rendered['html'])
+
+    def test_render_newsletter_after_post_is_deleted(self):
+        self.render_newsletter()
+
+        self.post.delete()
+        rendered, renders = self.render_newsletter()
+
+        self.assertEqual(renders, 1)
+        self.assertNotIn(self.post.title, rendered['html'])
+
+    def test_render_newsletter_after_bulk_update(self):
+        self.render_newsletter()
+
+        # signals are not sent, the content version is changed
+        Post.objects.filter(id=self.post.id).update(
+            is_visible=False, updated_at=timezone.now()
+        )
+        rendered, renders = self.render_newsletter()
+
+        self.assertEqual(renders, 1)
+        self.assertNotIn(self.post.title, rendered['html'])
+
+    def test_render_newsletter_after_category_is_changed(self):
+        self.render_newsletter()
+
+        self.category.save()
+        _, renders = self.render_newsletter()
+
+        self.assertEqual(renders, 1)
+
+    def test_invalidate_rendered_newsletter(self):
+        self.render_newsletter()
+
+        invalidate_rendered_newsletter(self.issue.id)
+
+        self.assertIsNone(
+            cache.get(get_rendered_newsletter_cache_key(self.issue.id))
+        )
+        self.assertEqual(self.render_newsletter()[1], 1)
+
+
+class NewsletterMessageTemplateTest(TestCase):
+
+    def setUp(self):
+        self.template = NewsletterMessageTemplate(
+            subject='Issue #1',
+            html='<h1>Issue #1</h1>\n<p>Caf\u00e9</p>\n' * 50,
+            from_email='test_user'
+        )
+
+    def test_get_mime_message(self):
+        message = self.template.get_mime_message('test@test.com')
+        other_message = self.template.get_mime_message('other@test.com')
+
+        self.assertEqual(message['To'], 'test@test.com')
+        self.assertEqual(message['Subject'], 'Issue #1')
+        self.assertEqual(message['From'], 'test_user')
+        self.assertEqual(other_message['To'], 'other@test.com')
+        self.assertNotEqual(message['Message-ID'], other_message['Message-ID'])
+        self.assertIsNone(self.template.mime_message['To'])
+
+    def test_as_bytes_is_same_as_serialized_message(self):
+        for html in [self.template.html, 'a' * 1000 + '\u00e9']:
+            template = NewsletterMessageTemplate('Issue #1', html, 'test_user')
+
+            for linesep in ['\n', '\r\n']:
+                message = template.get_mime_message('test@test.com')
+
+                self.assertEqual(
+                    message.as_bytes(linesep=linesep),
+                    SafeMIMEText.as_bytes(message, linesep=linesep)
+                )
+
+    def test_body_is_serialized_once(self):
+        self.template.get_mime_message('test@test.com').as_bytes()
+
+        with mock.patch.object(
+            SafeMIMEText, 'as_bytes', autospec=True
+        ) as as_bytes:
+            message = self.template.get_mime_message('other@test.com')
+            serialized = message.as_bytes()
+
+        as_bytes.assert_not_called()
+        self.assertIn(b'To: other@test.com', serialized)
+
+    def test_newsletter_email_message(self):
+        message = NewsletterEmailMessage(self.template, 'test@test.com')
+
+        self.assertEqual(message.subject, 'Issue #1')
+        self.assertEqual(message.body, self.template.html)
+        self.assertEqual(message.to, ['test@test.com'])
+        self.assertEqual(message.message()['To'], 'test@test.com')
+        self.assertIsNone(message.message()['List-Unsubscribe'])
+
+    def test_get_mime_message_splices_unsubscribe_url(self):
+        html = (
+            '<p>Caf\u00e9</p>\n'
+            f'<a href="http://site{UNSUBSCRIBE_URL_PLACEHOLDER}">Link</a>'
+        )
+        template = NewsletterMessageTemplate(
+            'Issue #1', html, 'test_user', site_url='http://site'
+        )
+        template.get_mime_message(
+            'test@test.com', '/unsubscribe/a/'
+        ).as_bytes(linesep='\r\n')
+
+        with mock.patch.object(
+            SafeMIMEText, 'as_bytes', autospec=True
+        ) as as_bytes:
+            message = template.get_mime_message(
+                'other@test.com', '/unsubscribe/b/'
+            )
+            serialized = message.as_bytes(linesep='\r\n')
+
+        as_bytes.assert_not_called()
+        self.assertTrue(template.splice_unsubscribe_url)
+        self.assertIn(b'href="http://site/unsubscribe/b/"', serialized)
+        self.assertNotIn(UNSUBSCRIBE_URL_PLACEHOLDER.encode(), serialized)
+        self.assertEqual(
+            message['List-Unsubscribe'], '<http://site/unsubscribe/b/>'
+        )
+        self.assertEqual(
+            message['List-Unsubscribe-Post'], 'List-Unsubscribe=One-Click'
+        )
+        self.assertNotIn(
+            UNSUBSCRIBE_URL_PLACEHOLDER.encode(),
+            template.get_mime_message('test@test.com', '/a/').as_bytes()
+        )
+
+    def test_spliced_unsubscribe_url_in_every_serialization(self):
+        html = (
+            '<p>Caf\u00e9</p>\n'
+            f'<a href="http://site{UNSUBSCRIBE_URL_PLACEHOLDER}">Link</a>'
+        )
+        template = NewsletterMessageTemplate(
+            'Issue #1', html, 'test_user', site_url='http://site'
+        )
+        message = template.get_mime_message('test@test.com', '/unsubscribe/a/')
+        generated = BytesIO()
+        BytesGenerator(generated).flatten(message)
+
+        for serialized in [
+            message.as_bytes(),
+            message.as_bytes(unixfrom=True),
+            message.as_string().encode(),
+            str(message).encode(),
+            generated.getvalue(),
+        ]:
+            self.assertIn(b'http://site/unsubscribe/a/', serialized)
+            self.assertNotIn(UNSUBSCRIBE_URL_PLACEHOLDER.encode(), serialized)
+
+        # the template is not changed
+        self.assertIn(
+            UNSUBSCRIBE_URL_PLACEHOLDER, template.mime_message.get_payload()
+        )
+
+    def test_get_mime_message_encodes_quoted_printable_again(self):
+        html = 'a' * 1000 + f'<a href="{UNSUBSCRIBE_URL_PLACEHOLDER}"></a>'
+        template = NewsletterMessageTemplate('Issue #1', html, 'test_user')
+
+        message = template.get_mime_message(
+            'test@test.com', '/unsubscribe/b/'
+        )
+
+        self.assertFalse(template.splice_unsubscribe_url)
+        self.assertEqual(
+            message['Content-Transfer-Encoding'], 'quoted-printable'
+        )
+        self.assertIn(
+            '/unsubscribe/b/', message.get_payload(decode=True).decode()
+        )
+        self.assertEqual(
+            message.as_bytes(),
+            SafeMIMEText.as_bytes(message)
+        )
+
+
+class TokenBucketRateLimiterTest(TestCase):
+
+    @mock.patch('newsfeed.utils.rate_limit.time')
+    def test_acquire_within_burst_does_not_wait(self, time):
+        time.monotonic.return_value = 100
+        rate_limiter = TokenBucketRateLimiter(rate=10, burst=20)
+
+        self.assertEqual(rate_limiter.acquire(15), 0)
+        self.assertEqual(rate_limiter.acquire(5), 0)
+
+        time.sleep.assert_not_called()
+        self.assertEqual(rate_limiter.throttled_time, 0)
+
+    @mock.patch('newsfeed.utils.rate_limit.time')
+    def test_acquire_waits_for_tokens(self, time):
+        time.monotonic.return_value = 100
+        rate_limiter = TokenBucketRateLimiter(rate=10, burst=10)
+
+        self.assertEqual(rate_limiter.acquire(10), 0)
+        # the bucket goes into debt for requests larger than the bucket
+        self.assertEqual(rate_limiter.acquire(25), 2.5)
+
+        time.monotonic.return_value = 102.5
+        self.assertEqual(rate_limiter.acquire(5), 0.5)
+
+        time.sleep.assert_has_calls([mock.call(2.5), mock.call(0.5)])
+        self.assertEqual(rate_limiter.throttled_time, 3)
+
+    @mock.patch('newsfeed.utils.rate_limit.time')
+    def test_acquire_refills_tokens_up_to_burst(self, time):
+        time.monotonic.return_value = 100
+        rate_limiter = TokenBucketRateLimiter(rate=10, burst=10)
+        rate_limiter.acquire(10)
+
+        time.monotonic.return_value = 200
+        self.assertEqual(rate_limiter.acquire(10), 0)
+        self.assertEqual(rate_limiter.tokens, 0)
+
+    @mock.patch('newsfeed.utils.rate_limit.time')
+    def test_acquire_without_rate(self, time):
+        rate_limiter = TokenBucketRateLimiter()
+
+        self.assertEqual(rate_limiter.acquire(1000), 0)
+        time.sleep.assert_not_called()
+
+    def test_get_rate_limiter(self):
+        rate_limiter = get_rate_limiter(rate=5)
+
+        self.assertTrue(isinstance(rate_limiter, TokenBucketRateLimiter))
+        self.assertEqual(rate_limiter.rate, 5)
+        self.assertEqual(rate_limiter.burst, 5)
+
+
 class CheckAjaxTest(TestCase):
 
     def test_request_is_ajax(self):
@@ -2,14 +2,20 @@ import json
 from unittest import mock
 
 from django.contrib.messages import get_messages
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.template.loader import render_to_string
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
 from model_bakery import baker
 
-from newsfeed.models import Issue, Post, Subscriber
+from newsfeed.models import Issue, Post, PostCategory, Subscriber
 from newsfeed import signals
+from newsfeed.feeds import LatestIssuesFeed
+from newsfeed.views import IssueDetailView, IssueListView
 
 
 class IssueListViewTest(TestCase):
@@ -56,6 +62,102 @@ class IssueListViewTest(TestCase):
         self.assertTrue(len(response.context['object_list']) == 0)
 
 
+@mock.patch.object(IssueListView, 'pagination', 'cursor')
+class IssueListViewCursorPaginationTest(TestCase):
+
+    def setUp(self):
+        self.released_issues = sorted(
+            baker.make(
+                Issue, is_draft=False, _quantity=16,
+                publish_date=timezone.now() - timezone.timedelta(days=1)
+            ),
+            key=lambda issue: issue.issue_number,
+            reverse=True
+        )
+
+    def test_first_page(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('newsfeed:issue_list'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            list(response.context['object_list']), self.released_issues[:15]
+        )
+        self.assertTrue(response.context['is_paginated'])
+
+        page = response.context['page_obj']
+        self.assertFalse(page.has_previous())
+        self.assertEqual(
+            page.next_cursor, self.released_issues[14].issue_number
+        )
+        self.assertContains(response, f'?after={page.next_cursor}')
+
+        # the validators of the conditional GET with
+        # the version of the categories and the page
+        self.assertEqual(len(queries), 3)
+        self.assertNotIn('COUNT(', queries[2]['sql'])
+        self.assertNotIn('OFFSET', queries[2]['sql'])
+
+    def test_next_page(self):
+        cursor = self.released_issues[14].issue_number
+
+        response = self.client.get(
+            reverse('newsfeed:issue_list'), {'after': cursor}
+        )
+
+        self.assertEqual(
+            list(response.context['object_list']), self.released_issues[15:]
+        )
+        page = response.context['page_obj']
+        self.assertFalse(page.has_next())
+        self.assertEqual(
+            page.previous_cursor, self.released_issues[15].issue_number
+        )
+        self.assertContains(response, f'?before={page.previous_cursor}')
+
+    def test_previous_page(self):
+        cursor = self.released_issues[15].issue_number
+
+        response = self.client.get(
+            reverse('newsfeed:issue_list'), {'before': cursor}
+        )
+
+        self.assertEqual(
+            list(response.context['object_list']), self.released_issues[:15]
+        )
+        page = response.context['page_obj']
+        self.assertFalse(page.has_previous())
+        self.assertEqual(
+            page.next_cursor, self.released_issues[14].issue_number
+        )
+
+    def test_previous_page_with_more_pages(self):
+        cursor = self.released_issues[3].issue_number
+
+        with mock.patch.object(IssueListView, 'paginate_by', 2):
+            response = self.client.get(
+                reverse('newsfeed:issue_list'), {'before': cursor}
+            )
+
+        self.assertEqual(
+            list(response.context['object_list']), self.released_issues[1:3]
+        )
+        page = response.context['page_obj']
+        self.assertEqual(
+            page.previous_cursor, self.released_issues[1].issue_number
+        )
+        self.assertEqual(
+            page.next_cursor, self.released_issues[2].issue_number
+        )
+
+    def test_invalid_cursor(self):
+        response = self.client.get(
+            reverse('newsfeed:issue_list'), {'after': 'invalid'}
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+
 class IssueDetailViewTest(TestCase):
 
     def setUp(self):
@@ -111,6 +213,23 @@ class IssueDetailViewTest(TestCase):
         )
         self.assertEqual(response.status_code, 404)
 
+    def test_issue_detail_view_groups_posts_by_category(self):
+        category = baker.make(PostCategory, order=0)
+        Post.objects.filter(id=self.posts[1].id).update(category=category)
+
+        response = self.client.get(
+            reverse(
+                'newsfeed:issue_detail',
+                kwargs={'issue_number': self.released_issue.issue_number}
+            )
+        )
+
+        self.assertEqual(
+            response.context['category_list'],
+            [(category, [self.posts[1]]), (None, [self.posts[0]])]
+        )
+        self.assertContains(response, category.name)
+
 
 class LatestIssueViewTest(TestCase):
 
@@ -149,6 +268,19 @@ class LatestIssueViewTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTrue(response.context['latest_issue'].posts.count() == 0)
 
+    def test_latest_issue_view_groups_posts_by_category(self):
+        category = baker.make(PostCategory)
+        latest_issue = Issue.objects.latest('issue_number')
+        Post.objects.update(issue=latest_issue, category=category)
+        self.posts[0].is_visible = False
+        self.posts[0].save()
+
+        response = self.client.get(reverse('newsfeed:latest_issue'))
+
+        self.assertEqual(
+            response.context['category_list'], [(category, [self.posts[1]])]
+        )
+
     def test_latest_issue_view_shows_latest_issue(self):
         latest_issue = Issue.objects.latest('issue_number')
         response = self.client.get(reverse('newsfeed:latest_issue'))
@@ -162,6 +294,508 @@ class LatestIssueViewTest(TestCase):
         self.assertEqual(response.status_code, 200)
 
 
+class ConditionalGetTest(TestCase):
+
+    def setUp(self):
+        self.issue = baker.make(
+            Issue, is_draft=False,
+            publish_date=timezone.now() - timezone.timedelta(days=1)
+        )
+        self.post = baker.make(Post, issue=self.issue, is_visible=True)
+        self.url = reverse(
+            'newsfeed:issue_detail', args=[self.issue.issue_number]
+        )
+
+    def test_issue_detail_view_returns_validators(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('ETag'))
+        self.assertTrue(response.has_header('Last-Modified'))
+
+    def test_issue_detail_view_returns_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+
+        # the issues with their posts and the categories
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_issue_list_view_ignores_validators_with_pending_messages(self):
+        etag = self.client.get(reverse('newsfeed:issue_list'))['ETag']
+
+        # redirects to the issue list
+        self.client.post(
+            reverse('newsfeed:newsletter_subscribe'),
+            {'email_address': 'test@test.com'}
+        )
+        response = self.client.get(
+            reverse('newsfeed:issue_list'), HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertContains(response, 'Thank you for subscribing!')
+        self.assertFalse(response.has_header('ETag'))
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_issue_detail_view_with_if_modified_since(self):
+        last_modified = self.client.get(self.url)['Last-Modified']
+
+        response = self.client.get(
+            self.url, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes_when_post_is_changed(self):
+        etag = self.client.get(self.url)['ETag']
+
+        self.post.title = 'New title'
+        self.post.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_changes_when_category_is_renamed(self):
+        category = baker.make(PostCategory, name='Old name')
+        self.post.category = category
+        self.post.save()
+        etag = self.client.get(self.url)['ETag']
+
+        # categories do not have an update time
+        category.name = 'New name'
+        category.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertContains(response, 'New name')
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_changes_when_post_is_removed(self):
+        etag = self.client.get(self.url)['ETag']
+
+        self.post.delete()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_issue_list_etag_changes_when_issue_is_released(self):
+        baker.make(
+            Issue, is_draft=False,
+            publish_date=timezone.now() + timezone.timedelta(days=1)
+        )
+        etag = self.client.get(reverse('newsfeed:issue_list'))['ETag']
+
+        Issue.objects.update(
+            publish_date=timezone.now() - timezone.timedelta(days=1)
+        )
+
+        response = self.client.get(
+            reverse('newsfeed:issue_list'), HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['object_list']), 2)
+
+    def test_unknown_issue_returns_not_found(self):
+        response = self.client.get(
+            reverse('newsfeed:issue_detail', args=[0]),
+            HTTP_IF_NONE_MATCH='*'
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+    @mock.patch.object(
+        IssueListView, 'cache_control', {'public': True, 'max_age': 300}
+    )
+    def test_issue_list_view_cache_control(self):
+        response = self.client.get(reverse('newsfeed:issue_list'))
+
+        self.assertEqual(response['Cache-Control'], 'public, max-age=300')
+
+
+class IssueAPIViewTest(TestCase):
+
+    def setUp(self):
+        self.issues = sorted(
+            baker.make(
+                Issue, is_draft=False, _quantity=3,
+                publish_date=timezone.now() - timezone.timedelta(days=1)
+            ),
+            key=lambda issue: issue.issue_number,
+            reverse=True
+        )
+        self.draft_issue = baker.make(
+            Issue, is_draft=True,
+            publish_date=timezone.now() - timezone.timedelta(days=1)
+        )
+        self.category = baker.make(PostCategory, name='News', order=1)
+        self.other_category = baker.make(PostCategory, name='Tools', order=2)
+        self.posts = [
+            baker.make(
+                Post, issue=self.issues[0], category=self.category,
+                is_visible=True, order=1
+            ),
+            baker.make(
+                Post, issue=self.issues[0], category=self.other_category,
+                is_visible=True, order=1
+            ),
+            baker.make(
+                Post, issue=self.issues[0], category=self.category,
+                is_visible=True, order=2
+            ),
+        ]
+        baker.make(
+            Post, issue=self.issues[0], category=self.category,
+            is_visible=False
+        )
+
+    def test_issue_list_api_streams_released_issues(self):
+        response = self.client.get(reverse('newsfeed:issue_list_api'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+        data = json.loads(b''.join(response.streaming_content))
+
+        self.assertEqual(
+            [issue['issue_number'] for issue in data['issues']],
+            [issue.issue_number for issue in self.issues]
+        )
+        self.assertEqual(
+            set(data['issues'][0]),
+            {
+                'issue_number', 'title', 'short_description',
+                'publish_date', 'issue_type',
+            }
+        )
+
+    def test_issue_list_api_with_fields(self):
+        response = self.client.get(
+            reverse('newsfeed:issue_list_api'), {'fields': 'issue_number'}
+        )
+
+        data = json.loads(b''.join(response.streaming_content))
+
+        self.assertEqual(
+            data['issues'],
+            [{'issue_number': issue.issue_number} for issue in self.issues]
+        )
+
+    def test_issue_list_api_with_invalid_fields(self):
+        response = self.client.get(
+            reverse('newsfeed:issue_list_api'), {'fields': 'title,id'}
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Invalid fields: id', response.json()['error'])
+
+    def test_issue_list_api_with_no_issues(self):
+        Issue.objects.all().delete()
+
+        response = self.client.get(reverse('newsfeed:issue_list_api'))
+
+        self.assertEqual(
+            json.loads(b''.join(response.streaming_content)), {'issues': []}
+        )
+
+    def test_issue_detail_api_groups_posts_by_category(self):
+        response = self.client.get(
+            reverse(
+                'newsfeed:issue_detail_api',
+                args=[self.issues[0].issue_number]
+            ),
+            {'fields': 'title', 'post_fields': 'title,source_url'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            {
+                'title': self.issues[0].title,
+                'categories': [
+                    {
+                        'name': 'News',
+                        'posts': [
+                            {'title': post.title, 'source_url': post.source_url}
+                            for post in (self.posts[0], self.posts[2])
+                        ],
+                    },
+                    {
+                        'name': 'Tools',
+                        'posts': [
+                            {
+                                'title': self.posts[1].title,
+                                'source_url': self.posts[1].source_url,
+                            }
+                        ],
+                    },
+                ],
+            }
+        )
+
+    def test_issue_detail_api_doesnt_show_draft_issues(self):
+        response = self.client.get(
+            reverse(
+                'newsfeed:issue_detail_api',
+                args=[self.draft_issue.issue_number]
+            )
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_issue_detail_api_with_invalid_post_fields(self):
+        response = self.client.get(
+            reverse(
+                'newsfeed:issue_detail_api',
+                args=[self.issues[0].issue_number]
+            ),
+            {'post_fields': 'is_visible'}
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_latest_issue_api(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                reverse('newsfeed:latest_issue_api'), {'fields': 'issue_number'}
+            )
+
+        data = response.json()
+        self.assertEqual(data['issue_number'], self.issues[0].issue_number)
+        self.assertEqual(len(data['categories']), 2)
+
+    def test_latest_issue_api_with_no_issues(self):
+        Issue.objects.all().delete()
+
+        response = self.client.get(reverse('newsfeed:latest_issue_api'))
+
+        self.assertEqual(response.status_code, 404)
+
+
+class IssueFeedTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.issue = baker.make(
+            Issue, is_draft=False, title='Released issue',
+            publish_date=timezone.now() - timezone.timedelta(days=1)
+        )
+        self.post = baker.make(
+            Post, issue=self.issue, is_visible=True, title='Visible post'
+        )
+        baker.make(
+            Issue, is_draft=True, title='Draft issue',
+            publish_date=timezone.now() - timezone.timedelta(days=1)
+        )
+
+    def get_feed(self, url_name='newsfeed:issue_rss_feed', **extra):
+        with mock.patch(
+            'newsfeed.feeds.render_to_string', wraps=render_to_string
+        ) as render:
+            response = self.client.get(reverse(url_name), **extra)
+
+        return response, render.call_count
+
+    def test_feed_item_version_is_content_version_of_issue(self):
+        issue = Issue.objects.prefetch_related('posts').get(id=self.issue.id)
+
+        self.assertEqual(
+            LatestIssuesFeed.get_item_version(issue),
+            self.issue.get_content_version()
+        )
+
+    def test_rss_feed(self):
+        response, _ = self.get_feed()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('application/rss'))
+        self.assertContains(response, 'Released issue')
+        self.assertContains(response, 'Visible post')
+        self.assertNotContains(response, 'Draft issue')
+
+    def test_atom_feed(self):
+        response, _ = self.get_feed('newsfeed:issue_atom_feed')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(
+            response['Content-Type'].startswith('application/atom')
+        )
+        self.assertContains(response, 'Released issue')
+        self.assertContains(response, 'Visible post')
+
+    def test_feed_items_are_cached_per_issue(self):
+        _, render_count = self.get_feed()
+        self.assertEqual(render_count, 1)
+
+        _, render_count = self.get_feed()
+        self.assertEqual(render_count, 0)
+
+        baker.make(
+            Issue, is_draft=False,
+            publish_date=timezone.now() - timezone.timedelta(hours=1)
+        )
+
+        _, render_count = self.get_feed()
+        self.assertEqual(render_count, 1)
+
+    def test_feed_item_is_rendered_when_post_is_changed(self):
+        self.get_feed()
+
+        self.post.title = 'Changed post'
+        self.post.save()
+
+        response, render_count = self.get_feed()
+
+        self.assertEqual(render_count, 1)
+        self.assertContains(response, 'Changed post')
+
+    def test_feed_items_are_rendered_when_category_is_changed(self):
+        self.get_feed()
+
+        baker.make(PostCategory)
+
+        _, render_count = self.get_feed()
+
+        self.assertEqual(render_count, 1)
+
+    def test_feed_returns_not_modified(self):
+        response, _ = self.get_feed()
+
+        # the issues with their posts and the categories
+        with self.assertNumQueries(2):
+            response, _ = self.get_feed(
+                HTTP_IF_NONE_MATCH=response['ETag']
+            )
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_feed_etag_changes_when_category_is_renamed(self):
+        category = baker.make(PostCategory, name='Old name')
+        self.post.category = category
+        self.post.save()
+        response, _ = self.get_feed()
+
+        category.name = 'New name'
+        category.save()
+
+        response, _ = self.get_feed(HTTP_IF_NONE_MATCH=response['ETag'])
+
+        self.assertContains(response, 'New name')
+
+    def test_feed_returns_not_modified_with_if_modified_since(self):
+        response, _ = self.get_feed()
+
+        response, _ = self.get_feed(
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+
+        self.assertEqual(response.status_code, 304)
+
+
+@mock.patch('newsfeed.utils.page_cache.NEWSFEED_PAGE_CACHE_TIMEOUT', 60)
+class PageCacheTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.issue = baker.make(
+            Issue, is_draft=False, title='Old title',
+            publish_date=timezone.now() - timezone.timedelta(days=1)
+        )
+        self.url = reverse(
+            'newsfeed:issue_detail', args=[self.issue.issue_number]
+        )
+
+    def test_page_is_cached(self):
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Old title')
+
+        # update() bypasses the signals
+        Issue.objects.update(title='New title')
+
+        for url in [self.url, reverse('newsfeed:issue_list')]:
+            self.client.get(url)
+
+        # only the validators of the conditional GET are read
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+
+        self.assertContains(response, 'Old title')
+        self.assertContains(
+            self.client.get(reverse('newsfeed:issue_list')), 'New title'
+        )
+
+    def test_cached_page_has_no_expiration_headers(self):
+        for url in [self.url, reverse('newsfeed:issue_list')]:
+            # the response is stored and then served from the cache
+            for response in [self.client.get(url), self.client.get(url)]:
+                self.assertFalse(response.has_header('Expires'))
+                self.assertNotIn(
+                    'max-age', response.get('Cache-Control', '')
+                )
+
+    def test_cached_page_uses_cache_control_setting(self):
+        with mock.patch.object(
+            IssueDetailView, 'cache_control', {'max_age': 30}
+        ):
+            self.client.get(self.url)
+            response = self.client.get(self.url)
+
+        self.assertEqual(response['Cache-Control'], 'max-age=30')
+
+    def test_page_cache_is_invalidated_on_save(self):
+        self.client.get(self.url)
+
+        self.issue.title = 'New title'
+        self.issue.save()
+
+        self.assertContains(self.client.get(self.url), 'New title')
+
+    def test_page_cache_is_invalidated_on_post_save(self):
+        self.client.get(self.url)
+
+        baker.make(Post, issue=self.issue, title='New post', is_visible=True)
+
+        self.assertContains(self.client.get(self.url), 'New post')
+
+    def test_page_cache_expires_when_next_issue_is_published(self):
+        baker.make(
+            Issue, is_draft=False,
+            publish_date=timezone.now() + timezone.timedelta(seconds=30)
+        )
+
+        with mock.patch.object(cache, 'set', wraps=cache.set) as cache_set:
+            self.client.get(reverse('newsfeed:latest_issue'))
+
+        generation_timeout = cache_set.call_args_list[0][0][2]
+        self.assertTrue(0 < generation_timeout <= 30)
+
+    def test_page_is_not_cached_with_pending_messages(self):
+        self.client.get(self.url)
+        self.client.post(
+            reverse('newsfeed:newsletter_subscribe'),
+            {'email_address': 'test@test.com'}
+        )
+
+        response = self.client.get(self.url)
+
+        self.assertContains(response, 'Thank you for subscribing!')
+
+    def test_page_cache_is_disabled(self):
+        with mock.patch(
+            'newsfeed.utils.page_cache.NEWSFEED_PAGE_CACHE_TIMEOUT', 0
+        ):
+            self.client.get(self.url)
+            Issue.objects.update(title='New title')
+
+            self.assertContains(self.client.get(self.url), 'New title')
+
+
 class NewsletterSubscribeViewTest(TestCase):
 
     def setUp(self):
@@ -222,6 +856,64 @@ class NewsletterSubscribeViewTest(TestCase):
             signal=self.email_verification_sent_signal,
         )
 
+    @mock.patch('newsfeed.models.send_subscription_verification_email')
+    def test_newsfeed_subscribe_view_resubscribe_queries(
+        self, send_verification_email
+    ):
+        subscriber = baker.make(
+            Subscriber, subscribed=False, verified=False,
+            verification_sent_date=timezone.now() - timezone.timedelta(days=1)
+        )
+        old_token = str(subscriber.token)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse('newsfeed:newsletter_subscribe'),
+                data={"email_address": subscriber.email_address},
+                HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+            )
+
+        self.assertTrue(response.json()['success'])
+        # get_or_create() and one UPDATE of the token and the sent date
+        self.assertEqual(
+            [
+                query['sql'].split()[0]
+                for query in queries.captured_queries
+                if query['sql'].split()[0] not in ('SAVEPOINT', 'RELEASE')
+            ],
+            ['SELECT', 'UPDATE']
+        )
+
+        subscriber.refresh_from_db()
+        self.assertNotEqual(subscriber.token, old_token)
+        send_verification_email.assert_called_once_with(
+            subscriber.get_verification_url(), subscriber.email_address
+        )
+
+    @mock.patch('newsfeed.models.send_subscription_verification_email')
+    def test_newsfeed_subscribe_view_normalizes_email_address(
+        self, send_verification_email
+    ):
+        subscriber = baker.make(
+            Subscriber, email_address='Alice@example.com',
+            subscribed=True, verified=True
+        )
+
+        response = self.client.post(
+            reverse('newsfeed:newsletter_subscribe'),
+            data={"email_address": "Alice@Example.COM"},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+
+        self.assertFalse(response.json()['success'])
+        self.assertEqual(
+            list(Subscriber.objects.filter(
+                email_address__iexact='alice@example.com'
+            )),
+            [subscriber]
+        )
+        send_verification_email.assert_not_called()
+
     @mock.patch('newsfeed.models.send_subscription_verification_email')
     def test_newsfeed_subscribe_view_already_subscribed(
         self, send_verification_email
@@ -615,3 +1307,62 @@ class NewsletterSubscriptionConfirmViewTest(TestCase):
             instance=self.unverified_subscriber,
             signal=self.subscribed_signal,
         )
+
+
+class NewsletterOneClickUnsubscribeViewTest(TestCase):
+
+    def setUp(self):
+        self.verified_subscriber = baker.make(
+            Subscriber, subscribed=True, verified=True
+        )
+        self.client = Client(enforce_csrf_checks=True)
+        self.mock_receiver = mock.Mock()
+        self.unsubscribed_signal = signals.unsubscribed
+
+        self.unsubscribed_signal.connect(self.mock_receiver)
+
+    def tearDown(self):
+        self.unsubscribed_signal.disconnect(self.mock_receiver)
+
+    def test_newsfeed_one_click_unsubscribe_view_get(self):
+        response = self.client.get(
+            self.verified_subscriber.get_unsubscribe_url()
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(
+            response, 'newsfeed/newsletter_one_click_unsubscribe.html'
+        )
+        self.assertNotIn('unsubscribed', response.context)
+        self.verified_subscriber.refresh_from_db()
+        self.assertTrue(self.verified_subscriber.subscribed)
+        self.mock_receiver.assert_not_called()
+
+    def test_newsfeed_one_click_unsubscribe_view_post(self):
+        response = self.client.post(
+            self.verified_subscriber.get_unsubscribe_url(),
+            data={'List-Unsubscribe': 'One-Click'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['unsubscribed'])
+        self.verified_subscriber.refresh_from_db()
+        self.assertFalse(self.verified_subscriber.subscribed)
+        self.mock_receiver.assert_called_once_with(
+            sender=Subscriber,
+            instance=self.verified_subscriber,
+            signal=self.unsubscribed_signal,
+        )
+
+    def test_newsfeed_one_click_unsubscribe_view_invalid_signature(self):
+        response = self.client.post(
+            reverse(
+                'newsfeed:newsletter_one_click_unsubscribe',
+                kwargs={'signed_token': f'{self.verified_subscriber.token}:x'}
+            )
+        )
+
+        self.assertEqual(response.status_code, 404)
+        self.verified_subscriber.refresh_from_db()
+        self.assertTrue(self.verified_subscriber.subscribed)
+        self.mock_receiver.assert_not_called()